@@ -0,0 +1,227 @@
+# benchmarks/datagen.py
+"""
+Deterministic synthetic dataset generator for DriveShare.
+
+Fills a fresh database (schema from DBManager.setup_tables) with the requested numbers
+of users, cars, bookings, messages and reviews. The same seed and counts always produce
+the same rows, so benchmark runs on different commits measure the same data. Each
+table draws from its own seeded random stream, so changing one count does not change
+the rows generated for the other tables.
+
+Rows are written with executemany in large transactions while the secondary indexes,
+the full-text trigger and the rating-summary triggers are dropped; all of them are
+rebuilt once at the end.
+
+Usage (from termproj/):
+    python -m benchmarks.datagen bench.db --rows 100000
+    python -m benchmarks.datagen bench.db --users 1000 --cars 5000 --bookings 20000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+from database.db_manager import DBManager, INDEXES, RATING_SUMMARIES
+
+EPOCH = date(2025, 1, 1)
+MAKES = ["Toyota Corolla", "Honda Civic", "Ford Focus", "Tesla Model 3", "Chevrolet Malibu",
+         "Nissan Altima", "Hyundai Elantra", "Kia Sorento", "Jeep Wrangler", "Subaru Outback",
+         "BMW 3 Series", "Audi A4", "Mazda CX-5", "Volkswagen Jetta", "Ford F-150"]
+CITIES = ["Detroit", "Dearborn", "Ann Arbor", "Lansing", "Grand Rapids", "Flint", "Troy",
+          "Novi", "Livonia", "Southfield", "Chicago", "Toledo", "Cleveland", "Columbus"]
+QUESTIONS = ("What was your first car?", "What city were you born in?", "What is your pet's name?")
+BOOKING_STATUSES = ("Completed", "Completed", "Completed", "Booked", "Cancelled")
+UNSTRUCTURED_SHARE = 0.02  # cars whose availability is free text, as some real listings are
+
+# Share of --rows given to each table.
+ROW_SHARES = {"users": 0.1, "cars": 0.1, "bookings": 0.3, "messages": 0.4, "reviews": 0.1}
+
+
+def counts_for(total_rows):
+    """Split a total row count across the tables by ROW_SHARES (at least 2 users, 1 car)."""
+    counts = {table: int(total_rows * share) for table, share in ROW_SHARES.items()}
+    counts["users"] = max(counts["users"], 2)
+    counts["cars"] = max(counts["cars"], 1)
+    counts["reviews"] = min(counts["reviews"], counts["bookings"])
+    return counts
+
+
+def owner_of_car(car_id, users):
+    """Owner of a generated car; a fixed function of car_id so later tables need no lookup."""
+    return (car_id * 7919) % users + 1
+
+
+def renter_of_booking(booking_id, car_id, users):
+    """Renter of a generated booking, chosen never to be the car's owner."""
+    renter_id = (booking_id * 104729 + 17) % users + 1
+    if renter_id == owner_of_car(car_id, users):
+        renter_id = renter_id % users + 1
+    return renter_id
+
+
+def day(offset):
+    return (EPOCH + timedelta(days=offset)).isoformat()
+
+
+def user_rows(count, seed):
+    rng = random.Random(f"{seed}-users")
+    for user_id in range(1, count + 1):
+        yield (user_id, f"User {user_id}", f"user{user_id}@example.com", f"password{user_id}",
+               QUESTIONS[0], rng.choice(MAKES), QUESTIONS[1], rng.choice(CITIES),
+               QUESTIONS[2], f"pet{rng.randrange(1000)}", round(rng.uniform(0, 5000), 2))
+
+
+def car_rows(count, users, seed):
+    rng = random.Random(f"{seed}-cars")
+    for car_id in range(1, count + 1):
+        location = rng.choice(CITIES)
+        if rng.random() < UNSTRUCTURED_SHARE:
+            availability, available_from, available_to = "Weekends only", None, None
+        else:
+            start = rng.randrange(0, 180)
+            available_from, available_to = day(start), day(start + rng.randrange(30, 540))
+            availability = f"{available_from} to {available_to}"
+        yield (car_id, owner_of_car(car_id, users), rng.choice(MAKES), rng.randrange(2000, 2026),
+               rng.randrange(0, 200000), location, float(rng.randrange(20, 250)),
+               availability, available_from, available_to)
+
+
+def booking_rows(count, cars, users, seed):
+    """
+    Bookings are spread round-robin over the cars; each car's bookings follow one another
+    in 4-day slots, so 'Booked' rows of the same car never overlap.
+    """
+    rng = random.Random(f"{seed}-bookings")
+    for booking_id in range(1, count + 1):
+        car_id = (booking_id - 1) % cars + 1
+        start = ((booking_id - 1) // cars) * 4
+        end = start + rng.randrange(0, 4)
+        yield (booking_id, car_id, renter_of_booking(booking_id, car_id, users), day(start), day(end),
+               rng.choice(BOOKING_STATUSES))
+
+
+def message_rows(count, users, seed):
+    """Each user chats with a handful of nearby user ids, so conversations have depth."""
+    rng = random.Random(f"{seed}-messages")
+    started = EPOCH.toordinal()
+    for message_id in range(1, count + 1):
+        sender_id = rng.randrange(1, users + 1)
+        receiver_id = (sender_id + rng.randrange(0, min(8, users - 1))) % users + 1
+        seconds = message_id * 37
+        timestamp = (f"{date.fromordinal(started + seconds // 86400).isoformat()} "
+                     f"{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}")
+        content = f"Message {message_id}: is the {rng.choice(MAKES)} in {rng.choice(CITIES)} free?"
+        yield message_id, sender_id, receiver_id, content, timestamp
+
+
+def review_rows(count, cars, users, seed):
+    """One review for each of the first `count` bookings, by the renter about the owner."""
+    rng = random.Random(f"{seed}-reviews")
+    for booking_id in range(1, count + 1):
+        car_id = (booking_id - 1) % cars + 1
+        owner_id = owner_of_car(car_id, users)
+        renter_id = renter_of_booking(booking_id, car_id, users)
+        rating = min(5, max(1, round(rng.gauss(4, 1))))
+        yield (booking_id, booking_id, renter_id, owner_id, rating, f"Rated {rating}",
+               f"{day(booking_id % 365)} 12:00:00")
+
+
+INSERTS = {
+    "users": """INSERT INTO users(user_id, name, email, password, security_q1, security_a1, security_q2,
+                                  security_a2, security_q3, security_a3, balance)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+    "cars": """INSERT INTO cars(car_id, owner_id, model, year, mileage, location, price_per_day, availability,
+                                available_from, available_to)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+    "bookings": """INSERT INTO bookings(booking_id, car_id, renter_id, start_date, end_date, status)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+    "messages": """INSERT INTO messages(message_id, sender_id, receiver_id, content, timestamp)
+                   VALUES (?, ?, ?, ?, ?)""",
+    "reviews": """INSERT INTO reviews(review_id, booking_id, reviewer_id, reviewee_id, rating, feedback, timestamp)
+                  VALUES (?, ?, ?, ?, ?, ?, ?)""",
+}
+
+
+def generate(db_path, counts, seed=0, batch_size=50000, log=print):
+    """
+    Create db_path (which must not exist yet) and fill it. counts maps table name to
+    row count, as returned by counts_for. Returns the DBManager, left open.
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists; generate into a new file")
+    counts = dict(counts)
+    counts["users"] = max(counts.get("users", 0), 2)
+    counts["cars"] = max(counts.get("cars", 0), 1)
+    counts["reviews"] = min(counts.get("reviews", 0), counts.get("bookings", 0))
+    users, cars = counts["users"], counts["cars"]
+    sources = {
+        "users": user_rows(users, seed),
+        "cars": car_rows(cars, users, seed),
+        "bookings": booking_rows(counts.get("bookings", 0), cars, users, seed),
+        "messages": message_rows(counts.get("messages", 0), users, seed),
+        "reviews": review_rows(counts["reviews"], cars, users, seed),
+    }
+
+    db_manager = DBManager(db_path)
+    conn = db_manager.conn
+    conn.execute("PRAGMA synchronous = OFF")
+    for table in {table for _name, table, _columns in INDEXES}:
+        db_manager.drop_indexes(table)
+    conn.execute("DROP TRIGGER IF EXISTS cars_fts_insert")
+    for summary, _key, _expr in RATING_SUMMARIES:
+        conn.execute(f"DROP TABLE IF EXISTS {summary}")
+        for event in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {summary}_{event}")
+    conn.commit()
+
+    for table, rows in sources.items():
+        started = time.perf_counter()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            conn.executemany(INSERTS[table], batch)
+            conn.commit()
+        log(f"  {table:9s} {counts.get(table, 0):>10,} rows in {time.perf_counter() - started:6.1f}s")
+
+    started = time.perf_counter()
+    if db_manager.fts_enabled:
+        conn.execute("INSERT INTO cars_fts(cars_fts) VALUES ('rebuild')")
+        conn.commit()
+        db_manager.create_search_index()
+    db_manager.create_indexes()
+    db_manager.create_rating_summaries()
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("ANALYZE")
+    conn.commit()
+    log(f"  indexes, full-text index and rating summaries rebuilt in {time.perf_counter() - started:6.1f}s")
+    return db_manager
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a deterministic DriveShare dataset.")
+    parser.add_argument("path", help="database file to create (must not exist)")
+    parser.add_argument("--rows", type=int, default=100000,
+                        help="total rows, split across tables by ROW_SHARES (default: 100000)")
+    for table in ROW_SHARES:
+        parser.add_argument(f"--{table}", type=int, help=f"override the number of {table}")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--batch-size", type=int, default=50000, help="rows per transaction (default: 50000)")
+    args = parser.parse_args(argv)
+
+    counts = counts_for(args.rows)
+    for table in ROW_SHARES:
+        if getattr(args, table) is not None:
+            counts[table] = getattr(args, table)
+    print(f"Generating {args.path} (seed {args.seed})")
+    started = time.perf_counter()
+    generate(args.path, counts, seed=args.seed, batch_size=args.batch_size).close()
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
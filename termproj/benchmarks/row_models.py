@@ -0,0 +1,75 @@
+# benchmarks/row_models.py
+"""
+Compares the old getter path (sqlite3.Row -> dict per row) with the slotted models
+built directly by Model.from_row, on an in-memory cars table.
+
+Usage (from termproj/):
+    python -m benchmarks.row_models [rows]
+"""
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+from database.db_manager import CAR_COLUMNS
+from models.car import Car
+
+
+def make_connection(rows):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE cars (
+            car_id INTEGER PRIMARY KEY, owner_id INTEGER, model TEXT, year INTEGER, mileage INTEGER,
+            location TEXT, price_per_day REAL, availability TEXT, available_from TEXT, available_to TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO cars(owner_id, model, year, mileage, location, price_per_day, availability, "
+        "available_from, available_to) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i % 100, f"Model {i}", 2000 + i % 25, i * 7 % 200000, f"City {i % 500}", 20.0 + i % 80,
+          "2025-01-01 to 2025-12-31", "2025-01-01", "2025-12-31") for i in range(rows))
+    )
+    return conn
+
+
+def load_as_dicts(conn):
+    cur = conn.cursor()
+    cur.row_factory = sqlite3.Row
+    cur.execute("SELECT * FROM cars")
+    return [dict(r) for r in cur.fetchall()]
+
+
+def load_as_models(conn):
+    cur = conn.cursor()
+    cur.row_factory = Car.from_row
+    cur.execute(f"SELECT {CAR_COLUMNS} FROM cars")
+    return cur.fetchall()
+
+
+def measure(loader, conn):
+    """Return (seconds, peak bytes allocated while loading, bytes still held by the result)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = loader(conn)
+    elapsed = time.perf_counter() - started
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak, held
+
+
+def main(rows=200000):
+    conn = make_connection(rows)
+    print(f"{rows} rows")
+    results = {}
+    for name, loader in (("dict", load_as_dicts), ("slotted", load_as_models)):
+        loader(conn)  # warm the page cache
+        elapsed, peak, held = measure(loader, conn)
+        results[name] = (elapsed, peak, held)
+        print(f"  {name:8s} {elapsed * 1000:8.1f} ms   peak {peak / 2**20:7.1f} MiB   held {held / 2**20:7.1f} MiB")
+    (d_time, d_peak, d_held), (s_time, s_peak, s_held) = results["dict"], results["slotted"]
+    print(f"  slotted/dict: time {s_time / d_time:.2f}x, peak {s_peak / d_peak:.2f}x, held {s_held / d_held:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
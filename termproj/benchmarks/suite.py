@@ -0,0 +1,313 @@
+# benchmarks/suite.py
+"""
+Times the public DBManager methods on generated datasets of increasing size and writes
+the results as JSON, so runs on different commits can be compared.
+
+For every scale a pristine dataset is generated once with benchmarks.datagen (cached in
+--data-dir and reused while the seed and row count match) and copied to a scratch file
+for the run, so the write cases (rent_car, add_balance, insert_message, ...) never
+change the data the next run starts from. Cases served by the user or search cache
+run on a second DBManager with both caches disabled, so they time the query itself,
+and again as <name>_warm on the cached DBManager after a pass that fills the cache
+with the same arguments. Every case draws its arguments from a seeded
+random stream, so two runs issue exactly the same calls.
+
+Usage (from termproj/):
+    python -m benchmarks.suite --scales 10k,100k --output results.json
+    python -m benchmarks.suite --scales 1m --only search,rent --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from datetime import date, timedelta
+
+from benchmarks import datagen
+from database.db_manager import DBManager
+
+SUFFIXES = {"k": 1000, "m": 1000000}
+
+
+def parse_scale(text):
+    """'10k' -> 10000, '2m' -> 2000000, '5000' -> 5000."""
+    text = text.strip().lower()
+    if text and text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def random_day(rng, first=0, last=540):
+    return (datagen.EPOCH + timedelta(days=rng.randrange(first, last))).isoformat()
+
+
+def user_email(rng, counts):
+    return f"user{rng.randrange(1, counts['users'] + 1)}@example.com"
+
+
+def chat_pair(rng, counts):
+    """A sender/receiver pair the generator actually wrote messages for."""
+    user_id = rng.randrange(1, counts["users"] + 1)
+    return user_id, (user_id + rng.randrange(0, min(8, counts["users"] - 1))) % counts["users"] + 1
+
+
+def rent_args(rng, counts, iteration):
+    # Dates past the generated bookings, one week apart per iteration, so most attempts
+    # exercise the full booking transaction rather than the conflict fast path.
+    start = date(2030, 1, 1) + timedelta(days=iteration * 7)
+    car_id = rng.randrange(1, counts["cars"] + 1)
+    renter_id = datagen.renter_of_booking(iteration + 1, car_id, counts["users"])
+    return car_id, renter_id, start.isoformat(), (start + timedelta(days=rng.randrange(0, 4))).isoformat()
+
+
+def review_args(rng, counts, iteration):
+    # The generator reviews the first counts["reviews"] bookings; review the ones after them.
+    booking_id = min(counts["reviews"] + iteration + 1, max(counts["bookings"], 1))
+    car_id = (booking_id - 1) % counts["cars"] + 1
+    return (booking_id, datagen.renter_of_booking(booking_id, car_id, counts["users"]),
+            datagen.owner_of_car(car_id, counts["users"]), rng.randrange(1, 6), "benchmark review")
+
+
+# name -> (DBManager method, function(rng, counts, iteration) returning its arguments).
+# Read cases run first; cases after WRITE_CASES_START modify the scratch database.
+CASES = [
+    ("search_cars", "search_cars",
+     lambda rng, c, i: (rng.choice(datagen.CITIES), rng.randrange(10000, 200000), random_day(rng))),
+    ("search_cars_by_price_page", "search_cars",
+     lambda rng, c, i: (rng.choice(datagen.CITIES)[:3], 200000, random_day(rng), "price", 20)),
+    ("search_cars_fts", "search_cars_fts",
+     lambda rng, c, i: (rng.choice(datagen.MAKES).split()[0][:4], 200000, random_day(rng), 20)),
+    ("is_car_free", "is_car_free",
+     lambda rng, c, i: (rng.randrange(1, c["cars"] + 1), random_day(rng, 0, 200), random_day(rng, 200, 400))),
+    ("get_free_cars_100", "get_free_cars",
+     lambda rng, c, i: ([rng.randrange(1, c["cars"] + 1) for _ in range(100)], random_day(rng, 0, 200),
+                        random_day(rng, 200, 210))),
+    ("get_cars_by_owner", "get_cars_by_owner", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_cars_with_review_stats", "get_cars_with_review_stats",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_user_by_email", "get_user_by_email", lambda rng, c, i: (user_email(rng, c),)),
+    ("get_user_by_id", "get_user_by_id", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_user_by_email_and_password", "get_user_by_email_and_password",
+     lambda rng, c, i: (lambda n: (f"user{n}@example.com", f"password{n}"))(rng.randrange(1, c["users"] + 1))),
+    ("get_balance", "get_balance", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_rental_history_for_renter", "get_rental_history_for_renter",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_rental_history_page", "get_rental_history_page",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1), 200)),
+    ("get_rental_history_for_owner", "get_rental_history_for_owner",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_messages", "get_messages", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_conversation_inbox", "get_conversation_inbox", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_conversation_page", "get_conversation_page", lambda rng, c, i: chat_pair(rng, c)),
+    ("get_conversation_since", "get_conversation_since",
+     lambda rng, c, i: chat_pair(rng, c) + (max(0, c["messages"] - 1000),)),
+    ("get_reviews_for_user", "get_reviews_for_user", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_user_rating_summary", "get_user_rating_summary", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("get_car_rating_summary", "get_car_rating_summary", lambda rng, c, i: (rng.randrange(1, c["cars"] + 1),)),
+    ("get_review_by_booking", "get_review_by_booking",
+     lambda rng, c, i: (rng.randrange(1, max(c["bookings"], 1) + 1),)),
+    # Streams are drained inside the timed call.
+    ("iter_cars_by_owner", "iter_cars_by_owner", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("iter_messages", "iter_messages", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("iter_rental_history_for_renter", "iter_rental_history_for_renter",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("iter_rental_history_for_owner", "iter_rental_history_for_owner",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    ("iter_reviews_for_user", "iter_reviews_for_user", lambda rng, c, i: (rng.randrange(1, c["users"] + 1),)),
+    # --- write cases ---
+    ("rent_car", "rent_car", rent_args),
+    ("add_balance", "add_balance", lambda rng, c, i: (rng.randrange(1, c["users"] + 1), 10.0)),
+    ("insert_message", "insert_message", lambda rng, c, i: chat_pair(rng, c) + ("benchmark message",)),
+    ("mark_conversation_read", "mark_conversation_read", lambda rng, c, i: chat_pair(rng, c)),
+    ("insert_car", "insert_car",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1), "Benchmark Car", 2024, 1000, rng.choice(datagen.CITIES),
+                        50.0, "2025-01-01 to 2026-12-31")),
+    ("update_car_price", "update_car_price", lambda rng, c, i: (rng.randrange(1, c["cars"] + 1), 75.0)),
+    ("update_car_availability", "update_car_availability",
+     lambda rng, c, i: (rng.randrange(1, c["cars"] + 1), f"{random_day(rng, 0, 200)} to {random_day(rng, 200, 540)}")),
+    ("insert_user", "insert_user",
+     lambda rng, c, i: (f"Benchmark User {i}", f"benchmark{i}@example.com", "password",
+                        "q1", "a1", "q2", "a2", "q3", "a3")),
+    ("update_user_password", "update_user_password",
+     lambda rng, c, i: (rng.randrange(1, c["users"] + 1), f"password{i}")),
+    ("insert_review", "insert_review", review_args),
+]
+WRITE_CASES_START = [name for name, _method, _args in CASES].index("rent_car")
+# Cases answered from DBManager.user_cache or search_cache; timed uncached, then as <name>_warm.
+CACHED_CASES = {"get_user_by_email", "get_user_by_id", "get_balance",
+                "search_cars", "search_cars_by_price_page", "search_cars_fts"}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def summarize(timings, rows):
+    timings = sorted(timings)
+    total = sum(timings)
+    return {
+        "iterations": len(timings),
+        "total_s": total,
+        "mean_ms": total * 1000 / len(timings),
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "max_ms": timings[-1] * 1000,
+        "ops_per_sec": len(timings) / total if total > 0 else 0.0,
+        "mean_rows": sum(rows) / len(rows) if rows else 0.0,
+    }
+
+
+def run_case(db_manager, name, method_name, make_args, counts, seed, iterations, time_budget):
+    """Call the method with seeded arguments until `iterations` calls or `time_budget` seconds."""
+    rng = random.Random(f"{seed}-{name}")
+    method = getattr(db_manager, method_name)
+    timings, rows = [], []
+    spent = 0.0
+    for iteration in range(iterations):
+        args = make_args(rng, counts, iteration)
+        started = time.perf_counter()
+        result = method(*args)
+        if isinstance(result, Iterator):
+            result = list(result)
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        if isinstance(result, list):
+            rows.append(len(result))
+        spent += elapsed
+        if spent > time_budget and iteration >= 4:
+            break
+    return summarize(timings, rows)
+
+
+def run_scale(total_rows, args, log=print):
+    counts = datagen.counts_for(total_rows)
+    pristine = os.path.join(args.data_dir, f"driveshare-{total_rows}-seed{args.seed}.db")
+    result = {"rows": total_rows, "counts": counts}
+    if args.regenerate and os.path.exists(pristine):
+        os.remove(pristine)
+    if not os.path.exists(pristine):
+        log(f"Generating {pristine}")
+        started = time.perf_counter()
+        datagen.generate(pristine, counts, seed=args.seed, log=log).close()
+        result["generate_seconds"] = time.perf_counter() - started
+
+    scratch = os.path.join(args.data_dir, f"scratch-{total_rows}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(scratch + suffix):
+            os.remove(scratch + suffix)
+    shutil.copyfile(pristine, scratch)
+
+    started = time.perf_counter()
+    db_manager = DBManager(scratch)
+    result["open_seconds"] = time.perf_counter() - started
+    started = time.perf_counter()
+    db_manager.get_availability_index()
+    result["availability_index_load_seconds"] = time.perf_counter() - started
+
+    uncached_manager = DBManager(scratch, user_cache_size=0, search_cache_size=0)
+    run_args = (counts, args.seed, args.iterations, args.time_budget)
+    cases = {}
+    for position, (name, method_name, make_args) in enumerate(CASES):
+        if args.only and not any(part in name for part in args.only):
+            continue
+        if args.read_only and position >= WRITE_CASES_START:
+            continue
+        runs = [(name, db_manager)]
+        if name in CACHED_CASES:
+            # Both runs and the warm-up draw the same arguments.
+            run_case(db_manager, name, method_name, make_args, counts, args.seed, args.iterations, float("inf"))
+            runs = [(name, uncached_manager), (f"{name}_warm", db_manager)]
+        for run_name, manager in runs:
+            cases[run_name] = stats = run_case(manager, name, method_name, make_args, *run_args)
+            log(f"  {run_name:32s} {stats['iterations']:5d} calls  p50 {stats['p50_ms']:9.3f} ms  "
+                f"p95 {stats['p95_ms']:9.3f} ms  {stats['ops_per_sec']:10,.0f} ops/s")
+    uncached_manager.close()
+    result["cases"] = cases
+    result["booking_stats"] = db_manager.get_booking_stats()
+    result["user_cache_stats"] = db_manager.get_user_cache_stats()
+    result["search_cache_stats"] = db_manager.get_search_cache_stats()
+    db_manager.close()
+    os.remove(scratch)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current, log=print):
+    """Print p50 ratios (current / previous) for every case present in both result files."""
+    log(f"Compared with {previous['meta'].get('commit')} ({previous['meta'].get('started')}):")
+    for scale, result in current["scales"].items():
+        old = previous["scales"].get(scale)
+        if old is None:
+            continue
+        log(f"  scale {scale}")
+        for name, stats in result["cases"].items():
+            old_stats = old["cases"].get(name)
+            if old_stats and old_stats["p50_ms"] > 0:
+                ratio = stats["p50_ms"] / old_stats["p50_ms"]
+                flag = "  slower" if ratio > 1.2 else ("  faster" if ratio < 0.8 else "")
+                log(f"    {name:32s} {old_stats['p50_ms']:9.3f} -> {stats['p50_ms']:9.3f} ms ({ratio:5.2f}x){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DBManager on generated datasets.")
+    parser.add_argument("--scales", default="10k,100k",
+                        help="comma-separated total row counts, e.g. 10k,100k,1m,10m (default: 10k,100k)")
+    parser.add_argument("--seed", type=int, default=0, help="dataset and argument seed (default: 0)")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per case (default: 200)")
+    parser.add_argument("--time-budget", type=float, default=2.0,
+                        help="seconds per case before stopping early (default: 2.0)")
+    parser.add_argument("--only", help="comma-separated substrings; run only matching cases")
+    parser.add_argument("--read-only", action="store_true", help="skip the write cases")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "driveshare-bench"),
+                        help="where generated datasets are cached")
+    parser.add_argument("--regenerate", action="store_true", help="regenerate cached datasets")
+    parser.add_argument("--output", default="benchmark-results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier JSON results file to compare against")
+    args = parser.parse_args(argv)
+    args.only = [part.strip() for part in args.only.split(",")] if args.only else None
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "iterations": args.iterations,
+        },
+        "scales": {},
+    }
+    for scale in args.scales.split(","):
+        total_rows = parse_scale(scale)
+        print(f"Scale {scale.strip()} ({total_rows:,} rows)")
+        results["scales"][scale.strip()] = run_scale(total_rows, args)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
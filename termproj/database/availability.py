@@ -0,0 +1,227 @@
+# database/availability.py
+"""
+In-memory availability index for car listings.
+
+Each car keeps two sorted-interval sets of day ordinals: the owner's availability
+window(s) and the dates already booked. Intervals are stored merged and sorted,
+so "does this range overlap a booking?" and "is this range inside the window?"
+are answered with a binary search instead of a scan over the car's bookings.
+DBManager owns one AvailabilityIndex and loads it on the first is_car_free / get_free_cars
+call. Later calls reload only the cars that the availability_changes log (written by
+triggers, so it sees every connection and process) names since the index's seq. Booking
+does not use the index: the overlap check inside the booking transaction seeks on a
+database index and needs no full load.
+"""
+import threading
+from bisect import bisect_right
+from datetime import datetime
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def parse_date(value):
+    """Convert a "YYYY-MM-DD" string to a day ordinal, or None if it cannot be parsed."""
+    try:
+        return datetime.strptime(value.strip(), DATE_FORMAT).toordinal()
+    except (AttributeError, ValueError):
+        return None
+
+
+def normalize_date(value):
+    """Rewrite a "YYYY-MM-DD" string zero-padded ("2025-7-1" -> "2025-07-01"), or None if it cannot be parsed."""
+    ordinal = parse_date(value)
+    return datetime.fromordinal(ordinal).strftime(DATE_FORMAT) if ordinal is not None else None
+
+
+def parse_availability(text):
+    """
+    Parse an availability string in the format "YYYY-MM-DD to YYYY-MM-DD".
+    Returns (start_ordinal, end_ordinal), or None if the string is missing or malformed.
+    """
+    if not text:
+        return None
+    parts = text.split(" to ")
+    if len(parts) != 2:
+        return None
+    start, end = parse_date(parts[0]), parse_date(parts[1])
+    if start is None or end is None or start > end:
+        return None
+    return start, end
+
+
+def normalize_availability(text):
+    """
+    Split an availability string into ("YYYY-MM-DD", "YYYY-MM-DD") for the
+    cars.available_from / cars.available_to columns, or (None, None) if it is malformed.
+    """
+    window = parse_availability(text)
+    if window is None:
+        return None, None
+    start, end = window
+    return (datetime.fromordinal(start).strftime(DATE_FORMAT),
+            datetime.fromordinal(end).strftime(DATE_FORMAT))
+
+
+class IntervalSet:
+    """
+    Sorted, merged set of closed [start, end] intervals of day ordinals.
+    Overlapping or touching intervals are merged on insert, so lookups need a
+    single binary search over the start points.
+    """
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, start, end):
+        i = bisect_right(self._starts, start)
+        # Merge with the interval before the insertion point if it touches.
+        if i > 0 and self._ends[i - 1] >= start - 1:
+            i -= 1
+            start = self._starts[i]
+            end = max(end, self._ends[i])
+        # Absorb every following interval that now touches the new one.
+        j = i
+        while j < len(self._starts) and self._starts[j] <= end + 1:
+            end = max(end, self._ends[j])
+            j += 1
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def overlaps(self, start, end):
+        """True if any stored interval shares at least one day with [start, end]."""
+        i = bisect_right(self._starts, end) - 1
+        return i >= 0 and self._ends[i] >= start
+
+    def covers(self, start, end):
+        """True if a single stored interval contains all of [start, end]."""
+        i = bisect_right(self._starts, start) - 1
+        return i >= 0 and self._ends[i] >= end
+
+
+class AvailabilityIndex:
+    """
+    Per-car availability windows and booked intervals.
+    Cars whose availability string cannot be parsed are tracked as unstructured;
+    window checks treat them as available, matching DBManager.search_cars.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._windows = {}
+        self._booked = {}
+        self._unstructured = set()
+        self.loaded = False
+        self.seq = 0  # the newest availability_changes row the index reflects
+
+    def load(self, car_rows, booking_rows, seq=0):
+        """
+        Rebuild the index from (car_id, availability) and (car_id, start_date, end_date) rows.
+        Only bookings with status 'Booked' should be passed in.
+        """
+        with self._lock:
+            self._windows.clear()
+            self._booked.clear()
+            self._unstructured.clear()
+            for car_id, availability in car_rows:
+                self._set_window(car_id, availability)
+            for car_id, start_date, end_date in booking_rows:
+                self._add_booking(car_id, start_date, end_date)
+            self.seq = seq
+            self.loaded = True
+
+    def reload_cars(self, car_ids, car_rows, booking_rows, seq):
+        """Replace what the index holds for car_ids with the given rows, shaped as in load()."""
+        with self._lock:
+            for car_id in car_ids:
+                self._windows.pop(car_id, None)
+                self._booked.pop(car_id, None)
+                self._unstructured.discard(car_id)
+            for car_id, availability in car_rows:
+                self._set_window(car_id, availability)
+            for car_id, start_date, end_date in booking_rows:
+                self._add_booking(car_id, start_date, end_date)
+            self.seq = seq
+
+    def reset(self):
+        """Drop everything; the owner reloads the index on next use."""
+        with self._lock:
+            self._windows.clear()
+            self._booked.clear()
+            self._unstructured.clear()
+            self.seq = 0
+            self.loaded = False
+
+    def set_window(self, car_id, availability):
+        with self._lock:
+            self._set_window(car_id, availability)
+
+    def add_booking(self, car_id, start_date, end_date):
+        with self._lock:
+            self._add_booking(car_id, start_date, end_date)
+
+    def _set_window(self, car_id, availability):
+        window = parse_availability(availability)
+        if window is None:
+            self._windows.pop(car_id, None)
+            self._unstructured.add(car_id)
+            return
+        self._unstructured.discard(car_id)
+        windows = IntervalSet()
+        windows.add(*window)
+        self._windows[car_id] = windows
+
+    def _add_booking(self, car_id, start_date, end_date):
+        start, end = parse_date(start_date), parse_date(end_date)
+        if start is None or end is None:
+            return
+        booked = self._booked.get(car_id)
+        if booked is None:
+            booked = self._booked[car_id] = IntervalSet()
+        booked.add(start, end)
+
+    def _within_window(self, car_id, start, end):
+        if car_id in self._unstructured:
+            return True
+        windows = self._windows.get(car_id)
+        return windows is not None and windows.covers(start, end)
+
+    def _is_booked(self, car_id, start, end):
+        booked = self._booked.get(car_id)
+        return booked is not None and booked.overlaps(start, end)
+
+    def within_window(self, car_id, start_date, end_date):
+        """True if [start_date, end_date] lies inside the car's availability window."""
+        start, end = parse_date(start_date), parse_date(end_date)
+        with self._lock:
+            if start is None or end is None:
+                return car_id in self._unstructured
+            return self._within_window(car_id, start, end)
+
+    def is_booked(self, car_id, start_date, end_date):
+        """True if [start_date, end_date] overlaps an existing booking of the car."""
+        start, end = parse_date(start_date), parse_date(end_date)
+        if start is None or end is None:
+            return False
+        with self._lock:
+            return self._is_booked(car_id, start, end)
+
+    def is_free(self, car_id, start_date, end_date):
+        """True if the car is inside its window and not booked for the whole range."""
+        return self.free_cars([car_id], start_date, end_date) == [car_id]
+
+    def free_cars(self, car_ids, start_date, end_date):
+        """
+        Return the subset of car_ids that are free for [start_date, end_date], in input order.
+        The dates are parsed once and each car costs two binary searches.
+        """
+        start, end = parse_date(start_date), parse_date(end_date)
+        if start is None or end is None or start > end:
+            return []
+        with self._lock:
+            return [car_id for car_id in car_ids
+                    if self._within_window(car_id, start, end) and not self._is_booked(car_id, start, end)]
@@ -0,0 +1,173 @@
+# database/booking_engine.py
+"""
+Concurrency-safe booking for DBManager.rent_car.
+
+The overlap check, the balance check, the debit and the booking insert run as one
+short write transaction opened with BEGIN IMMEDIATE, so no other connection (in this
+process or another) can book the same car between the check and the insert. When the
+database is locked past the connection's busy timeout, the whole transaction is retried
+with exponential backoff and jitter. Throughput and conflict/retry counters are kept
+for monitoring.
+"""
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from database.availability import normalize_date
+
+# Any 'Booked' booking of the car overlapping [start_date, end_date]; params (car_id, end_date, start_date).
+OVERLAP_SQL = """
+    SELECT 1 FROM bookings
+    WHERE car_id = ?
+      AND status = 'Booked'
+      AND start_date <= ?
+      AND end_date >= ?
+    LIMIT 1
+"""
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class BookingEngine:
+    def __init__(self, db_manager, max_retries=8, base_delay=0.005, max_delay=0.25):
+        """
+        - db_manager: the owning DBManager; its pool supplies the calling thread's connection.
+        - max_retries: how many times a busy transaction is retried before giving up.
+        - base_delay / max_delay: bounds in seconds of the exponential backoff between retries.
+        """
+        self.db_manager = db_manager
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters = {
+                "attempts": 0,
+                "booked": 0,
+                "conflicts": 0,
+                "insufficient_funds": 0,
+                "rejected": 0,
+                "retries": 0,
+                "busy_failures": 0,
+            }
+            self._transaction_seconds = 0.0
+            self._started = time.perf_counter()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self):
+        """
+        Return the counters plus 'elapsed_seconds', 'bookings_per_second' (since the last
+        reset) and 'avg_transaction_ms' (time spent inside the write transaction per booking).
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            elapsed = time.perf_counter() - self._started
+            transaction_seconds = self._transaction_seconds
+        stats["elapsed_seconds"] = elapsed
+        stats["bookings_per_second"] = stats["booked"] / elapsed if elapsed > 0 else 0.0
+        stats["avg_transaction_ms"] = (transaction_seconds * 1000 / stats["booked"]) if stats["booked"] else 0.0
+        return stats
+
+    def book(self, car_id, renter_id, start_date, end_date):
+        """
+        Book the car for [start_date, end_date] and debit the renter.
+        Returns (bool, str) exactly like DBManager.rent_car.
+        """
+        self._count("attempts")
+        # Bookings are stored and compared as zero-padded strings, so the overlap check's
+        # string comparison orders them like dates.
+        start_date, end_date = normalize_date(start_date), normalize_date(end_date)
+        if start_date is None or end_date is None:
+            self._count("rejected")
+            return False, "Dates must be in YYYY-MM-DD format."
+        rental_days = (datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")).days + 1
+        if rental_days < 1:
+            self._count("rejected")
+            return False, "End date must not be before start date."
+
+        conn = self.db_manager.conn
+        if conn.in_transaction:
+            # A write on this thread failed without rolling back; BEGIN IMMEDIATE would raise,
+            # and the open transaction may be holding the write lock.
+            conn.rollback()
+        for attempt in range(self.max_retries + 1):
+            try:
+                started = time.perf_counter()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    outcome, message, booking = self._book_in_transaction(
+                        conn, car_id, renter_id, start_date, end_date, rental_days
+                    )
+                    if outcome == "booked":
+                        conn.commit()
+                    else:
+                        conn.rollback()
+                except BaseException:
+                    conn.rollback()
+                    raise
+                with self._lock:
+                    self._transaction_seconds += time.perf_counter() - started
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e):
+                    raise
+                if attempt == self.max_retries:
+                    self._count("busy_failures")
+                    return False, "The booking system is busy. Please try again."
+                self._count("retries")
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                time.sleep(random.uniform(0, delay))
+                continue
+
+            if outcome != "booked":
+                self._count(outcome)
+                return False, message
+            self._count("booked")
+            self.db_manager.on_booking_committed(*booking)
+            return True, message
+
+    def _book_in_transaction(self, conn, car_id, renter_id, start_date, end_date, rental_days):
+        """
+        Runs inside BEGIN IMMEDIATE. Returns (outcome, message, booking) where outcome is
+        'booked', 'conflicts', 'insufficient_funds' or 'rejected', and booking is
+        (booking_id, car_id, renter_id, owner_id, start_date, end_date) on success.
+        """
+        cur = conn.cursor()
+        cur.execute("SELECT car_id, owner_id, price_per_day FROM cars WHERE car_id=?", (car_id,))
+        car = cur.fetchone()
+        if not car:
+            return "rejected", "Car not found.", None
+
+        # Check for overlapping bookings
+        cur.execute(OVERLAP_SQL, (car_id, end_date, start_date))
+        if cur.fetchone():
+            return "conflicts", "Car is already booked for the selected period.", None
+
+        total_price = rental_days * car["price_per_day"]
+        cur.execute("SELECT balance FROM users WHERE user_id=?", (renter_id,))
+        row = cur.fetchone()
+        balance = row["balance"] if row else 0.0
+        if balance < total_price:
+            return "insufficient_funds", "Insufficient balance. Please add funds.", None
+
+        # Deduct rental cost and create a booking
+        cur.execute("UPDATE users SET balance = balance - ? WHERE user_id=?", (total_price, renter_id))
+        cur.execute("""
+            INSERT INTO bookings(car_id, renter_id, start_date, end_date, status)
+            VALUES (?, ?, ?, ?, ?)
+        """, (car["car_id"], renter_id, start_date, end_date, "Booked"))
+        booking_id = cur.lastrowid
+        reviewee_id = car["owner_id"]
+        message = (f"Rental successful!\nBooking ID: {booking_id}\nReviewee ID: {reviewee_id}\n"
+                   f"Total Cost: ${total_price:.2f}")
+        return "booked", message, (booking_id, car["car_id"], renter_id, reviewee_id, start_date, end_date)
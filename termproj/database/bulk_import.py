@@ -0,0 +1,302 @@
+# database/bulk_import.py
+"""
+Streaming bulk importer for car fleets, users and historical bookings.
+
+Records are read lazily from CSV or JSONL files, validated one by one (cars go
+through CarBuilder), and written with executemany in batched transactions instead
+of one commit per row. Imported 'Booked' bookings must not overlap a 'Booked' booking
+of the same car, whether already in the database or earlier in the file. For large loads the target table's secondary indexes (and,
+for cars, the full-text trigger) are dropped first and rebuilt once at the end.
+
+Usage (from termproj/):
+    python -m database.bulk_import cars fleet.csv --db driveshare.db
+    python -m database.bulk_import users users.jsonl --batch-size 10000
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import time
+from itertools import islice
+
+from database.availability import normalize_availability, normalize_date
+from database.db_manager import DBManager
+from patterns.builder import CarBuilder
+
+USER_FIELDS = ("name", "email", "password", "security_q1", "security_a1",
+               "security_q2", "security_a2", "security_q3", "security_a3")
+BOOKING_STATUSES = ("Booked", "Completed", "Cancelled")
+
+
+def read_records(path, fmt=None):
+    """
+    Yield (line_number, record_dict) from a CSV file with a header row or a JSONL file.
+    The format is taken from the file extension unless fmt is "csv" or "jsonl".
+    Malformed JSONL lines are yielded as (line_number, None).
+    """
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            # Line 1 is the header.
+            for line_number, record in enumerate(csv.DictReader(f), start=2):
+                yield line_number, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _text(record, field):
+    value = record.get(field)
+    if value is None or str(value).strip() == "":
+        raise ValueError(f"missing {field}")
+    return str(value).strip()
+
+
+def car_row(record):
+    """Validate a car record through CarBuilder and return the cars INSERT parameters."""
+    try:
+        car = (CarBuilder()
+               .set_owner_id(int(_text(record, "owner_id")))
+               .set_model(_text(record, "model"))
+               .set_year(int(_text(record, "year")))
+               .set_mileage(int(_text(record, "mileage")))
+               .set_location(_text(record, "location"))
+               .set_price_per_day(float(_text(record, "price_per_day")))
+               .set_availability((record.get("availability") or "").strip() or None)
+               .validate()
+               .build())
+    except (TypeError, AttributeError) as e:
+        raise ValueError(str(e))
+    available_from, available_to = normalize_availability(car.availability)
+    return (car.owner_id, car.model, car.year, car.mileage, car.location, car.price_per_day,
+            car.availability, available_from, available_to)
+
+
+def user_row(record):
+    """
+    Validate a user record and return the users INSERT parameters. The email is stored
+    as given, since insert_user and login compare emails exactly.
+    """
+    values = tuple(_text(record, field) for field in USER_FIELDS)
+    if "@" not in values[1]:
+        raise ValueError(f"invalid email: {values[1]!r}")
+    balance = float(record.get("balance") or 0.0)
+    return values + (balance,)
+
+
+def booking_row(record):
+    """Validate a historical booking record and return the bookings INSERT parameters."""
+    car_id = int(_text(record, "car_id"))
+    renter_id = int(_text(record, "renter_id"))
+    # Stored zero-padded, like rent_car's bookings, so the string overlap check sees them.
+    start_date = normalize_date(_text(record, "start_date"))
+    end_date = normalize_date(_text(record, "end_date"))
+    if start_date is None or end_date is None:
+        raise ValueError("dates must be in YYYY-MM-DD format")
+    if start_date > end_date:
+        raise ValueError("start_date is after end_date")
+    status = (record.get("status") or "Completed").strip()
+    if status not in BOOKING_STATUSES:
+        raise ValueError(f"invalid status: {status!r}")
+    return car_id, renter_id, start_date, end_date, status
+
+
+IMPORTS = {
+    "cars": ("cars", car_row, """
+        INSERT INTO cars(owner_id, model, year, mileage, location, price_per_day, availability,
+                         available_from, available_to)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """),
+    "users": ("users", user_row, """
+        INSERT INTO users(name, email, password, security_q1, security_a1, security_q2,
+                          security_a2, security_q3, security_a3, balance)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """),
+    "bookings": ("bookings", booking_row, """
+        INSERT INTO bookings(car_id, renter_id, start_date, end_date, status)
+        VALUES (?, ?, ?, ?, ?)
+    """),
+}
+
+
+class BookedIntervals:
+    """
+    The 'Booked' date ranges per car, as zero-padded "YYYY-MM-DD" strings, that imported
+    bookings must not overlap.
+    """
+
+    def __init__(self, conn):
+        self._by_car = {}
+        for car_id, start_date, end_date in conn.execute(
+                "SELECT car_id, start_date, end_date FROM bookings WHERE status = 'Booked'"):
+            start_date, end_date = normalize_date(start_date), normalize_date(end_date)
+            if start_date is not None and end_date is not None:
+                self._by_car.setdefault(car_id, []).append((start_date, end_date))
+
+    def claim(self, row):
+        """Record a booking_row() result, or raise ValueError if it is 'Booked' and overlaps one already held."""
+        car_id, _renter_id, start_date, end_date, status = row
+        if status != "Booked":
+            return
+        intervals = self._by_car.setdefault(car_id, [])
+        for other_start, other_end in intervals:
+            if other_start <= end_date and other_end >= start_date:
+                raise ValueError(f"overlaps the booking of car {car_id} from {other_start} to {other_end}")
+        intervals.append((start_date, end_date))
+
+
+class ImportReport:
+    def __init__(self, kind, max_rejects_kept=1000):
+        self.kind = kind
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rows_rejected = 0
+        self.rejected = []  # (line_number, reason), capped at max_rejects_kept
+        self.max_rejects_kept = max_rejects_kept
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def reject(self, line_number, reason):
+        self.rows_rejected += 1
+        if len(self.rejected) < self.max_rejects_kept:
+            self.rejected.append((line_number, reason))
+
+    @property
+    def rows_per_second(self):
+        return self.rows_imported / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.kind}: {self.rows_imported} imported, {self.rows_rejected} rejected "
+                f"of {self.rows_read} read in {self.elapsed:.2f}s ({self.rows_per_second:,.0f} rows/sec)")
+
+
+class BulkImporter:
+    def __init__(self, db_manager, batch_size=5000, defer_indexes=True):
+        """
+        - batch_size: rows written per executemany / transaction.
+        - defer_indexes: drop the target table's secondary indexes during the load and
+          rebuild them once afterwards.
+        """
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.defer_indexes = defer_indexes
+
+    def import_cars(self, path, fmt=None):
+        return self.import_file("cars", path, fmt)
+
+    def import_users(self, path, fmt=None):
+        return self.import_file("users", path, fmt)
+
+    def import_bookings(self, path, fmt=None):
+        return self.import_file("bookings", path, fmt)
+
+    def import_file(self, kind, path, fmt=None):
+        return self.import_records(kind, read_records(path, fmt))
+
+    def import_records(self, kind, records):
+        """Import (line_number, record) pairs of the given kind. Returns an ImportReport."""
+        table, to_row, insert_sql = IMPORTS[kind]
+        report = ImportReport(kind)
+        conn = self.db_manager.conn
+        defer_fts = table == "cars" and self.db_manager.fts_enabled
+        first_new_id = self._max_rowid(conn, table) + 1
+        # Loaded before the indexes are dropped; holds the rows accepted so far as well.
+        booked = BookedIntervals(conn) if table == "bookings" else None
+        if self.defer_indexes:
+            self.db_manager.drop_indexes(table)
+        if defer_fts:
+            conn.execute("DROP TRIGGER IF EXISTS cars_fts_insert")
+            conn.commit()
+        try:
+            for chunk in chunked(records, self.batch_size):
+                rows = []
+                for line_number, record in chunk:
+                    report.rows_read += 1
+                    if not isinstance(record, dict):
+                        report.reject(line_number, "malformed record")
+                        continue
+                    try:
+                        row = to_row(record)
+                        if booked is not None:
+                            booked.claim(row)
+                        rows.append((line_number, row))
+                    except ValueError as e:
+                        report.reject(line_number, str(e))
+                self._write_batch(conn, insert_sql, rows, report)
+        finally:
+            if defer_fts:
+                conn.execute("""
+                    INSERT INTO cars_fts(rowid, model, location)
+                    SELECT car_id, model, location FROM cars WHERE car_id >= ?
+                """, (first_new_id,))
+                conn.commit()
+                self.db_manager.create_search_index()
+            if self.defer_indexes:
+                self.db_manager.create_indexes()
+            self.db_manager.on_bulk_import(table)
+            report.elapsed = time.perf_counter() - report.started
+        return report
+
+    def _write_batch(self, conn, insert_sql, rows, report):
+        if not rows:
+            return
+        try:
+            conn.executemany(insert_sql, [row for _line, row in rows])
+            conn.commit()
+            report.rows_imported += len(rows)
+        except sqlite3.IntegrityError:
+            # Some row violates a constraint (e.g. a duplicate email); redo the batch row
+            # by row inside one transaction so only the offending rows are rejected.
+            conn.rollback()
+            for line_number, row in rows:
+                try:
+                    conn.execute(insert_sql, row)
+                    report.rows_imported += 1
+                except sqlite3.IntegrityError as e:
+                    report.reject(line_number, str(e))
+            conn.commit()
+
+    @staticmethod
+    def _max_rowid(conn, table):
+        return conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import DriveShare data without starting the UI.")
+    parser.add_argument("kind", choices=sorted(IMPORTS), help="what the file contains")
+    parser.add_argument("path", help="CSV (with header) or JSONL file")
+    parser.add_argument("--db", default="driveshare.db", help="database file (default: driveshare.db)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="override the format guessed from the extension")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per transaction (default: 5000)")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="maintain indexes row by row instead of rebuilding them after the load")
+    parser.add_argument("--show-rejects", type=int, default=20, help="rejected rows to print (default: 20)")
+    args = parser.parse_args(argv)
+
+    db_manager = DBManager(args.db)
+    importer = BulkImporter(db_manager, batch_size=args.batch_size, defer_indexes=not args.keep_indexes)
+    report = importer.import_file(args.kind, args.path, args.format)
+    print(report.summary())
+    for line_number, reason in report.rejected[:args.show_rejects]:
+        print(f"  line {line_number}: {reason}")
+    db_manager.close()
+    return 0 if report.rows_rejected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
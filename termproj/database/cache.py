@@ -0,0 +1,124 @@
+# database/cache.py
+"""
+Bounded read-through cache used by DBManager for user and balance lookups, and by
+SearchCache for car search results.
+
+Entries are evicted least-recently-used once max_size is reached and expire after
+ttl seconds, which bounds how stale a value can get when another process writes
+to the same database file. DBManager's own writes invalidate the affected keys
+immediately. Hit/miss counters show how much load the cache takes off SQLite.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, max_size=1024, ttl=30.0, clock=time.monotonic, sizeof=None):
+        """
+        - max_size: entries kept before the least recently used one is evicted; 0 disables caching.
+        - ttl: seconds an entry stays valid; None keeps entries until evicted or invalidated.
+        - sizeof: optional callable estimating a value's size in bytes; when given, stats()
+          also reports the total as 'bytes'.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value, size)
+        self._bytes = 0
+        # Bumped by every invalidation. A loader reads it before querying and passes it to
+        # put(), so a value read before a concurrent write is not cached after that write.
+        self.version = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key, default=None):
+        """Return the cached value, or default if the key is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value, _size = entry
+                if expires_at is None or expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return value
+                self._remove(key)
+                self._counters["expired"] += 1
+            self._counters["misses"] += 1
+            return default
+
+    def put(self, key, value, version=None):
+        """Cache value under key; with version, only if no invalidation happened since it was read."""
+        if self.max_size <= 0:
+            return  # caching disabled
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            expires_at = None if self.ttl is None else self.clock() + self.ttl
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() and caching its result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            version = self.version
+            value = loader()
+            self.put(key, value, version)
+        return value
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    self._counters["invalidations"] += 1
+
+    def invalidate_where(self, predicate):
+        """Drop every entry for which predicate(key, value) is true. Returns how many were dropped."""
+        with self._lock:
+            self.version += 1
+            doomed = [key for key, (_expires_at, value, _size) in self._entries.items() if predicate(key, value)]
+            for key in doomed:
+                self._remove(key)
+            self._counters["invalidations"] += len(doomed)
+        return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._counters["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Return the counters plus 'size', 'hit_rate' (hits / lookups) and, with sizeof, 'bytes'."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._entries)
+            if self.sizeof is not None:
+                stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,101 @@
+# database/connection_pool.py
+"""
+Per-thread SQLite connections for DBManager.
+
+sqlite3 connections must not be shared between threads, so the pool hands each
+thread its own connection, opened on first use and configured the same way:
+WAL journaling (readers run concurrently with the single writer), a busy timeout
+instead of failing immediately on a locked database, and sqlite3.Row rows.
+"""
+import sqlite3
+import threading
+import time
+
+from database.instrumentation import InstrumentedConnection
+
+
+class ConnectionPool:
+    def __init__(self, db_name, busy_timeout=5.0, wal=True, query_stats=None):
+        """
+        - db_name: path of the SQLite database file.
+        - busy_timeout: seconds a connection waits on a locked database before raising.
+        - wal: switch the database to write-ahead logging.
+        - query_stats: a QueryStats registry; when given, connections are opened as
+          InstrumentedConnection and report every statement to it.
+        """
+        self.db_name = db_name
+        self.busy_timeout = busy_timeout
+        self.wal = wal
+        self.query_stats = query_stats
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread -> connection, so close_all() can reach every one
+
+    def connection(self):
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def _open(self):
+        # check_same_thread is off only so close_all() may close other threads' connections;
+        # each connection is otherwise used by the thread that opened it.
+        if self.query_stats is not None:
+            conn = sqlite3.connect(self.db_name, timeout=self.busy_timeout, check_same_thread=False,
+                                   factory=InstrumentedConnection)
+            conn.query_stats = self.query_stats
+        else:
+            conn = sqlite3.connect(self.db_name, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable dict-like row access
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        if self.wal:
+            self._enable_wal(conn)
+            conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _enable_wal(self, conn):
+        # Switching a rollback-journal database to WAL needs an exclusive lock and SQLite
+        # reports SQLITE_BUSY without calling the busy handler, so retry up to busy_timeout
+        # when several processes open a new database at once.
+        deadline = time.monotonic() + self.busy_timeout
+        delay = 0.001
+        while True:
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e).lower() or time.monotonic() >= deadline:
+                    raise
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def _prune_dead_threads(self):
+        for thread in [t for t in self._connections if not t.is_alive()]:
+            self._connections.pop(thread).close()
+
+    def close_current(self):
+        """Close the calling thread's connection, if it has one."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                self._connections.pop(threading.current_thread(), None)
+            conn.close()
+
+    def close_all(self):
+        """Close every connection the pool has opened."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def size(self):
+        with self._lock:
+            return len(self._connections)
@@ -1,16 +1,286 @@
+import atexit
+import os
+import re
 import sqlite3
+import threading
 from datetime import datetime
+from database.availability import AvailabilityIndex, normalize_availability
+from database.booking_engine import OVERLAP_SQL, BookingEngine
+from database.cache import LRUCache
+from database.connection_pool import ConnectionPool
+from database.instrumentation import QueryStats
+from database.migrations import LATEST_VERSION, run_migrations, schema_version
+from database.search_cache import SearchCache, fts_key, like_key
+from models.booking import Booking
+from models.car import Car
+from models.message import Message
+from models.review import Review
+from models.user import User
+
+# Secondary indexes for the hot lookups. Indexes added to this list also need a
+# migration in database/migrations.py so existing databases pick them up.
+INDEXES = [
+    ("idx_cars_owner", "cars", "owner_id"),
+    ("idx_cars_location_mileage", "cars", "location, mileage"),
+    ("idx_bookings_car_status_dates", "bookings", "car_id, status, start_date, end_date"),
+    ("idx_bookings_renter", "bookings", "renter_id"),
+    ("idx_messages_sender_receiver_ts", "messages", "sender_id, receiver_id, timestamp"),
+    ("idx_messages_receiver_ts", "messages", "receiver_id, timestamp"),
+    ("idx_messages_sender_receiver_id", "messages", "sender_id, receiver_id, message_id"),
+    ("idx_reviews_reviewee", "reviews", "reviewee_id"),
+]
+
+# Column lists matching each model's FIELDS, so rows can be built with Model.from_row.
+CAR_COLUMNS = Car.select_columns()
+USER_COLUMNS = User.select_columns()
+BOOKING_COLUMNS = Booking.select_columns()
+MESSAGE_COLUMNS = Message.select_columns()
+REVIEW_COLUMNS = Review.select_columns()
+
+# Newest availability_changes rows kept; an availability index further behind reloads in full.
+AVAILABILITY_CHANGES_KEPT = 10000
+# Car ids per IN (...) list when reloading changed cars into the availability index.
+AVAILABILITY_RELOAD_CHUNK = 500
+
+# Rating summaries kept current by triggers on reviews: (table, key column, expression
+# giving the summarized key for a review row, where {row} is NEW or OLD).
+RATING_SUMMARIES = [
+    ("user_rating_summary", "user_id", "{row}.reviewee_id"),
+    ("car_rating_summary", "car_id", "(SELECT car_id FROM bookings WHERE booking_id = {row}.booking_id)"),
+]
+
+# Columns search_cars may sort by; None is the default listing order.
+SEARCH_ORDERS = {
+    None: "car_id ASC",
+    "price": "price_per_day ASC, car_id ASC",
+    "mileage": "mileage ASC, car_id ASC",
+}
+
+# SQL of the hot queries. The methods run these strings and check_index_usage()
+# explains the same ones, so a query cannot change without its plan being checked.
+MESSAGES_FOR_RECEIVER_SQL = f"SELECT {MESSAGE_COLUMNS} FROM messages WHERE receiver_id=?"
+
+# Only the partner columns the inbox shows; never the password or security answers.
+CONVERSATION_INBOX_SQL = """
+    SELECT u.user_id, u.name, u.email,
+           m.last_message_id,
+           m.last_timestamp,
+           m.last_preview,
+           m.unread_count
+    FROM (
+        SELECT c.partner_id,
+               MAX(c.message_id) AS last_message_id,
+               c.timestamp AS last_timestamp,
+               substr(c.content, 1, ?) AS last_preview,
+               SUM(c.sender_id = c.partner_id
+                   AND c.message_id > COALESCE(r.last_read_message_id, 0)) AS unread_count
+        FROM (
+            SELECT CASE WHEN sender_id = ? THEN receiver_id ELSE sender_id END AS partner_id,
+                   message_id, sender_id, content, timestamp
+            FROM messages
+            WHERE sender_id = ? OR receiver_id = ?
+        ) c
+        LEFT JOIN message_reads r ON r.user_id = ? AND r.partner_id = c.partner_id
+        GROUP BY c.partner_id
+    ) m
+    JOIN users u ON u.user_id = m.partner_id
+    ORDER BY m.last_timestamp DESC, m.last_message_id DESC
+    LIMIT ? OFFSET ?
+"""
+
+# Each direction seeks on (sender_id, receiver_id, message_id); params per direction
+# (sender_id, receiver_id, after_message_id).
+_CONVERSATION_SINCE_DIRECTION = f"""
+    SELECT {MESSAGE_COLUMNS} FROM messages
+    WHERE sender_id = ? AND receiver_id = ? AND message_id > ?
+"""
+CONVERSATION_SINCE_SQL = (f"{_CONVERSATION_SINCE_DIRECTION} UNION ALL {_CONVERSATION_SINCE_DIRECTION} "
+                          "ORDER BY message_id ASC")
+
+
+def _conversation_page_sql(keyset):
+    # Each direction is cut to `limit` rows on the (sender_id, receiver_id, timestamp)
+    # index before the two are merged; params per direction (sender_id, receiver_id,
+    # [timestamp, message_id,] limit), then the overall limit.
+    one_direction = f"""
+        SELECT * FROM (
+            SELECT {MESSAGE_COLUMNS} FROM messages
+            WHERE sender_id = ? AND receiver_id = ? {keyset}
+            ORDER BY timestamp DESC, message_id DESC
+            LIMIT ?
+        )
+    """
+    return f"{one_direction} UNION ALL {one_direction} ORDER BY timestamp DESC, message_id DESC LIMIT ?"
+
+
+CONVERSATION_PAGE_SQL = _conversation_page_sql("")
+CONVERSATION_PAGE_BEFORE_SQL = _conversation_page_sql("AND (timestamp, message_id) < (?, ?)")
+
+CARS_BY_OWNER_SQL = f"SELECT {CAR_COLUMNS} FROM cars WHERE owner_id=?"
+
+CARS_WITH_REVIEW_STATS_SQL = """
+    SELECT c.*,
+           COALESCE(s.review_count, 0) AS review_count,
+           COALESCE(s.avg_rating, 0) AS avg_rating
+    FROM cars c
+    LEFT JOIN car_rating_summary s ON s.car_id = c.car_id
+    WHERE c.owner_id = ? AND c.car_id > ?
+    ORDER BY c.car_id
+    LIMIT ?
+"""
+
+# A leading-wildcard LIKE cannot seek, so filter over the narrow covering index
+# first and only read the full rows for the matching car_ids. {order} is a SEARCH_ORDERS value.
+SEARCH_CARS_SQL = f"""
+    SELECT {CAR_COLUMNS} FROM cars
+    WHERE car_id IN (
+        SELECT car_id FROM cars WHERE location LIKE ? AND mileage <= ?
+    )
+      AND ((available_from <= ? AND available_to >= ?)
+           OR (? AND available_from IS NULL))
+    ORDER BY {{order}}
+    LIMIT ? OFFSET ?
+"""
+
+SEARCH_CARS_FTS_SQL = f"""
+    SELECT {Car.select_columns("c")}
+    FROM cars_fts f
+    JOIN cars c ON c.car_id = f.rowid
+    WHERE cars_fts MATCH ?
+      AND c.mileage <= ?
+      AND ((c.available_from <= ? AND c.available_to >= ?)
+           OR (? AND c.available_from IS NULL))
+    ORDER BY f.rank
+    LIMIT ? OFFSET ?
+"""
+
+RENTAL_HISTORY_FOR_RENTER_SQL = f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE renter_id=?"
+
+RENTAL_HISTORY_PAGE_SQL = f"""
+    SELECT {BOOKING_COLUMNS} FROM bookings
+    WHERE renter_id = ? AND booking_id > ?
+    ORDER BY booking_id
+    LIMIT ?
+"""
+
+RENTAL_HISTORY_FOR_OWNER_SQL = f"""
+    SELECT {Booking.select_columns("b")}
+    FROM bookings b
+    JOIN cars c ON b.car_id = c.car_id
+    WHERE c.owner_id = ?
+"""
+
+REVIEWS_FOR_USER_SQL = f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE reviewee_id=?"
+
+# (method, indexes its plan must use, SQL, sample parameters) for check_index_usage().
+# An index given as a tuple may be any one of the names in it.
+INDEX_CHECKS = [
+    ("get_messages", ("idx_messages_receiver_ts",), MESSAGES_FOR_RECEIVER_SQL, (1,)),
+    # Either (sender_id, receiver_id, ...) index serves the sender_id half of the OR.
+    ("get_conversation_inbox", (("idx_messages_sender_receiver_ts", "idx_messages_sender_receiver_id"),
+                                "idx_messages_receiver_ts"),
+     CONVERSATION_INBOX_SQL, (60, 1, 1, 1, 1, -1, 0)),
+    ("get_conversation_since", ("idx_messages_sender_receiver_id",), CONVERSATION_SINCE_SQL, (1, 2, 0, 2, 1, 0)),
+    ("get_conversation_page", ("idx_messages_sender_receiver_ts",), CONVERSATION_PAGE_SQL, (1, 2, 50, 2, 1, 50, 50)),
+    ("get_conversation_page(before)", ("idx_messages_sender_receiver_ts",), CONVERSATION_PAGE_BEFORE_SQL,
+     (1, 2, "9999", 0, 50, 2, 1, "9999", 0, 50, 50)),
+    ("get_cars_by_owner", ("idx_cars_owner",), CARS_BY_OWNER_SQL, (1,)),
+    ("get_cars_with_review_stats", ("idx_cars_owner",), CARS_WITH_REVIEW_STATS_SQL, (1, 0, -1)),
+    ("search_cars", ("idx_cars_location_mileage",), SEARCH_CARS_SQL.format(order=SEARCH_ORDERS[None]),
+     ("%a%", 1, "2025-01-01", "2025-01-01", 1, -1, 0)),
+    ("rent_car", ("idx_bookings_car_status_dates",), OVERLAP_SQL, (1, "2025-01-02", "2025-01-01")),
+    ("get_rental_history_for_renter", ("idx_bookings_renter",), RENTAL_HISTORY_FOR_RENTER_SQL, (1,)),
+    ("get_rental_history_page", ("idx_bookings_renter",), RENTAL_HISTORY_PAGE_SQL, (1, 0, 200)),
+    ("get_rental_history_for_owner", ("idx_cars_owner", "idx_bookings_car_status_dates"),
+     RENTAL_HISTORY_FOR_OWNER_SQL, (1,)),
+    ("get_reviews_for_user", ("idx_reviews_reviewee",), REVIEWS_FOR_USER_SQL, (1,)),
+]
+# Only checked when the FTS5 index exists.
+FTS_INDEX_CHECK = ("search_cars_fts", ("VIRTUAL TABLE INDEX",), SEARCH_CARS_FTS_SQL,
+                   ('"a"*', 1, "2025-01-01", "2025-01-01", 1, -1, 0))
 
 class DBManager:
-    def __init__(self, db_name='driveshare.db'):
-        self.conn = sqlite3.connect(db_name)
-        self.conn.row_factory = sqlite3.Row  # Enable dict-like row access
-        self.cursor = self.conn.cursor()
+    def __init__(self, db_name='driveshare.db', busy_timeout=5.0, wal=True, fetch_batch_size=500,
+                 user_cache_size=1024, user_cache_ttl=30.0, instrument=None, slow_query_ms=100.0,
+                 report_at_exit=None, migration_chunk_size=10000, search_cache_size=256,
+                 search_cache_ttl=30.0):
+        """
+        Every thread that calls into DBManager gets its own connection from the pool, and
+        every method uses a short-lived cursor, so queries may run off the GUI thread.
+        - busy_timeout: seconds to wait on a locked database before raising.
+        - wal: use write-ahead logging so reads run concurrently with the single writer.
+        - fetch_batch_size: default rows per fetchmany() for the iter_* streaming methods.
+        - user_cache_size / user_cache_ttl: bounds of the read-through cache in front of
+          get_user_by_email, get_user_by_id and get_balance; a size of 0 disables it.
+        - instrument: record per-statement counts, latency and rows in self.query_stats
+          (see database/instrumentation.py). None means on if DRIVESHARE_SQL_STATS is set.
+        - slow_query_ms: with instrumentation on, statements slower than this are logged
+          together with their EXPLAIN QUERY PLAN.
+        - report_at_exit: print query_report() when the interpreter exits. None means on
+          whenever instrumentation is on.
+        - migration_chunk_size: rows per committed chunk when a schema migration backfills
+          an existing table (see database/migrations.py).
+        - search_cache_size / search_cache_ttl: bounds of the result cache in front of
+          search_cars and search_cars_fts (see database/search_cache.py); 0 disables it.
+        """
+        self.db_name = db_name
+        self.migration_chunk_size = migration_chunk_size
+        self.fetch_batch_size = fetch_batch_size
+        if instrument is None:
+            instrument = bool(os.environ.get("DRIVESHARE_SQL_STATS"))
+        self.query_stats = QueryStats(slow_query_ms=slow_query_ms) if instrument else None
+        if self.query_stats is not None and (report_at_exit is None or report_at_exit):
+            atexit.register(lambda: print(self.query_report()))
+        self.pool = ConnectionPool(db_name, busy_timeout=busy_timeout, wal=wal, query_stats=self.query_stats)
+        self.availability = AvailabilityIndex()
+        self._availability_lock = threading.Lock()  # one load or refresh of the index at a time
+        self.booking_engine = BookingEngine(self)
+        # Optional patterns.observer.BookingSubject told about every committed booking;
+        # give it an AsyncDispatcher so observers never run on the booking thread.
+        self.booking_events = None
+        # Keys: ("email", email) -> user_id or None, ("user", user_id) -> User or None,
+        # ("balance", user_id) -> float.
+        self.user_cache = LRUCache(max_size=user_cache_size, ttl=user_cache_ttl)
+        self.search_cache = SearchCache(max_size=search_cache_size, ttl=search_cache_ttl)
+        self.fts_enabled = False
         self.setup_tables()
 
+    @property
+    def conn(self):
+        """The calling thread's connection."""
+        return self.pool.connection()
+
+    def close(self):
+        """Close every pooled connection."""
+        self.pool.close_all()
+
+    def get_query_stats(self):
+        """Per-statement counters from the instrumentation layer ({} when it is off)."""
+        return self.query_stats.snapshot() if self.query_stats is not None else {}
+
+    def query_report(self, top=20):
+        """A printable summary of the slowest statements by total time."""
+        if self.query_stats is None:
+            return "SQL instrumentation is off (DBManager(instrument=True) or DRIVESHARE_SQL_STATS=1)."
+        return self.query_stats.report(top)
+
     def setup_tables(self):
+        """
+        Bring the schema up to date through the migrations in database/migrations.py.
+        On a warm start (schema already current) this reads PRAGMA user_version and
+        sqlite_master once each and runs no DDL.
+        """
+        if schema_version(self.conn) < LATEST_VERSION:
+            run_migrations(self, self.migration_chunk_size)
+        cur = self.conn.cursor()
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cars_fts'")
+        # Stays False when this SQLite build lacks FTS5 and the search migration was skipped.
+        self.fts_enabled = cur.fetchone() is not None
+
+    def create_base_tables(self):
+        cur = self.conn.cursor()
         # USERS TABLE: Stores registration and authentication details, the user's name, and balance.
-        self.cursor.execute("""
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 user_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
@@ -26,7 +296,7 @@ class DBManager:
             );
         """)
         # CARS TABLE: Stores car listing details.
-        self.cursor.execute("""
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS cars (
                 car_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 owner_id INTEGER NOT NULL,
@@ -36,11 +306,13 @@ class DBManager:
                 location TEXT NOT NULL,
                 price_per_day REAL NOT NULL,
                 availability TEXT,
+                available_from TEXT,
+                available_to TEXT,
                 FOREIGN KEY (owner_id) REFERENCES users(user_id)
             );
         """)
         # BOOKINGS TABLE: Stores booking details for rentals.
-        self.cursor.execute("""
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS bookings (
                 booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 car_id INTEGER NOT NULL,
@@ -53,7 +325,7 @@ class DBManager:
             );
         """)
         # MESSAGES TABLE: For communication between users.
-        self.cursor.execute("""
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS messages (
                 message_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 sender_id INTEGER NOT NULL,
@@ -66,7 +338,7 @@ class DBManager:
         """)
         # REVIEWS TABLE: Stores reviews and ratings for completed rentals.
         # The UNIQUE constraint on booking_id ensures only one review per booking.
-        self.cursor.execute("""
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS reviews (
                 review_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 booking_id INTEGER NOT NULL UNIQUE,
@@ -82,99 +354,632 @@ class DBManager:
         """)
         self.conn.commit()
 
+    def create_message_reads_table(self):
+        cur = self.conn.cursor()
+        # MESSAGE_READS TABLE: The newest message each user has seen per chat partner,
+        # used to compute unread counts without flagging every message row.
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS message_reads (
+                user_id INTEGER NOT NULL,
+                partner_id INTEGER NOT NULL,
+                last_read_message_id INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, partner_id),
+                FOREIGN KEY (user_id) REFERENCES users(user_id),
+                FOREIGN KEY (partner_id) REFERENCES users(user_id)
+            );
+        """)
+        self.conn.commit()
+
+    def create_availability_changes(self):
+        """
+        Create availability_changes, a log of the car_ids whose availability window or
+        'Booked' bookings changed, written by triggers on cars and bookings so that writes
+        from every connection and process are logged. get_availability_index replays it.
+        Only the newest AVAILABILITY_CHANGES_KEPT rows are kept.
+        """
+        cur = self.conn.cursor()
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS availability_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                car_id INTEGER NOT NULL
+            );
+        """)
+        log_new = "INSERT INTO availability_changes(car_id) VALUES (new.car_id);"
+        log_old = "INSERT INTO availability_changes(car_id) VALUES (old.car_id);"
+        triggers = [
+            ("cars_availability_insert", "AFTER INSERT ON cars", log_new),
+            ("cars_availability_update", "AFTER UPDATE OF availability ON cars", log_new),
+            ("cars_availability_delete", "AFTER DELETE ON cars", log_old),
+            ("bookings_availability_insert", "AFTER INSERT ON bookings WHEN new.status = 'Booked'", log_new),
+            ("bookings_availability_update", "AFTER UPDATE OF car_id, start_date, end_date, status ON bookings",
+             log_old + " " + log_new),
+            ("bookings_availability_delete", "AFTER DELETE ON bookings WHEN old.status = 'Booked'", log_old),
+            ("availability_changes_prune", "AFTER INSERT ON availability_changes",
+             f"DELETE FROM availability_changes WHERE seq <= new.seq - {AVAILABILITY_CHANGES_KEPT};"),
+        ]
+        for name, event, body in triggers:
+            cur.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END;")
+        self.conn.commit()
+
+    def backfill_in_chunks(self, table, key, apply, chunk_size=None, upto=None):
+        """
+        Call apply(cursor, low, high) for consecutive ranges of chunk_size values of the
+        integer key column, from its minimum up to `upto` (default: its current maximum),
+        committing after each range so other writers get the lock in between.
+        chunk_size=None does the whole table in one range.
+        """
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}")
+        low, high = cur.fetchone()
+        if upto is not None:
+            high = upto
+        if low is None or high is None:
+            return
+        step = chunk_size or high - low + 1
+        for start in range(low, high + 1, step):
+            apply(cur, start, min(start + step - 1, high))
+            self.conn.commit()
+
+    def add_availability_columns(self, chunk_size=None):
+        """
+        Add the normalized cars.available_from / cars.available_to columns to databases
+        created before they existed, and backfill them from the free-text availability
+        in car_id chunks. Rows whose availability cannot be parsed are left NULL.
+        """
+        cur = self.conn.cursor()
+        # Check and add the columns under one write lock, so two processes cannot both add them.
+        if not self.conn.in_transaction:
+            cur.execute("BEGIN IMMEDIATE")
+        cur.execute("PRAGMA table_info(cars)")
+        columns = {row["name"] for row in cur.fetchall()}
+        if "available_from" in columns:
+            self.conn.commit()
+            return
+        cur.execute("ALTER TABLE cars ADD COLUMN available_from TEXT")
+        cur.execute("ALTER TABLE cars ADD COLUMN available_to TEXT")
+        self.conn.commit()
+
+        def backfill(cur, low, high):
+            cur.execute("SELECT car_id, availability FROM cars WHERE car_id BETWEEN ? AND ?", (low, high))
+            updates = [normalize_availability(r["availability"]) + (r["car_id"],) for r in cur.fetchall()]
+            cur.executemany(
+                "UPDATE cars SET available_from = ?, available_to = ? WHERE car_id = ?",
+                [u for u in updates if u[0] is not None]
+            )
+        self.backfill_in_chunks("cars", "car_id", backfill, chunk_size)
+
+    def create_indexes(self):
+        """
+        Create any missing index of the secondary index set. Run by the first migration,
+        and again after bulk loads that dropped indexes with drop_indexes().
+        """
+        cur = self.conn.cursor()
+        for name, table, columns in INDEXES:
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+        self.conn.commit()
+
+    def drop_indexes(self, table):
+        """
+        Drop the secondary indexes of one table so a bulk load does not maintain them row
+        by row. Call create_indexes() afterwards to rebuild them in one pass.
+        """
+        cur = self.conn.cursor()
+        for name, index_table, _columns in INDEXES:
+            if index_table == table:
+                cur.execute(f"DROP INDEX IF EXISTS {name}")
+        self.conn.commit()
+
+    def create_search_index(self, chunk_size=None):
+        """
+        Create the cars_fts full-text index over car model and location, plus the triggers
+        that keep it in sync with the cars table. Existing rows are indexed once, in car_id
+        chunks, when the table is first created. If this SQLite build lacks FTS5,
+        fts_enabled stays False and search_cars_fts falls back to search_cars.
+        """
+        cur = self.conn.cursor()
+        # Hold the write lock from the existence check until the triggers exist, so the
+        # rows to backfill are exactly those up to the max car_id seen here. run_migrations
+        # may already hold it.
+        if not self.conn.in_transaction:
+            cur.execute("BEGIN IMMEDIATE")
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cars_fts'")
+        exists = cur.fetchone() is not None
+        try:
+            cur.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS cars_fts USING fts5(
+                    model, location, content='cars', content_rowid='car_id'
+                );
+            """)
+        except sqlite3.OperationalError as e:
+            self.conn.rollback()
+            print("Full-text search unavailable:", e)
+            self.fts_enabled = False
+            return
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS cars_fts_insert AFTER INSERT ON cars BEGIN
+                INSERT INTO cars_fts(rowid, model, location) VALUES (new.car_id, new.model, new.location);
+            END;
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS cars_fts_delete AFTER DELETE ON cars BEGIN
+                INSERT INTO cars_fts(cars_fts, rowid, model, location)
+                VALUES ('delete', old.car_id, old.model, old.location);
+            END;
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS cars_fts_update AFTER UPDATE OF model, location ON cars BEGIN
+                INSERT INTO cars_fts(cars_fts, rowid, model, location)
+                VALUES ('delete', old.car_id, old.model, old.location);
+                INSERT INTO cars_fts(rowid, model, location) VALUES (new.car_id, new.model, new.location);
+            END;
+        """)
+        cur.execute("SELECT MAX(car_id) FROM cars")
+        upto = cur.fetchone()[0]
+        self.conn.commit()
+        if not exists and upto is not None:
+            self.backfill_in_chunks("cars", "car_id", lambda cur, low, high: cur.execute(
+                "INSERT INTO cars_fts(rowid, model, location) "
+                "SELECT car_id, model, location FROM cars WHERE car_id BETWEEN ? AND ?", (low, high)
+            ), chunk_size, upto)
+        self.fts_enabled = True
+
+    def create_rating_summaries(self, chunk_size=None):
+        """
+        Create user_rating_summary and car_rating_summary (review count, rating sum, average
+        and a 1-5 histogram per reviewee / per car) and the triggers on reviews that keep them
+        current, so reputation lookups are primary-key reads. A summary table is backfilled
+        from the existing reviews, in review_id chunks, when it is first created.
+        """
+        cur = self.conn.cursor()
+        for table, key, key_expr in RATING_SUMMARIES:
+            # As in create_search_index: reviews up to the max review_id read under this
+            # lock are backfilled, later ones reach the summary through the triggers.
+            if not self.conn.in_transaction:
+                cur.execute("BEGIN IMMEDIATE")
+            cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            exists = cur.fetchone() is not None
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {key} INTEGER PRIMARY KEY,
+                    review_count INTEGER NOT NULL DEFAULT 0,
+                    rating_sum INTEGER NOT NULL DEFAULT 0,
+                    avg_rating REAL NOT NULL DEFAULT 0,
+                    r1 INTEGER NOT NULL DEFAULT 0,
+                    r2 INTEGER NOT NULL DEFAULT 0,
+                    r3 INTEGER NOT NULL DEFAULT 0,
+                    r4 INTEGER NOT NULL DEFAULT 0,
+                    r5 INTEGER NOT NULL DEFAULT 0
+                );
+            """)
+            add_new = self._rating_delta_sql(table, key, key_expr.format(row="new"), "new.rating", 1)
+            remove_old = self._rating_delta_sql(table, key, key_expr.format(row="old"), "old.rating", -1)
+            cur.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON reviews BEGIN {add_new} END;")
+            cur.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON reviews BEGIN {remove_old} END;")
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_update
+                AFTER UPDATE OF rating, reviewee_id, booking_id ON reviews BEGIN {remove_old} {add_new} END;
+            """)
+            cur.execute("SELECT MAX(review_id) FROM reviews")
+            upto = cur.fetchone()[0]
+            self.conn.commit()
+            if not exists and upto is not None:
+                # Each chunk's partial aggregates are added onto the rows earlier chunks wrote.
+                histogram = ", ".join(f"r{i} = r{i} + excluded.r{i}" for i in range(1, 6))
+                backfill_sql = f"""
+                    INSERT INTO {table}({key}, review_count, rating_sum, avg_rating, r1, r2, r3, r4, r5)
+                    SELECT k, COUNT(*), SUM(rating), AVG(rating), SUM(rating = 1), SUM(rating = 2),
+                           SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+                    FROM (SELECT {key_expr.format(row="reviews")} AS k, rating FROM reviews
+                          WHERE review_id BETWEEN ? AND ?)
+                    WHERE k IS NOT NULL
+                    GROUP BY k
+                    ON CONFLICT({key}) DO UPDATE SET
+                        review_count = review_count + excluded.review_count,
+                        rating_sum = rating_sum + excluded.rating_sum,
+                        avg_rating = (rating_sum + excluded.rating_sum) * 1.0
+                                     / (review_count + excluded.review_count),
+                        {histogram}
+                """
+                self.backfill_in_chunks("reviews", "review_id",
+                                        lambda cur, low, high: cur.execute(backfill_sql, (low, high)),
+                                        chunk_size, upto)
+
+    @staticmethod
+    def _rating_delta_sql(table, key, key_expr, rating, sign):
+        """Trigger statements adding (sign=1) or removing (sign=-1) one rating from a summary row."""
+        histogram = ", ".join(f"r{i} = r{i} + ({rating} = {i}) * {sign}" for i in range(1, 6))
+        return f"""
+            INSERT OR IGNORE INTO {table}({key}) SELECT k FROM (SELECT {key_expr} AS k) WHERE k IS NOT NULL;
+            UPDATE {table}
+            SET review_count = review_count + {sign},
+                rating_sum = rating_sum + {sign} * {rating},
+                avg_rating = CASE WHEN review_count + {sign} > 0
+                                  THEN (rating_sum + {sign} * {rating}) * 1.0 / (review_count + {sign})
+                                  ELSE 0 END,
+                {histogram}
+            WHERE {key} = {key_expr};
+        """
+
+    def explain_query_plan(self, query, params=()):
+        """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+        cur = self.conn.cursor()
+        cur.execute("EXPLAIN QUERY PLAN " + query, params)
+        return [row["detail"] for row in cur.fetchall()]
+
+    def check_index_usage(self):
+        """
+        Run EXPLAIN QUERY PLAN over the SQL the hot DBManager methods execute (INDEX_CHECKS).
+        Returns a dict mapping each method name to (expected indexes, all used?, plan lines).
+        """
+        checks = INDEX_CHECKS + ([FTS_INDEX_CHECK] if self.fts_enabled else [])
+        report = {}
+        for name, indexes, query, params in checks:
+            choices = [index if isinstance(index, tuple) else (index,) for index in indexes]
+            plan = self.explain_query_plan(query, params)
+            used = all(any(index in line for index in either for line in plan) for either in choices)
+            report[name] = (", ".join(" or ".join(either) for either in choices), used, plan)
+        return report
+
     # --- Existing Methods ---
 
+    def stream_query(self, query, params=(), row_factory=None, batch_size=None):
+        """
+        Generator that runs a query on its own cursor and yields rows fetched
+        batch_size at a time (default: self.fetch_batch_size), so only one batch is
+        held in memory however many rows match. row_factory defaults to sqlite3.Row.
+        """
+        cur = self.conn.cursor()
+        if row_factory is not None:
+            cur.row_factory = row_factory
+        try:
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(batch_size or self.fetch_batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cur.close()
+
     def get_messages(self, receiver_id):
-        """Retrieve all messages sent to the given receiver."""
-        self.cursor.execute("SELECT * FROM messages WHERE receiver_id=?", (receiver_id,))
-        rows = self.cursor.fetchall()
+        """Retrieve all messages (as Message objects) sent to the given receiver."""
+        return list(self.iter_messages(receiver_id))
+
+    def iter_messages(self, receiver_id, batch_size=None):
+        """Stream the messages sent to the given receiver (as Message objects)."""
+        return self.stream_query(MESSAGES_FOR_RECEIVER_SQL, (receiver_id,), Message.from_row, batch_size)
+
+    def get_conversation_inbox(self, user_id, preview_length=60, limit=None, offset=0):
+        """
+        Returns one dictionary per chat partner of the given user, ordered by most recent activity.
+        Each dictionary holds the partner's 'user_id', 'name' and 'email' plus 'last_message_id', 'last_timestamp',
+        'last_preview' (the start of the latest message) and 'unread_count'.
+        - limit / offset: optional page of partners.
+        """
+        cur = self.conn.cursor()
+        cur.execute(CONVERSATION_INBOX_SQL,
+                    (preview_length, user_id, user_id, user_id, user_id, -1 if limit is None else limit, offset))
+        rows = cur.fetchall()
         return [dict(r) for r in rows]
 
+    def mark_conversation_read(self, user_id, partner_id):
+        """Mark every message the partner has sent to the user so far as read."""
+        cur = self.conn.cursor()
+        cur.execute("""
+            INSERT INTO message_reads(user_id, partner_id, last_read_message_id)
+            SELECT ?, ?, COALESCE(MAX(message_id), 0)
+            FROM messages
+            WHERE sender_id = ? AND receiver_id = ?
+            ON CONFLICT(user_id, partner_id)
+            DO UPDATE SET last_read_message_id = excluded.last_read_message_id
+        """, (user_id, partner_id, partner_id, user_id))
+        self.conn.commit()
+
+    def insert_message(self, sender_id, receiver_id, content):
+        """Insert a chat message stamped with the current time. Returns the new message_id."""
+        cur = self.conn.cursor()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cur.execute(
+            "INSERT INTO messages(sender_id, receiver_id, content, timestamp) VALUES (?, ?, ?, ?)",
+            (sender_id, receiver_id, content, timestamp)
+        )
+        self.conn.commit()
+        return cur.lastrowid
+
+    def get_conversation_since(self, user_id, partner_id, after_message_id=0):
+        """
+        Retrieve the messages (as Message objects) exchanged between two users with a message_id
+        greater than after_message_id, oldest first. Used to append only new rows to an open chat.
+        Each direction seeks on (sender_id, receiver_id, message_id), so the cost grows with
+        the number of new messages, not with the length of the conversation.
+        """
+        cur = self.conn.cursor()
+        cur.row_factory = Message.from_row
+        cur.execute(CONVERSATION_SINCE_SQL,
+                    (user_id, partner_id, after_message_id, partner_id, user_id, after_message_id))
+        return cur.fetchall()
+
+    def get_conversation_page(self, user_id, partner_id, limit=50, before=None):
+        """
+        Retrieve one page of the conversation between two users (as Message objects), newest first.
+        - limit: maximum number of messages to return.
+        - before: optional (timestamp, message_id) keyset cursor; only messages strictly
+          older than it are returned. Pass the last row of the previous page to scroll back.
+        Each direction of the conversation is read from the (sender_id, receiver_id, timestamp)
+        index and cut to `limit` rows before the two are merged, so a page costs O(limit).
+        """
+        cur = self.conn.cursor()
+        cur.row_factory = Message.from_row
+        query, keyset_params = CONVERSATION_PAGE_SQL, ()
+        if before is not None:
+            query, keyset_params = CONVERSATION_PAGE_BEFORE_SQL, tuple(before)
+        cur.execute(
+            query,
+            (user_id, partner_id) + keyset_params + (limit,)
+            + (partner_id, user_id) + keyset_params + (limit,)
+            + (limit,)
+        )
+        return cur.fetchall()
+
     def get_cars_by_owner(self, owner_id):
-        """Returns a list of car listings (as dictionaries) for the given owner_id."""
-        self.cursor.execute("SELECT * FROM cars WHERE owner_id=?", (owner_id,))
-        rows = self.cursor.fetchall()
+        """Returns a list of car listings (as Car objects) for the given owner_id."""
+        return list(self.iter_cars_by_owner(owner_id))
+
+    def iter_cars_by_owner(self, owner_id, batch_size=None):
+        """Stream the car listings (as Car objects) of the given owner_id."""
+        return self.stream_query(CARS_BY_OWNER_SQL, (owner_id,), Car.from_row, batch_size)
+
+    def get_cars_with_review_stats(self, owner_id, limit=None, after_car_id=0):
+        """
+        Returns the owner's car listings (as dictionaries) together with review aggregates
+        read from car_rating_summary. Each dictionary carries the car columns plus
+        'review_count' and 'avg_rating' (0 when the car has no reviews).
+        - limit / after_car_id: optional keyset page of at most limit listings with a
+          car_id greater than after_car_id.
+        """
+        cur = self.conn.cursor()
+        cur.execute(CARS_WITH_REVIEW_STATS_SQL, (owner_id, after_car_id, -1 if limit is None else limit))
+        rows = cur.fetchall()
         return [dict(r) for r in rows]
 
     def insert_user(self, name, email, password, q1, a1, q2, a2, q3, a3):
         """Insert a new user into the users table including the name.
            Returns True on success."""
+        cur = self.conn.cursor()
         try:
-            self.cursor.execute("""
+            cur.execute("""
                 INSERT INTO users(name, email, password, security_q1, security_a1,
                                   security_q2, security_a2, security_q3, security_a3)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (name, email, password, q1, a1, q2, a2, q3, a3))
             self.conn.commit()
+            self.user_cache.invalidate(("email", email))
             return True
         except sqlite3.IntegrityError as e:
+            self.conn.rollback()  # do not leave the failed write's transaction open
             print("Insert user error:", e)
             return False
 
     def get_user_by_email_and_password(self, email, password):
-        """Retrieve a user's info based on email and password."""
-        self.cursor.execute("SELECT * FROM users WHERE email=? AND password=?", (email, password))
-        row = self.cursor.fetchone()
-        return dict(row) if row else None
+        """Retrieve a user's info (as a User) based on email and password."""
+        cur = self.conn.cursor()
+        cur.row_factory = User.from_row
+        cur.execute(f"SELECT {USER_COLUMNS} FROM users WHERE email=? AND password=?", (email, password))
+        return cur.fetchone()
 
     def get_user_by_email(self, email):
-        """Retrieve a user's info by email."""
-        self.cursor.execute("SELECT * FROM users WHERE email=?", (email,))
-        row = self.cursor.fetchone()
-        return dict(row) if row else None
+        """Retrieve a user's info (as a User) by email. Served from user_cache when possible."""
+        user_id = self.user_cache.get(("email", email), False)
+        if user_id is not False:
+            return self.get_user_by_id(user_id) if user_id is not None else None
+        version = self.user_cache.version
+        cur = self.conn.cursor()
+        cur.row_factory = User.from_row
+        cur.execute(f"SELECT {USER_COLUMNS} FROM users WHERE email=?", (email,))
+        user = cur.fetchone()
+        if user is not None:
+            self.user_cache.put(("user", user.user_id), user, version)
+        self.user_cache.put(("email", email), user.user_id if user is not None else None, version)
+        return user
+
+    def get_user_by_id(self, user_id):
+        """Retrieve a user's info (as a User) by user_id. Served from user_cache when possible."""
+        return self.user_cache.get_or_load(("user", user_id), lambda: self._load_user(user_id))
+
+    def _load_user(self, user_id):
+        cur = self.conn.cursor()
+        cur.row_factory = User.from_row
+        cur.execute(f"SELECT {USER_COLUMNS} FROM users WHERE user_id=?", (user_id,))
+        return cur.fetchone()
+
+    def invalidate_user(self, user_id):
+        """Drop the cached User and balance of user_id after a write to their row."""
+        self.user_cache.invalidate(("user", user_id), ("balance", user_id))
+
+    def get_user_cache_stats(self):
+        """Hit/miss counters of the user and balance cache."""
+        return self.user_cache.stats()
+
+    def get_search_cache_stats(self):
+        """Hit/miss counters and approximate memory ('bytes') of the search result cache."""
+        return self.search_cache.stats()
+
+    def _car_search_fields(self, car_id):
+        """The columns of a car that decide which searches it matches, or None if there is no such car."""
+        cur = self.conn.cursor()
+        cur.execute("SELECT model, location, mileage, available_from, available_to FROM cars WHERE car_id = ?",
+                    (car_id,))
+        row = cur.fetchone()
+        return dict(row) if row is not None else None
 
     def update_user_password(self, user_id, new_password):
         """Update a user's password."""
-        self.cursor.execute("UPDATE users SET password=? WHERE user_id=?", (new_password, user_id))
+        cur = self.conn.cursor()
+        cur.execute("UPDATE users SET password=? WHERE user_id=?", (new_password, user_id))
         self.conn.commit()
+        self.invalidate_user(user_id)
 
     def insert_car(self, owner_id, model, year, mileage, location, price, availability):
         """Insert a new car listing."""
-        self.cursor.execute("""
-            INSERT INTO cars(owner_id, model, year, mileage, location, price_per_day, availability)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (owner_id, model, year, mileage, location, price, availability))
+        cur = self.conn.cursor()
+        available_from, available_to = normalize_availability(availability)
+        cur.execute("""
+            INSERT INTO cars(owner_id, model, year, mileage, location, price_per_day, availability,
+                             available_from, available_to)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (owner_id, model, year, mileage, location, price, availability, available_from, available_to))
         self.conn.commit()
+        self.search_cache.invalidate_cars({"model": model, "location": location, "mileage": mileage,
+                                           "available_from": available_from, "available_to": available_to})
 
-    def search_cars(self, location, max_mileage, rental_date):
+    def search_cars(self, location, max_mileage, rental_date, order_by=None, limit=None, offset=0,
+                    include_unstructured=True):
         """
         Searches for cars by location, and filters by mileage and rental availability.
         - location: string to match in the location field.
         - max_mileage: maximum allowed mileage (as an integer).
         - rental_date: desired rental date as a string (format "YYYY-MM-DD").
+        - order_by: optional "price" or "mileage"; defaults to listing order.
+        - limit / offset: optional page of results.
+        - include_unstructured: also return cars whose availability string could not be
+          parsed into available_from / available_to (the historical behavior).
 
-        The availability column is assumed to be a string in the format "YYYY-MM-DD to YYYY-MM-DD".
-        Returns a list of car listings (as dictionaries) that match the criteria.
+        The whole filter, including the date check, runs in SQL against the normalized
+        available_from / available_to columns, so only matching rows are returned.
+        Results are served from search_cache when the same search ran recently.
+        Returns a list of car listings (as Car objects) that match the criteria.
         """
-        self.cursor.execute(
-            "SELECT * FROM cars WHERE location LIKE ? AND mileage <= ?",
-            ('%' + location + '%', max_mileage)
-        )
-        rows = self.cursor.fetchall()
-        results = []
-        for row in rows:
-            car = dict(row)
-            avail_str = car.get("availability", "")
+        if order_by not in SEARCH_ORDERS:
+            raise ValueError(f"Unsupported order_by: {order_by!r}")
+        key = like_key(location, max_mileage, rental_date, bool(include_unstructured), order_by, limit, offset)
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            return cached
+        cache_version = self.search_cache.version
+        query = SEARCH_CARS_SQL.format(order=SEARCH_ORDERS[order_by])
+        params = ('%' + location + '%', max_mileage, rental_date, rental_date,
+                  1 if include_unstructured else 0, -1 if limit is None else limit, offset)
+        cur = self.conn.cursor()
+        cur.row_factory = Car.from_row
+        cur.execute(query, params)
+        cars = cur.fetchall()
+        self.search_cache.put(key, cars, cache_version)
+        return cars
+
+    def search_cars_fts(self, text, max_mileage, rental_date, limit=None, offset=0, include_unstructured=True):
+        """
+        Full-text search over car model and location, ranked by relevance (bm25).
+        - text: free text; every word must match the start of a word in the model or
+          location, so "san fran" finds "San Francisco, CA".
+        - max_mileage, rental_date, limit, offset, include_unstructured: as in search_cars.
+        Results are served from search_cache when the same search ran recently.
+        Returns a list of car listings (as Car objects), best match first.
+        """
+        if not self.fts_enabled:
+            return self.search_cars(text, max_mileage, rental_date, limit=limit, offset=offset,
+                                    include_unstructured=include_unstructured)
+        words = re.findall(r"\w+", text)
+        if not words:
+            return []
+        key = fts_key(words, max_mileage, rental_date, bool(include_unstructured), limit, offset)
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            return cached
+        cache_version = self.search_cache.version
+        match = " ".join(f'"{word}"*' for word in words)
+        cur = self.conn.cursor()
+        cur.row_factory = Car.from_row
+        cur.execute(SEARCH_CARS_FTS_SQL, (match, max_mileage, rental_date, rental_date, 1 if include_unstructured else 0,
+              -1 if limit is None else limit, offset))
+        cars = cur.fetchall()
+        self.search_cache.put(key, cars, cache_version)
+        return cars
+
+    # --- Methods for Availability ---
+
+    def get_availability_index(self):
+        """
+        Return the in-memory availability index, loading it from the database on first use
+        and otherwise reloading the cars logged in availability_changes since the last call,
+        so writes from any connection or process are seen. The change log and the rows are
+        read in one transaction, so a write committed during a load is replayed next time.
+        """
+        with self._availability_lock:
+            conn = self.conn
+            cur = conn.cursor()
+            if self.availability.loaded:
+                # The common case, nothing logged since the last call, needs no transaction.
+                cur.execute("SELECT 1 FROM availability_changes WHERE seq > ? LIMIT 1", (self.availability.seq,))
+                if cur.fetchone() is None:
+                    return self.availability
+            own_transaction = not conn.in_transaction
+            if own_transaction:
+                conn.execute("BEGIN")
             try:
-                start_avail, end_avail = avail_str.split(" to ")
-                if rental_date >= start_avail and rental_date <= end_avail:
-                    results.append(car)
-            except Exception as e:
-                # If availability cannot be parsed, include the car (or choose to exclude it)
-                results.append(car)
-        return results
+                if not self.availability.loaded:
+                    self._load_availability(cur)
+                else:
+                    cur.execute("SELECT seq, car_id FROM availability_changes WHERE seq > ? ORDER BY seq",
+                                (self.availability.seq,))
+                    changes = cur.fetchall()
+                    if changes and changes[0][0] != self.availability.seq + 1:
+                        self._load_availability(cur)  # the log was pruned past our position
+                    elif changes:
+                        self._reload_cars(cur, {car_id for _seq, car_id in changes}, changes[-1][0])
+            finally:
+                if own_transaction:
+                    conn.commit()
+        return self.availability
+
+    def _load_availability(self, cur):
+        cur.execute("SELECT COALESCE(MAX(seq), 0) FROM availability_changes")
+        seq = cur.fetchone()[0]
+        cur.execute("SELECT car_id, availability FROM cars")
+        car_rows = [tuple(r) for r in cur.fetchall()]
+        cur.execute("SELECT car_id, start_date, end_date FROM bookings WHERE status = 'Booked'")
+        booking_rows = [tuple(r) for r in cur.fetchall()]
+        self.availability.load(car_rows, booking_rows, seq)
+
+    def _reload_cars(self, cur, car_ids, seq):
+        car_ids = sorted(car_ids)
+        car_rows, booking_rows = [], []
+        for start in range(0, len(car_ids), AVAILABILITY_RELOAD_CHUNK):
+            chunk = car_ids[start:start + AVAILABILITY_RELOAD_CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            cur.execute(f"SELECT car_id, availability FROM cars WHERE car_id IN ({marks})", chunk)
+            car_rows.extend(tuple(r) for r in cur.fetchall())
+            cur.execute(f"""
+                SELECT car_id, start_date, end_date FROM bookings
+                WHERE car_id IN ({marks}) AND status = 'Booked'
+            """, chunk)
+            booking_rows.extend(tuple(r) for r in cur.fetchall())
+        self.availability.reload_cars(car_ids, car_rows, booking_rows, seq)
+
+    def is_car_free(self, car_id, start_date, end_date):
+        """True if the car's availability window covers the range and no booking overlaps it."""
+        return self.get_availability_index().is_free(car_id, start_date, end_date)
+
+    def get_free_cars(self, car_ids, start_date, end_date):
+        """Return the subset of car_ids that are free for the whole range, in one pass."""
+        return self.get_availability_index().free_cars(car_ids, start_date, end_date)
 
     # --- Methods for Balance and Renting Functionality ---
 
     def add_balance(self, user_id, amount):
         """Add funds to the user's balance."""
-        self.cursor.execute("UPDATE users SET balance = balance + ? WHERE user_id=?", (amount, user_id))
+        cur = self.conn.cursor()
+        cur.execute("UPDATE users SET balance = balance + ? WHERE user_id=?", (amount, user_id))
         self.conn.commit()
+        self.invalidate_user(user_id)
 
     def get_balance(self, user_id):
-        """Get the user's current balance."""
-        self.cursor.execute("SELECT balance FROM users WHERE user_id=?", (user_id,))
-        row = self.cursor.fetchone()
+        """Get the user's current balance. Served from user_cache when possible."""
+        return self.user_cache.get_or_load(("balance", user_id), lambda: self._load_balance(user_id))
+
+    def _load_balance(self, user_id):
+        cur = self.conn.cursor()
+        cur.execute("SELECT balance FROM users WHERE user_id=?", (user_id,))
+        row = cur.fetchone()
         return row["balance"] if row else 0.0
 
     def rent_car(self, car_id, renter_id, start_date, end_date):
@@ -182,6 +987,8 @@ class DBManager:
         Attempts to rent a car by reserving it for the specified period.
         Prevents double-booking by checking for overlapping bookings.
         Deducts the total rental cost from the user's balance and creates a booking record.
+        The check, debit and insert run as one BEGIN IMMEDIATE transaction in BookingEngine,
+        retried with backoff while the database is busy.
 
         Parameters:
             car_id (int): The car to book.
@@ -193,68 +1000,63 @@ class DBManager:
             (bool, str): A tuple where True means success, with the message including the booking ID,
                          reviewee ID, and total cost; False means an error with an explanation.
         """
-        # Retrieve car details
-        self.cursor.execute("SELECT * FROM cars WHERE car_id=?", (car_id,))
-        car = self.cursor.fetchone()
-        if not car:
-            return False, "Car not found."
-
-        # Check for overlapping bookings
-        self.cursor.execute("""
-            SELECT * FROM bookings
-            WHERE car_id = ?
-              AND status = 'Booked'
-              AND NOT (? > end_date OR ? < start_date)
-        """, (car_id, start_date, end_date))
-        conflict = self.cursor.fetchone()
-        if conflict:
-            return False, "Car is already booked for the selected period."
-
-        from datetime import datetime
-        d1 = datetime.strptime(start_date, "%Y-%m-%d")
-        d2 = datetime.strptime(end_date, "%Y-%m-%d")
-        rental_days = (d2 - d1).days + 1
-        total_price = rental_days * car["price_per_day"]
-
-        balance = self.get_balance(renter_id)
-        if balance < total_price:
-            return False, "Insufficient balance. Please add funds."
-
-        # Deduct rental cost and create a booking
-        self.cursor.execute("UPDATE users SET balance = balance - ? WHERE user_id=?", (total_price, renter_id))
-        self.cursor.execute("""
-            INSERT INTO bookings(car_id, renter_id, start_date, end_date, status)
-            VALUES (?, ?, ?, ?, ?)
-        """, (car["car_id"], renter_id, start_date, end_date, "Booked"))
-        self.conn.commit()
-        booking_id = self.cursor.lastrowid
-        reviewee_id = car["owner_id"]
-        return True, f"Rental successful!\nBooking ID: {booking_id}\nReviewee ID: {reviewee_id}\nTotal Cost: ${total_price:.2f}"
+        return self.booking_engine.book(car_id, renter_id, start_date, end_date)
+
+    def on_booking_committed(self, booking_id, car_id, renter_id, owner_id, start_date, end_date):
+        """Called by the booking engine after a booking transaction commits."""
+        self.invalidate_user(renter_id)
+        # Searches filter on the listing's own availability window, not on bookings, so only
+        # results showing the booked car are dropped.
+        self.search_cache.invalidate_listed(car_id)
+        if self.booking_events is not None:
+            self.booking_events.change_booking_status(booking_id, "Booked")
+
+    def on_bulk_import(self, table):
+        """Called by the bulk importer after rows were loaded into a table behind DBManager's back."""
+        if table in ("cars", "bookings"):
+            self.availability.reset()
+            if table == "cars":
+                self.search_cache.clear()
+        elif table == "users":
+            self.user_cache.clear()
+
+    def get_booking_stats(self):
+        """Throughput and conflict/retry counters of the booking engine."""
+        return self.booking_engine.stats()
 
     # --- Methods for Rental History ---
 
     def get_rental_history_for_renter(self, renter_id):
         """
         Retrieve the rental history for a renter.
-        Returns a list of booking records (as dictionaries) where this user is the renter.
+        Returns a list of booking records (as Booking objects) where this user is the renter.
         """
-        self.cursor.execute("SELECT * FROM bookings WHERE renter_id=?", (renter_id,))
-        rows = self.cursor.fetchall()
-        return [dict(r) for r in rows]
+        return list(self.iter_rental_history_for_renter(renter_id))
+
+    def iter_rental_history_for_renter(self, renter_id, batch_size=None):
+        """Stream the renter's booking records (as Booking objects)."""
+        return self.stream_query(RENTAL_HISTORY_FOR_RENTER_SQL, (renter_id,), Booking.from_row, batch_size)
+
+    def get_rental_history_page(self, renter_id, limit=200, after_booking_id=0):
+        """
+        Retrieve one keyset page of the renter's booking records (as Booking objects):
+        at most limit bookings with a booking_id greater than after_booking_id, in booking order.
+        """
+        cur = self.conn.cursor()
+        cur.row_factory = Booking.from_row
+        cur.execute(RENTAL_HISTORY_PAGE_SQL, (renter_id, after_booking_id, limit))
+        return cur.fetchall()
 
     def get_rental_history_for_owner(self, owner_id):
         """
         Retrieve the rental history for a car owner.
-        Returns a list of booking records (as dictionaries) for which the user owns the car.
-        """
-        self.cursor.execute("""
-            SELECT b.*
-            FROM bookings b
-            JOIN cars c ON b.car_id = c.car_id
-            WHERE c.owner_id = ?
-        """, (owner_id,))
-        rows = self.cursor.fetchall()
-        return [dict(r) for r in rows]
+        Returns a list of booking records (as Booking objects) for which the user owns the car.
+        """
+        return list(self.iter_rental_history_for_owner(owner_id))
+
+    def iter_rental_history_for_owner(self, owner_id, batch_size=None):
+        """Stream the booking records (as Booking objects) of every car the user owns."""
+        return self.stream_query(RENTAL_HISTORY_FOR_OWNER_SQL, (owner_id,), Booking.from_row, batch_size)
 
     # --- Methods for Reviews ---
 
@@ -268,35 +1070,61 @@ class DBManager:
         - feedback: Textual feedback message.
         Returns True on success, False otherwise.
         """
+        cur = self.conn.cursor()
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            self.cursor.execute("""
+            cur.execute("""
                 INSERT INTO reviews (booking_id, reviewer_id, reviewee_id, rating, feedback, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (booking_id, reviewer_id, reviewee_id, rating, feedback, timestamp))
             self.conn.commit()
             return True
         except sqlite3.Error as e:
+            self.conn.rollback()  # do not leave the failed write's transaction open
             print("Insert review error:", e)
             return False
 
     def get_reviews_for_user(self, user_id):
         """
         Retrieve all reviews received by a specific user.
-        Returns a list of review records (as dictionaries).
+        Returns a list of review records (as Review objects).
         """
-        self.cursor.execute("SELECT * FROM reviews WHERE reviewee_id=?", (user_id,))
-        rows = self.cursor.fetchall()
-        return [dict(r) for r in rows]
+        return list(self.iter_reviews_for_user(user_id))
+
+    def iter_reviews_for_user(self, user_id, batch_size=None):
+        """Stream the reviews (as Review objects) received by a specific user."""
+        return self.stream_query(REVIEWS_FOR_USER_SQL, (user_id,), Review.from_row, batch_size)
+
+    def get_user_rating_summary(self, user_id):
+        """
+        Return the rating summary of a reviewee as a dict: 'review_count', 'rating_sum',
+        'avg_rating' and 'histogram' ({1: count, ..., 5: count}). All zero if never reviewed.
+        """
+        return self._rating_summary("user_rating_summary", "user_id", user_id)
+
+    def get_car_rating_summary(self, car_id):
+        """Return the rating summary of a car (reviews of its bookings), shaped like get_user_rating_summary."""
+        return self._rating_summary("car_rating_summary", "car_id", car_id)
+
+    def _rating_summary(self, table, key, key_value):
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT * FROM {table} WHERE {key}=?", (key_value,))
+        row = cur.fetchone()
+        if row is None:
+            return {"review_count": 0, "rating_sum": 0, "avg_rating": 0.0,
+                    "histogram": {i: 0 for i in range(1, 6)}}
+        return {"review_count": row["review_count"], "rating_sum": row["rating_sum"],
+                "avg_rating": row["avg_rating"], "histogram": {i: row[f"r{i}"] for i in range(1, 6)}}
 
     def get_review_by_booking(self, booking_id):
         """
         Retrieve the review associated with a specific booking.
-        Returns a review record (as a dictionary) if found.
+        Returns a review record (as a Review) if found.
         """
-        self.cursor.execute("SELECT * FROM reviews WHERE booking_id=?", (booking_id,))
-        row = self.cursor.fetchone()
-        return dict(row) if row else None
+        cur = self.conn.cursor()
+        cur.row_factory = Review.from_row
+        cur.execute(f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE booking_id=?", (booking_id,))
+        return cur.fetchone()
 
     def update_car_availability(self, car_id, availability):
         """
@@ -304,13 +1132,43 @@ class DBManager:
         :param car_id: The ID of the car to update.
         :param availability: The new availability string (e.g., a date range).
         """
-        self.cursor.execute("UPDATE cars SET availability = ? WHERE car_id = ?", (availability, car_id))
+        before = self._car_search_fields(car_id)
+        cur = self.conn.cursor()
+        available_from, available_to = normalize_availability(availability)
+        cur.execute(
+            "UPDATE cars SET availability = ?, available_from = ?, available_to = ? WHERE car_id = ?",
+            (availability, available_from, available_to, car_id)
+        )
         self.conn.commit()
+        if before is not None:
+            # The car may leave the searches it matched and enter new ones.
+            after = dict(before, available_from=available_from, available_to=available_to)
+            self.search_cache.invalidate_cars(before, after)
+
     def update_car_price(self, car_id, price):
         """
         Update the price_per_day field for a given car.
         :param car_id: The ID of the car to update.
         :param price: The new price per day (float).
         """
-        self.cursor.execute("UPDATE cars SET price_per_day = ? WHERE car_id = ?", (price, car_id))
-        self.conn.commit()
\ No newline at end of file
+        cur = self.conn.cursor()
+        cur.execute("UPDATE cars SET price_per_day = ? WHERE car_id = ?", (price, car_id))
+        self.conn.commit()
+        fields = self._car_search_fields(car_id)
+        if fields is not None:
+            # Every search the car matches shows the old price or orders by it.
+            self.search_cache.invalidate_cars(fields)
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage (from termproj/): python -m database.db_manager [db_path]
+    # Prints the query plan of each hot query and exits non-zero if any skips its index.
+    manager = DBManager(sys.argv[1] if len(sys.argv) > 1 else "driveshare.db")
+    ok = True
+    for query_name, (index, used, plan) in manager.check_index_usage().items():
+        print(f"{'OK  ' if used else 'FAIL'} {query_name}: expected {index}")
+        for line in plan:
+            print(f"       {line}")
+        ok = ok and used
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,252 @@
+# database/instrumentation.py
+"""
+Optional SQL instrumentation for DBManager.
+
+When enabled, the connection pool opens InstrumentedConnection objects whose cursors
+time every statement, from execute() until its rows have been fetched (or the cursor
+is re-used, closed or discarded), and report it to a QueryStats registry. Statements
+are grouped by normalized SQL (whitespace collapsed, literals replaced by ?), and each
+group keeps its call count, total and p50/p95/p99 latency and rows returned.
+Statements slower than the slow-query threshold are logged with their EXPLAIN QUERY PLAN.
+
+Enable it with DBManager(..., instrument=True) or by setting DRIVESHARE_SQL_STATS=1,
+then call DBManager.query_report() or pass report_at_exit=True.
+"""
+import random
+import re
+import sqlite3
+import threading
+import time
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals, so the same statement with different values groups together."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+class StatementStats:
+    """Counters for one normalized statement. Latency samples are reservoir-sampled past max_samples."""
+    __slots__ = ("count", "total_seconds", "max_seconds", "rows", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.samples = []
+
+
+class QueryStats:
+    def __init__(self, slow_query_ms=100.0, max_samples=10000, max_slow_queries=200, log=print):
+        """
+        - slow_query_ms: statements taking longer are logged with their query plan; None disables.
+        - max_samples: latency samples kept per statement for the percentiles.
+        - max_slow_queries: slow-query entries kept for slow_queries().
+        - log: callable receiving each slow-query message (default: print).
+        """
+        self.slow_query_ms = slow_query_ms
+        self.max_samples = max_samples
+        self.max_slow_queries = max_slow_queries
+        self.log = log
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._statements = {}
+            self._slow = []
+
+    def record(self, conn, sql, params, seconds, rows):
+        """Record one finished statement; called by InstrumentedCursor."""
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats()
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows
+            if len(stats.samples) < self.max_samples:
+                stats.samples.append(seconds)
+            else:
+                slot = self._random.randrange(stats.count)
+                if slot < self.max_samples:
+                    stats.samples[slot] = seconds
+        if self.slow_query_ms is not None and seconds * 1000 >= self.slow_query_ms:
+            self._log_slow_query(conn, sql, key, params, seconds)
+
+    def _log_slow_query(self, conn, sql, key, params, seconds):
+        plan = []
+        if params is not None:
+            try:
+                # A plain cursor, so the EXPLAIN itself is not recorded.
+                cur = sqlite3.Cursor(conn)
+                cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+                plan = [row[3] for row in cur.fetchall()]
+                cur.close()
+            except sqlite3.Error as e:
+                plan = [f"(no plan: {e})"]
+        entry = {"sql": key, "ms": seconds * 1000, "plan": plan, "at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        with self._lock:
+            self._slow.append(entry)
+            del self._slow[:-self.max_slow_queries]
+        if self.log is not None:
+            self.log(f"Slow query ({entry['ms']:.1f} ms): {key}"
+                     + "".join(f"\n    {line}" for line in plan))
+
+    def snapshot(self):
+        """
+        Return {normalized_sql: dict} with 'count', 'total_ms', 'mean_ms', 'p50_ms', 'p95_ms',
+        'p99_ms', 'max_ms', 'rows' and 'rows_per_call', most total time first.
+        """
+        with self._lock:
+            items = [(key, stats.count, stats.total_seconds, stats.max_seconds, stats.rows, sorted(stats.samples))
+                     for key, stats in self._statements.items()]
+        report = {}
+        for key, count, total, longest, rows, samples in sorted(items, key=lambda item: -item[2]):
+            report[key] = {
+                "count": count,
+                "total_ms": total * 1000,
+                "mean_ms": total * 1000 / count,
+                "p50_ms": percentile(samples, 0.50) * 1000,
+                "p95_ms": percentile(samples, 0.95) * 1000,
+                "p99_ms": percentile(samples, 0.99) * 1000,
+                "max_ms": longest * 1000,
+                "rows": rows,
+                "rows_per_call": rows / count,
+            }
+        return report
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self._slow)
+
+    def report(self, top=20):
+        """Return a printable table of the `top` statements by total time."""
+        lines = [f"{'calls':>8} {'total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'rows/call':>9}  statement"]
+        for key, stats in list(self.snapshot().items())[:top]:
+            lines.append(f"{stats['count']:>8} {stats['total_ms']:>10.1f} {stats['p50_ms']:>8.3f} "
+                         f"{stats['p95_ms']:>8.3f} {stats['p99_ms']:>8.3f} {stats['rows_per_call']:>9.1f}  "
+                         f"{key[:120]}")
+        slow = self.slow_queries()
+        if slow:
+            lines.append(f"{len(slow)} slow queries logged (threshold {self.slow_query_ms} ms)")
+        return "\n".join(lines)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports each statement to the connection's QueryStats. A statement is
+    finished when its rows are exhausted, or when the cursor executes again, is closed
+    or is garbage collected; fetch time up to then counts towards its latency.
+    """
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._pending = None  # [sql, params, seconds, rows]
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, seconds, rows = pending
+            query_stats = self.connection.query_stats
+            if query_stats is not None:
+                query_stats.record(self.connection, sql, params, seconds, rows)
+
+    def _timed(self, method, sql, params, single):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            method(sql, params)
+        finally:
+            seconds = time.perf_counter() - started
+            rows = self.rowcount if self.description is None and self.rowcount > 0 else 0
+            self._pending = [sql, params if single else None, seconds, rows]
+            if self.description is None:
+                self._finish()
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters, True)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters, False)
+
+    def _fetched(self, started, rows, exhausted):
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+            self._pending[3] += rows
+            if exhausted:
+                self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    sqlite3 connection factory whose cursors are InstrumentedCursors. The pool sets
+    query_stats right after connecting; connection.execute() is routed through cursor()
+    so shortcut calls are recorded too.
+    """
+    query_stats = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,97 @@
+# database/migrations.py
+"""
+Versioned schema migrations for the DriveShare database.
+
+The schema version is kept in PRAGMA user_version. Each entry of MIGRATIONS is
+(version, description, migrate(db_manager, chunk_size)); run_migrations applies the ones
+newer than the database, in order, and records each version as soon as it is done, so an
+interrupted upgrade resumes where it stopped. A database already at LATEST_VERSION costs
+one pragma read and no DDL.
+
+Every migration is idempotent (IF NOT EXISTS, column checks), because databases created
+before versioning, or by an older index-set-only versioning, may already contain some of
+what a migration adds. Backfills run in key ranges of chunk_size rows with a commit after
+each range, so the write lock is released between chunks on large tables.
+
+Several processes may open an un-migrated database at once. Each step starts under
+BEGIN IMMEDIATE and re-reads user_version inside that transaction, so a step another
+process already recorded is skipped, and the step's first check-and-create runs under
+the same write lock. Backfills release the lock between chunks; a process arriving
+meanwhile finds the new table or columns already there and does not backfill again.
+
+To change the schema, append a migration with the next version number; never edit or
+reorder an existing one.
+"""
+import time
+
+
+def _base_schema(db, chunk_size):
+    db.create_base_tables()
+    db.create_indexes()
+
+
+def _availability_columns(db, chunk_size):
+    db.add_availability_columns(chunk_size)
+
+
+def _message_reads(db, chunk_size):
+    db.create_message_reads_table()
+
+
+def _search_index(db, chunk_size):
+    db.create_search_index(chunk_size)
+
+
+def _rating_summaries(db, chunk_size):
+    db.create_rating_summaries(chunk_size)
+
+
+def _message_id_index(db, chunk_size):
+    db.create_indexes()
+
+
+def _availability_changes(db, chunk_size):
+    db.create_availability_changes()
+
+
+MIGRATIONS = [
+    (1, "users, cars, bookings, messages and reviews tables with their secondary indexes", _base_schema),
+    (2, "normalized cars.available_from / available_to columns", _availability_columns),
+    (3, "message_reads table for unread counts", _message_reads),
+    (4, "cars_fts full-text index over car model and location", _search_index),
+    (5, "user and car rating summary tables", _rating_summaries),
+    (6, "messages (sender_id, receiver_id, message_id) index for new-message fetches", _message_id_index),
+    (7, "availability_changes log that keeps the availability index current", _availability_changes),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(db, chunk_size=10000, log=print):
+    """
+    Bring db (a DBManager) up to LATEST_VERSION and return the versions applied.
+    Progress is logged only when upgrading an existing database, not when creating one.
+    """
+    conn = db.conn
+    current = schema_version(conn)
+    if current >= LATEST_VERSION:
+        return []
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        if schema_version(conn) >= version:
+            conn.commit()  # applied by another process since we looked
+            continue
+        started = time.perf_counter()
+        migrate(db, chunk_size)
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+        applied.append(version)
+        if current > 0 and log is not None:
+            log(f"Applied migration {version} ({description}) in {time.perf_counter() - started:.2f}s")
+    return applied
@@ -0,0 +1,102 @@
+# database/search_cache.py
+"""
+Cache of car search results for DBManager.search_cars and search_cars_fts.
+
+Entries are keyed on the normalized search parameters (the location text or full-text
+words, max_mileage, rental_date) plus the ordering and page requested, and hold the
+result list. Invalidation is selective: when a listing is inserted or changed, only
+the entries whose filter that car satisfied before or after the change are dropped,
+every page of those searches included, since the car may enter, leave or move within
+their results. Entries also expire after a TTL, which bounds staleness when another
+process writes to the same database file.
+"""
+import re
+import string
+import sys
+
+from database.cache import LRUCache
+
+_TOKEN = re.compile(r"[^\W_]+")  # what the unicode61 tokenizer keeps for ASCII text
+# LIKE folds case for the ASCII letters only, also inside non-ASCII text ('SÃO' LIKE 'sÃo').
+_LIKE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def like_key(location, max_mileage, rental_date, include_unstructured, order_by, limit, offset):
+    """Cache key of a search_cars call. LIKE ignores case for ASCII letters only, so only those are folded."""
+    return ("like", location.translate(_LIKE_FOLD), max_mileage, rental_date, include_unstructured, order_by, limit, offset)
+
+
+def fts_key(words, max_mileage, rental_date, include_unstructured, limit, offset):
+    """Cache key of a search_cars_fts call; the FTS tokenizer ignores case, so the words are folded."""
+    return ("fts", tuple(word.lower() for word in words), max_mileage, rental_date, include_unstructured,
+            None, limit, offset)
+
+
+def could_match(key, car):
+    """
+    True if the car (a Car or a dict with its location, model, mileage and available_from /
+    available_to) may satisfy the filter of the cached search. Errs towards True.
+    """
+    kind, text, max_mileage, rental_date, include_unstructured = key[:5]
+    if car["mileage"] > max_mileage:
+        return False
+    if car["available_from"] is None:
+        if not include_unstructured:
+            return False
+    elif not car["available_from"] <= rental_date <= car["available_to"]:
+        return False
+    if kind == "like":
+        if "%" in text or "_" in text:
+            return True  # LIKE wildcards in the search text
+        return text in car["location"].translate(_LIKE_FOLD)
+    haystack = f"{car['model']} {car['location']}"
+    if not haystack.isascii() or not all(word.isascii() and "_" not in word for word in text):
+        return True  # diacritic folding and split words: do not second-guess the tokenizer
+    tokens = _TOKEN.findall(haystack.lower())
+    return all(any(token.startswith(word) for token in tokens) for word in text)
+
+
+def result_size(rows):
+    """Approximate bytes held by a cached list of Car objects."""
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(getattr(row, field)) for field in row.FIELDS)
+        for row in rows
+    )
+
+
+class SearchCache:
+    def __init__(self, max_size=256, ttl=30.0):
+        """
+        - max_size: cached searches kept before the least recently used one is evicted.
+        - ttl: seconds a cached result stays valid.
+        """
+        self._cache = LRUCache(max_size=max_size, ttl=ttl, sizeof=result_size)
+
+    @property
+    def version(self):
+        """Read before running a search and passed to put(); see LRUCache.version."""
+        return self._cache.version
+
+    def get(self, key):
+        """A copy of the cached result list, or None."""
+        rows = self._cache.get(key)
+        return list(rows) if rows is not None else None
+
+    def put(self, key, rows, version):
+        """Cache rows unless an invalidation happened since `version` was read."""
+        self._cache.put(key, list(rows), version)
+
+    def invalidate_cars(self, *cars):
+        """Drop the searches any of the given car states could match. Returns how many were dropped."""
+        return self._cache.invalidate_where(lambda key, _rows: any(could_match(key, car) for car in cars))
+
+    def invalidate_listed(self, car_id):
+        """Drop the cached results that contain the car."""
+        return self._cache.invalidate_where(lambda _key, rows: any(row.car_id == car_id for row in rows))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        """LRUCache counters plus 'bytes', the approximate memory held by cached results."""
+        return self._cache.stats()
@@ -2,18 +2,28 @@
 """
 Entry point for the DriveShare application.
 Sets up the QApplication, applies a black & yellow QSS style,
-initializes the database, creates the mediator, instantiates
-the various UI windows, and shows the login window.
+initializes the database, creates the mediator and the login window,
+and shows it. The register and main windows (and their modules) are
+built by the mediator the first time they are needed.
 """
+from ui.startup_timing import mark  # first, so startup milestones count from here
 import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from database.db_manager import DBManager
 from patterns.mediator import UIMediator
 from ui.login_window import LoginWindow
-from ui.register_window import RegisterWindow
-from ui.main_window import MainWindow
+
+def create_register_window(db_manager, mediator):
+    from ui.register_window import RegisterWindow
+    return RegisterWindow(db_manager, mediator)
+
+def create_main_window(db_manager, mediator):
+    from ui.main_window import MainWindow
+    return MainWindow(db_manager, mediator)
 
 def main():
+    mark("imports_done")
     app = QApplication(sys.argv)
 
     app.setStyleSheet("""
@@ -76,8 +86,8 @@ def main():
         border-bottom: 2px solid #007ACC;
     }
 
-    /* List widget styling */
-    QListWidget {
+    /* List styling (the lists are QListViews over PagedListModel) */
+    QListView, QListWidget {
         background: #FFFFFF;
         border: 1px solid #CCCCCC;
         border-radius: 4px;
@@ -86,20 +96,23 @@ def main():
 """)
 
 
+    mark("qt_ready")
+
     # Initialize the database and mediator
     db_manager = DBManager("driveshare.db")
-    mediator = UIMediator()
+    mark("database_ready")
+    # Refresh messages are deferred to the next event-loop turn so bursts coalesce.
+    mediator = UIMediator(scheduler=lambda callback: QTimer.singleShot(0, callback))
 
-    # Create and register the login, register, and main windows
+    # Only the login window is needed up front; the others are built on first use.
     login_window = LoginWindow(db_manager, mediator)
-    register_window = RegisterWindow(db_manager, mediator)
-    main_window = MainWindow(db_manager, mediator)
-
     mediator.register("login_window", login_window)
-    mediator.register("register_window", register_window)
-    mediator.register("main_window", main_window)
+    mediator.register_factory("register_window", lambda: create_register_window(db_manager, mediator))
+    mediator.register_factory("main_window", lambda: create_main_window(db_manager, mediator))
 
     login_window.show()
+    # Runs once the event loop has processed the show, i.e. the screen is up.
+    QTimer.singleShot(0, lambda: mark("login_screen_shown"))
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
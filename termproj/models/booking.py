@@ -2,7 +2,12 @@
 """
 Booking model represents a rental booking in DriveShare.
 """
-class Booking:
+from models.row_model import RowModel
+
+class Booking(RowModel):
+    __slots__ = ("booking_id", "car_id", "renter_id", "start_date", "end_date", "status")
+    FIELDS = __slots__
+
     def __init__(self, booking_id, car_id, renter_id, start_date, end_date, status):
         self.booking_id = booking_id
         self.car_id = car_id
@@ -1,7 +1,13 @@
 # car.py
+from models.row_model import RowModel
 
-class Car:
-    def __init__(self, owner_id, model, year, mileage, location, price_per_day, availability, car_id=None):
+class Car(RowModel):
+    __slots__ = ("owner_id", "model", "year", "mileage", "location", "price_per_day",
+                 "availability", "car_id", "available_from", "available_to")
+    FIELDS = __slots__
+
+    def __init__(self, owner_id, model, year, mileage, location, price_per_day, availability, car_id=None,
+                 available_from=None, available_to=None):
         self.car_id = car_id
         self.owner_id = owner_id
         self.model = model
@@ -10,6 +16,8 @@ class Car:
         self.location = location
         self.price_per_day = price_per_day
         self.availability = availability
+        self.available_from = available_from
+        self.available_to = available_to
 
 
     def __repr__(self):
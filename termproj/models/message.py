@@ -0,0 +1,19 @@
+# message.py
+"""
+Message model represents one chat message between two DriveShare users.
+"""
+from models.row_model import RowModel
+
+class Message(RowModel):
+    __slots__ = ("message_id", "sender_id", "receiver_id", "content", "timestamp")
+    FIELDS = __slots__
+
+    def __init__(self, message_id, sender_id, receiver_id, content, timestamp):
+        self.message_id = message_id
+        self.sender_id = sender_id
+        self.receiver_id = receiver_id
+        self.content = content
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"Message(id={self.message_id}, sender_id={self.sender_id}, receiver_id={self.receiver_id})"
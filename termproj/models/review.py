@@ -0,0 +1,21 @@
+# review.py
+"""
+Review model represents the rating and feedback left for a completed rental.
+"""
+from models.row_model import RowModel
+
+class Review(RowModel):
+    __slots__ = ("review_id", "booking_id", "reviewer_id", "reviewee_id", "rating", "feedback", "timestamp")
+    FIELDS = __slots__
+
+    def __init__(self, review_id, booking_id, reviewer_id, reviewee_id, rating, feedback, timestamp):
+        self.review_id = review_id
+        self.booking_id = booking_id
+        self.reviewer_id = reviewer_id
+        self.reviewee_id = reviewee_id
+        self.rating = rating
+        self.feedback = feedback
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"Review(id={self.review_id}, booking_id={self.booking_id}, rating={self.rating})"
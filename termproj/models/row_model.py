@@ -0,0 +1,39 @@
+# row_model.py
+"""
+Base class for the slotted DriveShare models.
+
+Models declare their fields once in FIELDS, in constructor order, and use __slots__
+so instances carry no per-instance __dict__. DBManager selects exactly those columns
+and installs from_row as the cursor's row_factory, so each result row becomes a model
+straight from the cursor tuple without an intermediate sqlite3.Row or dict.
+Models also support item access (car["model"], car.get("availability")) so code that
+used the old dictionaries keeps working.
+"""
+class RowModel:
+    __slots__ = ()
+    FIELDS = ()
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """sqlite3 row_factory: build a model from a row selected with select_columns()."""
+        return cls(*row)
+
+    @classmethod
+    def select_columns(cls, alias=None):
+        """The SELECT column list matching FIELDS, optionally qualified with a table alias."""
+        prefix = f"{alias}." if alias else ""
+        return ", ".join(prefix + field for field in cls.FIELDS)
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
@@ -1,11 +1,25 @@
 # user.py
+from models.row_model import RowModel
 
-class User:
-    def __init__(self, user_id, email, password, balance=0.0):
+class User(RowModel):
+    __slots__ = ("user_id", "email", "password", "balance", "name",
+                 "security_q1", "security_a1", "security_q2", "security_a2", "security_q3", "security_a3")
+    FIELDS = __slots__
+
+    def __init__(self, user_id, email, password, balance=0.0, name=None,
+                 security_q1=None, security_a1=None, security_q2=None, security_a2=None,
+                 security_q3=None, security_a3=None):
         self.user_id = user_id
         self.email = email
         self.password = password
         self.balance = balance
+        self.name = name
+        self.security_q1 = security_q1
+        self.security_a1 = security_a1
+        self.security_q2 = security_q2
+        self.security_a2 = security_a2
+        self.security_q3 = security_q3
+        self.security_a3 = security_a3
 
     def __repr__(self):
         return f"User(user_id={self.user_id}, email='{self.email}')"
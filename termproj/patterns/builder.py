@@ -43,6 +43,23 @@ class CarBuilder:
         self._availability = availability
         return self
 
+    def validate(self):
+        """
+        Check that every field is set and sensible before building.
+        Raises ValueError describing the first problem found; returns self otherwise.
+        """
+        for field in ("owner_id", "model", "year", "mileage", "location", "price_per_day"):
+            value = getattr(self, "_" + field)
+            if value is None or value == "":
+                raise ValueError(f"missing {field}")
+        if not isinstance(self._year, int) or not 1886 <= self._year <= 9999:
+            raise ValueError(f"invalid year: {self._year!r}")
+        if not isinstance(self._mileage, int) or self._mileage < 0:
+            raise ValueError(f"invalid mileage: {self._mileage!r}")
+        if not isinstance(self._price_per_day, (int, float)) or self._price_per_day < 0:
+            raise ValueError(f"invalid price_per_day: {self._price_per_day!r}")
+        return self
+
     def build(self):
         return Car(
             owner_id=self._owner_id,
@@ -2,28 +2,121 @@
 """
 Mediator pattern allows different UI components to communicate
 without being directly coupled. Components send messages via the mediator.
+
+Messages are dispatched through a table of handlers keyed by message type.
+Handlers registered with coalesce=True (the *_CHANGED refresh messages) are
+deferred through the injected scheduler, and any identical messages sent before
+the deferred call runs are folded into it, so a burst of changes triggers a
+single refresh per event-loop turn.
+
+Components can also be registered as factories, which are called the first time
+a message needs the component, so windows are built (and their modules imported)
+only when they are about to be shown.
 """
+from functools import partial
+
+
 class UIMediator:
-    def __init__(self):
+    def __init__(self, scheduler=None):
+        """
+        - scheduler: callable taking a zero-argument callback and running it later on the
+          GUI thread, e.g. lambda callback: QTimer.singleShot(0, callback). Without one,
+          coalescing handlers run immediately like the others.
+        """
         self._components = {}
+        self._factories = {}  # name -> zero-argument callable building the component
+        self._handlers = {}  # msg_type -> (handler(message, sender_name), coalesce)
+        self._pending = {}   # msg_type -> (message, sender_name) awaiting its deferred call
+        self.scheduler = scheduler
+        self.coalesced = 0   # messages folded into an already pending refresh
+
+        self.register_handler("LOGIN_SUCCESS", self._on_login_success)
+        self.register_handler("SHOW_REGISTER", self._on_show_register)
+        self.register_handler("SHOW_LOGIN", self._on_show_login)
+        self.register_handler("OPEN_PASSWORD_RECOVERY", self._on_open_password_recovery)
+        self.register_handler("CARS_CHANGED", self._on_cars_changed, coalesce=True)
+        self.register_handler("CHATS_CHANGED", self._on_chats_changed, coalesce=True)
+        self.register_handler("BALANCE_CHANGED", self._on_balance_changed, coalesce=True)
+        self.register_handler("RENTAL_HISTORY_CHANGED", self._on_rental_history_changed, coalesce=True)
 
     def register(self, name, component):
         self._components[name] = component
         component.mediator = self
 
+    def register_factory(self, name, factory):
+        """Register a component that is built by factory() the first time get(name) needs it."""
+        self._factories[name] = factory
+
+    def get(self, name):
+        """Return the named component, building it from its factory on first use (None if unknown)."""
+        component = self._components.get(name)
+        if component is None and name in self._factories:
+            component = self._factories.pop(name)()
+            self.register(name, component)
+        return component
+
+    def register_handler(self, msg_type, handler, coalesce=False):
+        """Route messages of msg_type to handler(message, sender_name), replacing any earlier handler."""
+        self._handlers[msg_type] = (handler, coalesce)
+
     def send(self, message, sender_name):
         msg_type = message.get("type")
-        if msg_type == "LOGIN_SUCCESS":
-            if "main_window" in self._components:
-                self._components["main_window"].on_user_logged_in(message["user_id"])
-        elif msg_type == "SHOW_REGISTER":
-            if "register_window" in self._components:
-                self._components["register_window"].clear_fields()
-                self._components["register_window"].show()
-        elif msg_type == "SHOW_LOGIN":
-            if "login_window" in self._components:
-                self._components["login_window"].show()
-        elif msg_type == "OPEN_PASSWORD_RECOVERY":
-            if "password_recovery" in self._components:
-                self._components["password_recovery"].show()
-        # Additional message types can be added here.
+        entry = self._handlers.get(msg_type)
+        if entry is None:
+            return
+        handler, coalesce = entry
+        if not coalesce or self.scheduler is None:
+            handler(message, sender_name)
+            return
+        if msg_type in self._pending:
+            self.coalesced += 1
+        else:
+            self.scheduler(partial(self._flush, msg_type))
+        # The latest message wins; refresh handlers re-read everything anyway.
+        self._pending[msg_type] = (message, sender_name)
+
+    def _flush(self, msg_type):
+        message, sender_name = self._pending.pop(msg_type)
+        self._handlers[msg_type][0](message, sender_name)
+
+    # --- Handlers ---
+
+    def _on_login_success(self, message, sender_name):
+        main_window = self.get("main_window")
+        if main_window is not None:
+            main_window.on_user_logged_in(message["user_id"])
+
+    def _on_show_register(self, message, sender_name):
+        register_window = self.get("register_window")
+        if register_window is not None:
+            register_window.clear_fields()
+            register_window.show()
+
+    def _on_show_login(self, message, sender_name):
+        login_window = self.get("login_window")
+        if login_window is not None:
+            login_window.show()
+
+    def _on_open_password_recovery(self, message, sender_name):
+        password_recovery = self.get("password_recovery")
+        if password_recovery is not None:
+            password_recovery.show()
+
+    # Refresh handlers only touch windows that already exist; a window built later
+    # loads fresh data anyway.
+
+    def _on_cars_changed(self, message, sender_name):
+        if "main_window" in self._components:
+            self._components["main_window"].refresh_car_listings()
+
+    def _on_chats_changed(self, message, sender_name):
+        if "main_window" in self._components:
+            self._components["main_window"].loadChatPartners()
+
+    def _on_balance_changed(self, message, sender_name):
+        if "main_window" in self._components:
+            self._components["main_window"].refresh_balance()
+
+    def _on_rental_history_changed(self, message, sender_name):
+        if "main_window" in self._components:
+            self._components["main_window"].loadRentalHistory()
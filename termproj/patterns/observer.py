@@ -2,18 +2,39 @@
 """
 Observer pattern used for booking notifications.
 The BookingSubject notifies observers about changes in booking status.
+
+By default a Subject calls every observer synchronously. Given an AsyncDispatcher,
+notify() only appends the event to each observer's bounded lane and returns; a small
+fixed pool of worker threads delivers the lanes that have events, one worker per lane
+at a time. Every observer sees its events in publish order, the caller never waits on
+an observer, and a slow observer ties up at most one worker; events beyond an observer's
+max_queue are dropped and counted rather than blocking anyone.
 """
+import threading
+import time
+from collections import deque
+from queue import Queue
+
+
 class Subject:
-    def __init__(self):
+    def __init__(self, dispatcher=None):
         self._observers = []
+        self.dispatcher = dispatcher
 
     def attach(self, observer):
         self._observers.append(observer)
+        if self.dispatcher is not None:
+            self.dispatcher.add_observer(observer)
 
     def detach(self, observer):
         self._observers.remove(observer)
+        if self.dispatcher is not None:
+            self.dispatcher.remove_observer(observer)
 
     def notify(self, data):
+        if self.dispatcher is not None:
+            self.dispatcher.publish(data)
+            return
         for observer in self._observers:
             observer.update(data)
 
@@ -21,6 +42,187 @@ class Observer:
     def update(self, data):
         raise NotImplementedError
 
+    def update_batch(self, events):
+        """Handle a burst of events delivered together; defaults to update() per event."""
+        for data in events:
+            self.update(data)
+
+
+class _Lane:
+    """One observer's bounded event queue and delivery counters; guarded by the dispatcher's lock."""
+
+    def __init__(self, observer):
+        self.observer = observer
+        self.events = deque()  # (queued_at, data)
+        self.scheduled = False  # waiting for, or held by, a worker
+        self.closed = False
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_error = None
+        self.latencies = deque(maxlen=1000)  # enqueue-to-delivery seconds of recent events
+
+    def deliver(self, batch):
+        """Hand a batch to the observer; runs on a worker thread without the lock held."""
+        update_batch = getattr(type(self.observer), "update_batch", None)
+        if update_batch is not None and update_batch is not Observer.update_batch:
+            self._call(self.observer.update_batch, [data for _queued_at, data in batch])
+        else:
+            # No batch handler of its own: deliver one by one so a failing event
+            # does not cost the observer the rest of the batch.
+            for _queued_at, data in batch:
+                self._call(self.observer.update, data)
+
+    def _call(self, handler, payload):
+        try:
+            handler(payload)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = repr(e)
+            print(f"[Observer] {type(self.observer).__name__} failed: {e!r}")
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "queue_depth": len(self.events),
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_error": self.last_error,
+            "avg_latency_ms": sum(latencies) * 1000 / len(latencies) if latencies else 0.0,
+            "p95_latency_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else 0.0,
+            "max_latency_ms": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+class AsyncDispatcher:
+    def __init__(self, max_batch=100, batch_window=0.01, max_queue=10000, workers=2):
+        """
+        - max_batch: most events handed to one observer in a single update_batch call.
+        - batch_window: seconds a lane's first event waits for more before its batch is delivered.
+        - max_queue: events buffered per observer; further events for it are dropped and counted.
+        - workers: threads delivering events, shared by all observers.
+        """
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self._lanes = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)  # notified whenever a lane finishes a batch
+        self._ready = Queue()  # lanes with events and no worker; None stops a worker
+        self._closed = False
+        self.published = 0
+        self._workers = [threading.Thread(target=self._work, name=f"observer-worker-{n}", daemon=True)
+                         for n in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def add_observer(self, observer):
+        with self._lock:
+            if id(observer) not in self._lanes:
+                self._lanes[id(observer)] = _Lane(observer)
+
+    def remove_observer(self, observer, timeout=1.0):
+        """
+        Stop the observer's lane after it has delivered what is already queued for it, waiting
+        at most timeout seconds; whatever is still queued then is dropped.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            lane = self._lanes.pop(id(observer), None)
+            if lane is None:
+                return
+            self._wait_idle([lane], deadline)
+            lane.closed = True
+            lane.dropped += len(lane.events)
+            lane.events.clear()
+
+    def publish(self, data):
+        """Queue an event for every observer; never blocks on an observer."""
+        item = (time.monotonic(), data)
+        with self._lock:
+            if self._closed:
+                return
+            self.published += 1
+            for lane in self._lanes.values():
+                if len(lane.events) >= self.max_queue:
+                    lane.dropped += 1
+                    continue
+                lane.events.append(item)
+                if not lane.scheduled:
+                    lane.scheduled = True
+                    self._ready.put_nowait(lane)
+
+    def _work(self):
+        while True:
+            lane = self._ready.get()
+            if lane is None:
+                return
+            with self._lock:
+                first_queued = lane.events[0][0] if lane.events else None
+                backlog = len(lane.events)
+            # Coalesce a burst: give the lane's first event up to batch_window to gather company.
+            if first_queued is not None and backlog < self.max_batch and not self._closed:
+                time.sleep(max(0.0, first_queued + self.batch_window - time.monotonic()))
+            with self._lock:
+                batch = [lane.events.popleft() for _ in range(min(self.max_batch, len(lane.events)))]
+            if batch and not lane.closed:
+                lane.deliver(batch)
+            now = time.monotonic()
+            with self._lock:
+                if batch:
+                    lane.delivered += len(batch)
+                    lane.batches += 1
+                    lane.latencies.extend(now - queued_at for queued_at, _data in batch)
+                if lane.events and not lane.closed:
+                    self._ready.put_nowait(lane)
+                else:
+                    lane.scheduled = False
+                self._idle.notify_all()
+
+    def _wait_idle(self, lanes, deadline):
+        """With the lock held, wait until the lanes have nothing queued or in delivery, or until deadline."""
+        while any(lane.events or lane.scheduled for lane in lanes):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout=2.0):
+        """
+        Stop accepting events, deliver what was already published and stop the workers,
+        all within timeout seconds. Events still queued at the deadline are dropped, and a
+        worker stuck in an observer is abandoned (the workers are daemon threads).
+        Returns True if everything published was delivered.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self._closed = True
+            lanes = list(self._lanes.values())
+            drained = self._wait_idle(lanes, deadline)
+            self._lanes.clear()
+            for lane in lanes:
+                lane.closed = True
+                lane.dropped += len(lane.events)
+                lane.events.clear()
+        for _worker in self._workers:
+            self._ready.put_nowait(None)
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        return drained
+
+    def stats(self):
+        """Published count plus per-observer queue depth, delivery counts and latency."""
+        with self._lock:
+            return {
+                "published": self.published,
+                "observers": {f"{type(lane.observer).__name__}#{index}": lane.stats()
+                              for index, lane in enumerate(self._lanes.values())},
+            }
+
 class BookingSubject(Subject):
     def change_booking_status(self, booking_id, new_status):
         data = {"booking_id": booking_id, "new_status": new_status}
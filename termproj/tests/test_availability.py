@@ -0,0 +1,69 @@
+# tests/test_availability.py
+"""
+Tests for the availability index behind DBManager.is_car_free / get_free_cars.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+
+WINDOW = "2025-01-01 to 2025-12-31"
+
+
+class AvailabilityIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "availability.db")
+        self.db = DBManager(path)
+        self.db.insert_user("Owner", "owner@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        self.user_id = self.db.get_user_by_email("owner@example.com").user_id
+        self.db.add_balance(self.user_id, 1000.0)
+        self.db.insert_car(self.user_id, "Car", 2020, 1000, "Testville", 10.0, WINDOW)
+        # Another process or thread writing to the same file through its own connection.
+        self.other = DBManager(path)
+
+    def tearDown(self):
+        self.other.close()
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def test_sees_writes_from_other_connections(self):
+        self.assertTrue(self.db.is_car_free(1, "2025-07-01", "2025-07-03"))
+        self.assertTrue(self.other.rent_car(1, self.user_id, "2025-07-02", "2025-07-02")[0])
+        self.assertFalse(self.db.is_car_free(1, "2025-07-01", "2025-07-03"))
+
+        self.other.update_car_availability(1, "2026-01-01 to 2026-12-31")
+        self.assertFalse(self.db.is_car_free(1, "2025-08-01", "2025-08-03"))
+        self.assertTrue(self.db.is_car_free(1, "2026-08-01", "2026-08-03"))
+
+        self.other.insert_car(self.user_id, "New", 2021, 10, "Testville", 10.0, WINDOW)
+        self.assertEqual(self.db.get_free_cars([1, 2], "2025-08-01", "2025-08-03"), [2])
+
+    def test_booking_committed_during_the_load_is_not_lost(self):
+        load = self.db._load_availability
+
+        def load_then_concurrent_booking(cur):
+            load(cur)
+            self.assertTrue(self.other.rent_car(1, self.user_id, "2025-07-02", "2025-07-02")[0])
+
+        self.db._load_availability = load_then_concurrent_booking
+        self.assertTrue(self.db.is_car_free(1, "2025-07-01", "2025-07-03"))
+        self.db._load_availability = load
+        self.assertFalse(self.db.is_car_free(1, "2025-07-01", "2025-07-03"))
+
+    def test_reloads_in_full_when_the_change_log_was_pruned(self):
+        self.assertTrue(self.db.is_car_free(1, "2025-07-01", "2025-07-03"))
+        self.assertTrue(self.other.rent_car(1, self.user_id, "2025-07-02", "2025-07-02")[0])
+        self.assertTrue(self.other.rent_car(1, self.user_id, "2025-08-02", "2025-08-02")[0])
+        conn = self.other.conn
+        conn.execute("DELETE FROM availability_changes WHERE seq < (SELECT MAX(seq) FROM availability_changes)")
+        conn.commit()
+        self.assertFalse(self.db.is_car_free(1, "2025-07-01", "2025-07-03"))
+        self.assertFalse(self.db.is_car_free(1, "2025-08-01", "2025-08-03"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# tests/test_booking_engine.py
+"""
+Tests for database/booking_engine.py.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+
+PROCESSES = 8
+CARS = 4
+PRICE_PER_DAY = 10.0
+STARTING_BALANCE = 1000.0
+# Overlapping three-day slots: every process tries every slot of every car.
+SLOTS = [("2025-07-01", "2025-07-03"), ("2025-07-02", "2025-07-04"), ("2025-07-05", "2025-07-07")]
+
+
+def make_database(path, renters):
+    db = DBManager(path)
+    db.insert_user("Owner", "owner@example.com", "pw", "q", "a", "q", "a", "q", "a")
+    owner_id = db.get_user_by_email("owner@example.com").user_id
+    for n in range(renters):
+        email = f"renter{n}@example.com"
+        db.insert_user(f"Renter {n}", email, "pw", "q", "a", "q", "a", "q", "a")
+        db.add_balance(db.get_user_by_email(email).user_id, STARTING_BALANCE)
+    for n in range(CARS):
+        db.insert_car(owner_id, f"Car {n}", 2020, 1000, "Testville", PRICE_PER_DAY, "2025-01-01 to 2025-12-31")
+    return db
+
+
+def book_everything(path, renter_email, start, results):
+    start.wait()
+    db = DBManager(path)
+    renter_id = db.get_user_by_email(renter_email).user_id
+    booked = 0
+    for car_id in range(1, CARS + 1):
+        for start_date, end_date in SLOTS:
+            success, _message = db.rent_car(car_id, renter_id, start_date, end_date)
+            booked += success
+    results.put((renter_id, booked))
+    db.close()
+
+
+class BookingEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "bookings.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_concurrent_processes_never_double_book(self):
+        make_database(self.path, PROCESSES).close()
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=book_everything,
+                                           args=(self.path, f"renter{n}@example.com", start, results))
+                   for n in range(PROCESSES)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        booked_by = dict(results.get(timeout=60) for _ in workers)
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+
+        db = DBManager(self.path)
+        bookings = db.conn.execute(
+            "SELECT car_id, renter_id, start_date, end_date FROM bookings WHERE status = 'Booked'"
+        ).fetchall()
+        # Per car, slots 1 and 2 overlap, so at most one of them is booked; slot 3 is always booked.
+        self.assertEqual(len(bookings), CARS * 2)
+        for car_id in range(1, CARS + 1):
+            intervals = sorted((b["start_date"], b["end_date"]) for b in bookings if b["car_id"] == car_id)
+            for (_start, earlier_end), (later_start, _end) in zip(intervals, intervals[1:]):
+                self.assertLess(earlier_end, later_start)
+        self.assertEqual(sum(booked_by.values()), len(bookings))
+        for renter_id, booked in booked_by.items():
+            self.assertAlmostEqual(db.get_balance(renter_id), STARTING_BALANCE - booked * 3 * PRICE_PER_DAY)
+        db.close()
+
+    def test_failed_write_does_not_break_the_next_booking(self):
+        db = make_database(self.path, 1)
+        renter_id = db.get_user_by_email("renter0@example.com").user_id
+        # Duplicate email: the insert fails and must not leave its transaction open.
+        self.assertFalse(db.insert_user("Again", "renter0@example.com", "pw", "q", "a", "q", "a", "q", "a"))
+        self.assertFalse(db.conn.in_transaction)
+        # Even with a transaction left open by someone else, booking still works.
+        db.conn.execute("UPDATE users SET name = name WHERE user_id = ?", (renter_id,))
+        self.assertTrue(db.conn.in_transaction)
+        success, message = db.rent_car(1, renter_id, "2025-07-01", "2025-07-03")
+        self.assertTrue(success, message)
+        db.close()
+
+
+    def test_unpadded_dates_are_checked_for_overlap(self):
+        db = make_database(self.path, 1)
+        renter_id = db.get_user_by_email("renter0@example.com").user_id
+        success, message = db.rent_car(1, renter_id, "2025-7-1", "2025-7-9")
+        self.assertTrue(success, message)
+        self.assertFalse(db.rent_car(1, renter_id, "2025-07-05", "2025-07-05")[0])
+        booking = db.conn.execute("SELECT start_date, end_date FROM bookings").fetchone()
+        self.assertEqual(tuple(booking), ("2025-07-01", "2025-07-09"))
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
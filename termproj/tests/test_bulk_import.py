@@ -0,0 +1,79 @@
+# tests/test_bulk_import.py
+"""
+Tests for database/bulk_import.py.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.bulk_import import BulkImporter
+from database.db_manager import DBManager
+
+
+def user_record(email):
+    return {"name": "Imported", "email": email, "password": "pw",
+            "security_q1": "q", "security_a1": "a", "security_q2": "q",
+            "security_a2": "a", "security_q3": "q", "security_a3": "a"}
+
+
+class BulkImportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.directory, "import.db"))
+        self.importer = BulkImporter(self.db, batch_size=2)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def test_imported_user_can_log_in_with_the_email_as_given(self):
+        report = self.importer.import_records("users", [(1, user_record("Alice@Example.com"))])
+        self.assertEqual(report.rows_imported, 1)
+        self.assertIsNotNone(self.db.get_user_by_email_and_password("Alice@Example.com", "pw"))
+        self.assertIsNotNone(self.db.get_user_by_email("Alice@Example.com"))
+
+    def test_overlapping_booked_rows_are_rejected(self):
+        self.db.insert_user("Owner", "owner@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        owner_id = self.db.get_user_by_email("owner@example.com").user_id
+        self.db.insert_car(owner_id, "Car", 2020, 1000, "Testville", 10.0, "2025-01-01 to 2025-12-31")
+        self.db.conn.execute("INSERT INTO bookings(car_id, renter_id, start_date, end_date, status) "
+                             "VALUES (1, ?, '2025-03-01', '2025-03-05', 'Booked')", (owner_id,))
+        self.db.conn.commit()
+
+        def booking(start_date, end_date, status="Booked"):
+            return {"car_id": 1, "renter_id": owner_id, "start_date": start_date,
+                    "end_date": end_date, "status": status}
+
+        report = self.importer.import_records("bookings", [
+            (1, booking("2025-03-05", "2025-03-07")),               # overlaps the existing booking
+            (2, booking("2025-04-01", "2025-04-03")),
+            (3, booking("2025-4-3", "2025-4-4")),                   # overlaps line 2
+            (4, booking("2025-04-02", "2025-04-02", "Completed")),  # history may overlap
+            (5, booking("2025-04-04", "2025-04-06")),
+        ])
+        self.assertEqual(report.rows_imported, 3)
+        self.assertEqual([line for line, _reason in report.rejected], [1, 3])
+        booked = self.db.conn.execute(
+            "SELECT start_date FROM bookings WHERE status = 'Booked' ORDER BY start_date").fetchall()
+        self.assertEqual([row[0] for row in booked], ["2025-03-01", "2025-04-01", "2025-04-04"])
+
+
+    def test_imported_dates_are_zero_padded_for_rent_car(self):
+        self.db.insert_user("Owner", "owner@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        owner_id = self.db.get_user_by_email("owner@example.com").user_id
+        self.db.add_balance(owner_id, 1000.0)
+        self.db.insert_car(owner_id, "Car", 2020, 1000, "Testville", 10.0, "2025-01-01 to 2025-12-31")
+        report = self.importer.import_records("bookings", [
+            (1, {"car_id": 1, "renter_id": owner_id, "start_date": "2025-4-10", "end_date": "2025-4-12",
+                 "status": "Booked"}),
+        ])
+        self.assertEqual(report.rows_imported, 1)
+        booking = self.db.conn.execute("SELECT start_date, end_date FROM bookings").fetchone()
+        self.assertEqual(tuple(booking), ("2025-04-10", "2025-04-12"))
+        self.assertFalse(self.db.rent_car(1, owner_id, "2025-04-11", "2025-04-11")[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# tests/test_cache.py
+"""
+Tests for database/cache.py.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.cache import LRUCache
+from database.db_manager import DBManager
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_load_racing_an_invalidation_is_not_cached(self):
+        cache = LRUCache()
+        row = {"balance": 100.0}
+
+        def load_then_concurrent_write():
+            value = row["balance"]
+            # A write commits and invalidates while the loader still holds the old value.
+            row["balance"] = 150.0
+            cache.invalidate("balance")
+            return value
+
+        self.assertEqual(cache.get_or_load("balance", load_then_concurrent_write), 100.0)
+        self.assertEqual(cache.get_or_load("balance", lambda: row["balance"]), 150.0)
+
+    def test_zero_size_disables_caching(self):
+        cache = LRUCache(max_size=0)
+        cache.put("key", "value")
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats()["evictions"], 0)
+
+    def test_balance_is_fresh_after_add_balance_during_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            db = DBManager(os.path.join(directory, "cache.db"))
+            db.insert_user("User", "user@example.com", "pw", "q", "a", "q", "a", "q", "a")
+            user_id = db.get_user_by_email("user@example.com").user_id
+            db.add_balance(user_id, 100.0)
+            load_balance = db._load_balance
+
+            def racing_load(uid):
+                value = load_balance(uid)
+                db.add_balance(uid, 50.0)
+                return value
+
+            db._load_balance = racing_load
+            self.assertEqual(db.get_balance(user_id), 100.0)
+            db._load_balance = load_balance
+            self.assertEqual(db.get_balance(user_id), 150.0)
+            db.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
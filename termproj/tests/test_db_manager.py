@@ -0,0 +1,106 @@
+# tests/test_db_manager.py
+"""
+Tests for database/db_manager.py.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+
+
+class IndexUsageTest(unittest.TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        directory = tempfile.mkdtemp()
+        try:
+            db = DBManager(os.path.join(directory, "plans.db"))
+            for name, (index, used, plan) in db.check_index_usage().items():
+                self.assertTrue(used, f"{name}: expected {index}, plan {plan}")
+            db.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+class ConversationInboxTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.directory, "inbox.db"))
+        for name in ("Alice", "Bob", "Carol"):
+            self.db.insert_user(name, f"{name.lower()}@example.com", "secret", "q", "answer", "q", "answer",
+                                "q", "answer")
+        self.alice, self.bob, self.carol = (self.db.get_user_by_email(f"{name}@example.com").user_id
+                                            for name in ("alice", "bob", "carol"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def test_one_row_per_partner_with_unread_counts_and_no_secrets(self):
+        self.db.insert_message(self.bob, self.alice, "hi alice")
+        self.db.insert_message(self.alice, self.bob, "hi bob")
+        self.db.insert_message(self.bob, self.alice, "how are you?")
+        self.db.insert_message(self.carol, self.alice, "hello from carol")
+        self.db.mark_conversation_read(self.alice, self.carol)
+
+        inbox = self.db.get_conversation_inbox(self.alice, preview_length=5)
+        self.assertEqual(set(inbox[0]), {"user_id", "name", "email", "last_message_id", "last_timestamp",
+                                         "last_preview", "unread_count"})
+        by_partner = {row["user_id"]: row for row in inbox}
+        self.assertEqual(set(by_partner), {self.bob, self.carol})
+        self.assertEqual(by_partner[self.bob]["email"], "bob@example.com")
+        self.assertEqual(by_partner[self.bob]["unread_count"], 2)
+        self.assertEqual(by_partner[self.bob]["last_preview"], "how a")
+        self.assertEqual(by_partner[self.carol]["unread_count"], 0)
+        self.assertEqual(self.db.get_conversation_inbox(self.alice, 5, limit=1, offset=1), inbox[1:])
+
+
+class StreamingQueriesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.directory, "streams.db"), fetch_batch_size=3)
+        for name in ("owner", "renter"):
+            self.db.insert_user(name, f"{name}@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        self.owner = self.db.get_user_by_email("owner@example.com").user_id
+        self.renter = self.db.get_user_by_email("renter@example.com").user_id
+        conn = self.db.conn
+        for n in range(10):
+            self.db.insert_car(self.owner, f"Car {n}", 2020, 1000, "Testville", 10.0, "2025-01-01 to 2025-12-31")
+            conn.execute("INSERT INTO bookings(car_id, renter_id, start_date, end_date, status) "
+                         "VALUES (?, ?, '2024-01-01', '2024-01-02', 'Completed')", (n + 1, self.renter))
+            conn.execute("INSERT INTO reviews(booking_id, reviewer_id, reviewee_id, rating, feedback, timestamp) "
+                         "VALUES (?, ?, ?, 5, '', '2024-01-03 00:00:00')", (n + 1, self.renter, self.owner))
+            self.db.insert_message(self.renter, self.owner, f"message {n}")
+        conn.commit()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def test_streams_yield_every_row_across_batches(self):
+        streams = [
+            (self.db.iter_cars_by_owner, self.db.get_cars_by_owner, self.owner),
+            (self.db.iter_messages, self.db.get_messages, self.owner),
+            (self.db.iter_rental_history_for_renter, self.db.get_rental_history_for_renter, self.renter),
+            (self.db.iter_rental_history_for_owner, self.db.get_rental_history_for_owner, self.owner),
+            (self.db.iter_reviews_for_user, self.db.get_reviews_for_user, self.owner),
+        ]
+        for stream, getter, key in streams:
+            rows = list(stream(key))
+            self.assertEqual(len(rows), 10, stream.__name__)
+            self.assertEqual([row.to_dict() for row in rows], [row.to_dict() for row in getter(key)])
+            self.assertEqual(len(list(stream(key, batch_size=4))), 10)
+
+    def test_streams_are_lazy_and_independent(self):
+        cars = self.db.iter_cars_by_owner(self.owner)
+        messages = self.db.iter_messages(self.owner)
+        self.assertEqual(next(cars).model, "Car 0")
+        # A second stream on the same connection does not disturb the first.
+        self.assertEqual(next(messages).content, "message 0")
+        self.assertEqual([car.model for car in cars], [f"Car {n}" for n in range(1, 10)])
+        self.assertEqual(len(list(messages)), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
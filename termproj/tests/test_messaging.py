@@ -0,0 +1,73 @@
+# tests/test_messaging.py
+"""
+Tests for the chat queries of database/db_manager.py.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+
+
+class MessagingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.directory, "messages.db"))
+        for name in ("alice", "bob", "carol"):
+            self.db.insert_user(name, f"{name}@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        self.alice, self.bob, self.carol = (self.db.get_user_by_email(f"{name}@example.com").user_id
+                                            for name in ("alice", "bob", "carol"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+
+class ConversationSinceTest(MessagingTestCase):
+    def test_returns_only_newer_messages_of_the_pair_oldest_first(self):
+        first = self.db.insert_message(self.alice, self.bob, "one")
+        self.db.insert_message(self.bob, self.alice, "two")
+        self.db.insert_message(self.carol, self.alice, "not in this chat")
+        self.db.insert_message(self.alice, self.bob, "three")
+
+        messages = self.db.get_conversation_since(self.alice, self.bob, first)
+        self.assertEqual([m.content for m in messages], ["two", "three"])
+        self.assertEqual([m.content for m in self.db.get_conversation_since(self.bob, self.alice)],
+                         ["one", "two", "three"])
+        self.assertEqual(self.db.get_conversation_since(self.alice, self.bob, messages[-1].message_id), [])
+
+
+class ConversationPageTest(MessagingTestCase):
+    def setUp(self):
+        super().setUp()
+        # Timestamps repeat, so the (timestamp, message_id) keyset must break ties on message_id.
+        conn = self.db.conn
+        for n in range(25):
+            sender, receiver = (self.alice, self.bob) if n % 3 else (self.bob, self.alice)
+            conn.execute("INSERT INTO messages(sender_id, receiver_id, content, timestamp) VALUES (?, ?, ?, ?)",
+                         (sender, receiver, f"m{n}", f"2025-01-01 10:00:{n // 4:02d}"))
+        conn.execute("INSERT INTO messages(sender_id, receiver_id, content, timestamp) "
+                     "VALUES (?, ?, 'other chat', '2025-01-01 10:00:30')", (self.carol, self.alice))
+        conn.commit()
+
+    def test_pages_scroll_back_through_the_whole_conversation_newest_first(self):
+        pages, before = [], None
+        while True:
+            page = self.db.get_conversation_page(self.alice, self.bob, limit=7, before=before)
+            if not page:
+                break
+            self.assertLessEqual(len(page), 7)
+            pages.append([m.content for m in page])
+            before = (page[-1].timestamp, page[-1].message_id)
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 4])
+        self.assertEqual(sum(pages, []), [f"m{n}" for n in reversed(range(25))])
+
+    def test_both_participants_see_the_same_page(self):
+        self.assertEqual([m.message_id for m in self.db.get_conversation_page(self.alice, self.bob, limit=10)],
+                         [m.message_id for m in self.db.get_conversation_page(self.bob, self.alice, limit=10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+# tests/test_migrations.py
+"""
+Tests for database/migrations.py: upgrading a database created with the original,
+unversioned schema.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+from database.migrations import LATEST_VERSION, schema_version
+
+CARS = 50
+PROCESSES = 4
+
+# The schema the application created before migrations existed.
+BASELINE_SCHEMA = """
+    CREATE TABLE users (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL, security_q1 TEXT NOT NULL, security_a1 TEXT NOT NULL,
+        security_q2 TEXT NOT NULL, security_a2 TEXT NOT NULL, security_q3 TEXT NOT NULL,
+        security_a3 TEXT NOT NULL, balance REAL NOT NULL DEFAULT 0.0
+    );
+    CREATE TABLE cars (
+        car_id INTEGER PRIMARY KEY AUTOINCREMENT, owner_id INTEGER NOT NULL, model TEXT NOT NULL,
+        year INTEGER NOT NULL, mileage INTEGER NOT NULL, location TEXT NOT NULL,
+        price_per_day REAL NOT NULL, availability TEXT
+    );
+    CREATE TABLE bookings (
+        booking_id INTEGER PRIMARY KEY AUTOINCREMENT, car_id INTEGER NOT NULL, renter_id INTEGER NOT NULL,
+        start_date TEXT NOT NULL, end_date TEXT NOT NULL, status TEXT NOT NULL
+    );
+    CREATE TABLE messages (
+        message_id INTEGER PRIMARY KEY AUTOINCREMENT, sender_id INTEGER NOT NULL,
+        receiver_id INTEGER NOT NULL, content TEXT NOT NULL, timestamp TEXT NOT NULL
+    );
+    CREATE TABLE reviews (
+        review_id INTEGER PRIMARY KEY AUTOINCREMENT, booking_id INTEGER NOT NULL UNIQUE,
+        reviewer_id INTEGER NOT NULL, reviewee_id INTEGER NOT NULL, rating INTEGER NOT NULL,
+        feedback TEXT, timestamp TEXT NOT NULL
+    );
+"""
+
+
+def make_baseline_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO users(name, email, password, security_q1, security_a1, security_q2, "
+                 "security_a2, security_q3, security_a3) VALUES ('Owner', 'owner@example.com', 'pw', "
+                 "'q', 'a', 'q', 'a', 'q', 'a')")
+    for n in range(1, CARS + 1):
+        availability = "2025-01-01 to 2025-12-31" if n % 5 else "whenever"
+        conn.execute("INSERT INTO cars(owner_id, model, year, mileage, location, price_per_day, availability) "
+                     "VALUES (1, ?, 2020, 1000, 'Testville', 10.0, ?)", (f"Model{n}", availability))
+        conn.execute("INSERT INTO bookings(car_id, renter_id, start_date, end_date, status) "
+                     "VALUES (?, 1, '2024-01-01', '2024-01-02', 'Completed')", (n,))
+        conn.execute("INSERT INTO reviews(booking_id, reviewer_id, reviewee_id, rating, feedback, timestamp) "
+                     "VALUES (?, 1, 1, ?, '', '2024-01-03 00:00:00')", (n, n % 5 + 1))
+    conn.commit()
+    conn.close()
+
+
+def open_database(path, start):
+    start.wait()
+    DBManager(path, migration_chunk_size=7).close()
+
+
+class MigrationsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "baseline.db")
+        make_baseline_database(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_fully_migrated(self):
+        db = DBManager(self.path)
+        self.assertEqual(schema_version(db.conn), LATEST_VERSION)
+        cars = db.conn.execute("SELECT car_id, available_from, available_to FROM cars").fetchall()
+        for car_id, available_from, available_to in cars:
+            expected = (None, None) if car_id % 5 == 0 else ("2025-01-01", "2025-12-31")
+            self.assertEqual((available_from, available_to), expected)
+        self.assertTrue(db.fts_enabled)
+        self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM cars_fts").fetchone()[0], CARS)
+        self.assertEqual([car.car_id for car in db.search_cars_fts("model7", 5000, "2025-06-01")], [7])
+        summary = db.get_user_rating_summary(1)
+        self.assertEqual(summary["review_count"], CARS)
+        self.assertEqual(summary["histogram"], {rating: CARS // 5 for rating in range(1, 6)})
+        self.assertEqual(db.get_car_rating_summary(3)["review_count"], 1)
+        indexes = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_messages_sender_receiver_id", indexes)
+        self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM message_reads").fetchone()[0], 0)
+        db.close()
+
+    def test_upgrade_from_the_baseline_schema(self):
+        DBManager(self.path, migration_chunk_size=7).close()
+        self.assert_fully_migrated()
+
+    def test_concurrent_upgrades_apply_each_step_once(self):
+        start = multiprocessing.Event()
+        workers = [multiprocessing.Process(target=open_database, args=(self.path, start))
+                   for _ in range(PROCESSES)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+        self.assert_fully_migrated()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# tests/test_models.py
+"""
+Tests for the slotted models in models/ and the rows DBManager builds from them.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+from models.booking import Booking
+from models.car import Car
+from models.message import Message
+from models.review import Review
+from models.user import User
+
+
+class RowModelTest(unittest.TestCase):
+    def test_models_are_slotted_and_fields_follow_the_constructor(self):
+        for model in (Booking, Car, Message, Review, User):
+            instance = model(*range(len(model.FIELDS)))
+            self.assertFalse(hasattr(instance, "__dict__"), model.__name__)
+            self.assertEqual([getattr(instance, field) for field in model.FIELDS], list(range(len(model.FIELDS))))
+
+    def test_dict_style_access(self):
+        booking = Booking.from_row(None, (1, 2, 3, "2025-01-01", "2025-01-02", "Booked"))
+        self.assertEqual(booking["status"], "Booked")
+        self.assertEqual(booking.get("car_id"), 2)
+        self.assertIsNone(booking.get("missing"))
+        self.assertEqual(dict(booking), booking.to_dict())
+        self.assertEqual(list(booking.keys()), list(Booking.FIELDS))
+        with self.assertRaises(KeyError):
+            booking["missing"]
+
+    def test_select_columns(self):
+        self.assertEqual(Message.select_columns(),
+                         "message_id, sender_id, receiver_id, content, timestamp")
+        self.assertTrue(Booking.select_columns("b").startswith("b.booking_id, b.car_id"))
+
+
+class ModelRowsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.directory, "models.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def test_queries_fill_every_field_from_its_column(self):
+        self.db.insert_user("Owner", "owner@example.com", "pw", "q1", "a1", "q2", "a2", "q3", "a3")
+        user = self.db.get_user_by_email("owner@example.com")
+        self.assertIsInstance(user, User)
+        self.assertEqual((user.name, user.email, user.password, user.security_a3, user.balance),
+                         ("Owner", "owner@example.com", "pw", "a3", 0.0))
+        self.db.insert_car(user.user_id, "Civic", 2020, 1000, "Testville", 25.0, "2025-01-01 to 2025-12-31")
+        car, = self.db.get_cars_by_owner(user.user_id)
+        self.assertIsInstance(car, Car)
+        self.assertEqual((car.model, car.year, car.mileage, car.location, car.price_per_day),
+                         ("Civic", 2020, 1000, "Testville", 25.0))
+        self.assertEqual((car.available_from, car.available_to), ("2025-01-01", "2025-12-31"))
+
+
+if __name__ == "__main__":
+    unittest.main()
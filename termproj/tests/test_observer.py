@@ -0,0 +1,101 @@
+# tests/test_observer.py
+"""
+Tests for the AsyncDispatcher in patterns/observer.py.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import threading
+import time
+import unittest
+
+from patterns.observer import AsyncDispatcher, BookingSubject, Observer
+
+
+class Recorder(Observer):
+    def __init__(self):
+        self.events = []
+
+    def update(self, data):
+        self.events.append(data["booking_id"])
+
+
+class Blocked(Observer):
+    """Blocks in update() until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.events = []
+
+    def update(self, data):
+        self.release.wait()
+        self.events.append(data["booking_id"])
+
+
+class AsyncDispatcherTest(unittest.TestCase):
+    def test_each_observer_gets_events_in_publish_order(self):
+        dispatcher = AsyncDispatcher(max_batch=7, batch_window=0.001, workers=3)
+        subject = BookingSubject(dispatcher)
+        recorders = [Recorder() for _ in range(5)]
+        for recorder in recorders:
+            subject.attach(recorder)
+        for booking_id in range(1000):
+            subject.change_booking_status(booking_id, "Booked")
+        self.assertTrue(dispatcher.close(timeout=5.0))
+        for recorder in recorders:
+            self.assertEqual(recorder.events, list(range(1000)))
+        self.assertEqual(dispatcher.published, 1000)
+
+    def test_full_lane_drops_without_blocking_the_publisher_or_others(self):
+        dispatcher = AsyncDispatcher(batch_window=0.0, max_queue=10, workers=2)
+        subject = BookingSubject(dispatcher)
+        slow, fast = Blocked(), Recorder()
+        subject.attach(slow)
+        subject.attach(fast)
+        for booking_id in range(10):
+            subject.change_booking_status(booking_id, "Booked")
+        deadline = time.monotonic() + 5.0
+        while len(fast.events) < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The slow observer holds one worker; the other still serves the fast one.
+        self.assertEqual(fast.events, list(range(10)))
+        started = time.monotonic()
+        for booking_id in range(10, 100):
+            subject.change_booking_status(booking_id, "Booked")
+        self.assertLess(time.monotonic() - started, 1.0)
+        slow_stats = next(stats for name, stats in dispatcher.stats()["observers"].items()
+                          if name.startswith("Blocked"))
+        self.assertEqual(slow_stats["queue_depth"], 10)
+        # At most the first 10 events are in the blocked delivery; 10 more fit the queue.
+        self.assertGreaterEqual(slow_stats["dropped"], 100 - 10 - 10)
+        slow.release.set()
+        self.assertTrue(dispatcher.close(timeout=5.0))
+        self.assertEqual(slow.events, sorted(slow.events))
+
+    def test_close_honours_its_timeout_with_a_stuck_observer(self):
+        dispatcher = AsyncDispatcher(batch_window=0.0, max_queue=5, workers=1)
+        subject = BookingSubject(dispatcher)
+        stuck = Blocked()
+        subject.attach(stuck)
+        for booking_id in range(50):
+            subject.change_booking_status(booking_id, "Booked")
+        started = time.monotonic()
+        self.assertFalse(dispatcher.close(timeout=0.2))
+        self.assertLess(time.monotonic() - started, 1.0)
+        stuck.release.set()
+
+    def test_published_counts_every_concurrent_publish(self):
+        dispatcher = AsyncDispatcher()
+        subject = BookingSubject(dispatcher)
+        subject.attach(Recorder())
+        threads = [threading.Thread(target=lambda: [subject.change_booking_status(n, "Booked")
+                                                    for n in range(500)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(dispatcher.published, 4000)
+        self.assertTrue(dispatcher.close(timeout=5.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# tests/test_ratings.py
+"""
+Tests for the trigger-maintained user_rating_summary and car_rating_summary tables.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+
+
+class RatingSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.directory, "ratings.db"))
+        for name in ("owner", "renter"):
+            self.db.insert_user(name, f"{name}@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        self.owner = self.db.get_user_by_email("owner@example.com").user_id
+        self.renter = self.db.get_user_by_email("renter@example.com").user_id
+        conn = self.db.conn
+        for car_id, n in ((1, 0), (1, 1), (2, 2)):
+            if n < 2:
+                self.db.insert_car(self.owner, f"Car {n}", 2020, 1000, "Testville", 10.0, None)
+            conn.execute("INSERT INTO bookings(car_id, renter_id, start_date, end_date, status) "
+                         "VALUES (?, ?, '2024-01-01', '2024-01-02', 'Completed')", (car_id, self.renter))
+        conn.commit()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def assert_summary(self, summary, ratings):
+        self.assertEqual(summary["review_count"], len(ratings))
+        self.assertEqual(summary["rating_sum"], sum(ratings))
+        self.assertAlmostEqual(summary["avg_rating"], sum(ratings) / len(ratings) if ratings else 0.0)
+        self.assertEqual(summary["histogram"], {i: ratings.count(i) for i in range(1, 6)})
+
+    def test_summaries_follow_inserts_updates_and_deletes(self):
+        self.assert_summary(self.db.get_user_rating_summary(self.owner), [])
+        for booking_id, rating in ((1, 5), (2, 3), (3, 4)):
+            self.assertTrue(self.db.insert_review(booking_id, self.renter, self.owner, rating, "ok"))
+        self.assert_summary(self.db.get_user_rating_summary(self.owner), [5, 3, 4])
+        self.assert_summary(self.db.get_car_rating_summary(1), [5, 3])
+        self.assert_summary(self.db.get_car_rating_summary(2), [4])
+
+        conn = self.db.conn
+        conn.execute("UPDATE reviews SET rating = 1 WHERE booking_id = 2")
+        conn.commit()
+        self.assert_summary(self.db.get_user_rating_summary(self.owner), [5, 1, 4])
+        self.assert_summary(self.db.get_car_rating_summary(1), [5, 1])
+
+        # Moving a review to another booking moves it between car summaries.
+        conn.execute("INSERT INTO bookings(booking_id, car_id, renter_id, start_date, end_date, status) "
+                     "VALUES (99, 1, ?, '2024-02-01', '2024-02-02', 'Completed')", (self.renter,))
+        conn.execute("UPDATE reviews SET booking_id = 99 WHERE booking_id = 3")
+        conn.commit()
+        self.assert_summary(self.db.get_car_rating_summary(2), [])
+        self.assert_summary(self.db.get_car_rating_summary(1), [5, 1, 4])
+
+        conn.execute("DELETE FROM reviews WHERE booking_id = 1")
+        conn.commit()
+        self.assert_summary(self.db.get_user_rating_summary(self.owner), [1, 4])
+        self.assert_summary(self.db.get_user_rating_summary(self.renter), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
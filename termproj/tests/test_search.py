@@ -0,0 +1,85 @@
+# tests/test_search.py
+"""
+Tests for DBManager.search_cars and search_cars_fts.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.db_manager import DBManager
+
+CARS = [
+    # model, mileage, location, price, availability
+    ("Honda Civic", 30000, "San Francisco, CA", 40.0, "2025-01-01 to 2025-06-30"),
+    ("Toyota Corolla", 80000, "San Jose, CA", 30.0, "2025-03-01 to 2025-12-31"),
+    ("Ford Focus", 10000, "Los Angeles, CA", 50.0, "whenever you like"),
+    ("Tesla Model 3", 5000, "San Francisco, CA", 90.0, "2025-07-01 to 2025-07-31"),
+]
+
+
+class SearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # No result cache, so every call runs the query.
+        self.db = DBManager(os.path.join(self.directory, "search.db"), search_cache_size=0)
+        self.db.insert_user("Owner", "owner@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        owner_id = self.db.get_user_by_email("owner@example.com").user_id
+        for model, mileage, location, price, availability in CARS:
+            self.db.insert_car(owner_id, model, 2020, mileage, location, price, availability)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def models(self, cars):
+        return [car.model for car in cars]
+
+
+class SearchCarsTest(SearchTestCase):
+    def test_filters_location_mileage_and_availability_window(self):
+        self.assertEqual(self.models(self.db.search_cars("san", 100000, "2025-05-01")),
+                         ["Honda Civic", "Toyota Corolla"])
+        self.assertEqual(self.models(self.db.search_cars("san", 50000, "2025-05-01")), ["Honda Civic"])
+        self.assertEqual(self.models(self.db.search_cars("FRANCISCO", 100000, "2025-07-15")), ["Tesla Model 3"])
+        # Window bounds are inclusive.
+        self.assertEqual(self.models(self.db.search_cars("san", 100000, "2025-06-30")),
+                         ["Honda Civic", "Toyota Corolla"])
+
+    def test_unstructured_availability_is_included_unless_asked_not_to(self):
+        self.assertEqual(self.models(self.db.search_cars("angeles", 100000, "2030-01-01")), ["Ford Focus"])
+        self.assertEqual(self.db.search_cars("angeles", 100000, "2030-01-01", include_unstructured=False), [])
+
+    def test_order_and_page(self):
+        self.assertEqual(self.models(self.db.search_cars("ca", 100000, "2025-05-01", order_by="price")),
+                         ["Toyota Corolla", "Honda Civic", "Ford Focus"])
+        self.assertEqual(self.models(self.db.search_cars("ca", 100000, "2025-05-01", order_by="mileage",
+                                                         limit=2, offset=1)),
+                         ["Honda Civic", "Toyota Corolla"])
+        with self.assertRaises(ValueError):
+            self.db.search_cars("ca", 100000, "2025-05-01", order_by="year")
+
+
+class SearchCarsFtsTest(SearchTestCase):
+    def test_word_prefixes_match_model_or_location(self):
+        self.assertTrue(self.db.fts_enabled)
+        self.assertEqual(self.models(self.db.search_cars_fts("san fran", 100000, "2025-05-01")), ["Honda Civic"])
+        self.assertEqual(self.models(self.db.search_cars_fts("TOY", 100000, "2025-05-01")), ["Toyota Corolla"])
+        self.assertEqual(self.models(self.db.search_cars_fts("model", 100000, "2025-07-04")), ["Tesla Model 3"])
+        self.assertEqual(self.db.search_cars_fts("francisco", 100000, "2025-05-01", include_unstructured=False,
+                                                 limit=1, offset=1), [])
+        self.assertEqual(self.db.search_cars_fts("!!", 100000, "2025-05-01"), [])
+
+    def test_index_follows_inserts_and_updates(self):
+        owner_id = self.db.get_user_by_email("owner@example.com").user_id
+        self.db.insert_car(owner_id, "Mazda Miata", 2021, 100, "Oakland, CA", 60.0, "2025-01-01 to 2025-12-31")
+        self.assertEqual(self.models(self.db.search_cars_fts("oakland", 100000, "2025-05-01")), ["Mazda Miata"])
+        self.db.conn.execute("UPDATE cars SET location = 'Berkeley, CA' WHERE model = 'Mazda Miata'")
+        self.db.conn.commit()
+        self.assertEqual(self.db.search_cars_fts("oakland", 100000, "2025-05-01"), [])
+        self.assertEqual(self.models(self.db.search_cars_fts("berk", 100000, "2025-05-01")), ["Mazda Miata"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_search_cache.py
+"""
+Tests for database/search_cache.py: after every write path, cached searches must
+return what the same searches return with the cache disabled.
+Run from termproj/: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.bulk_import import BulkImporter
+from database.db_manager import DBManager
+from database.search_cache import could_match, like_key
+
+WINDOW = "2025-01-01 to 2025-12-31"
+LIKE_SEARCHES = [("são", "price"), ("SÃO", None), ("paulo", "mileage"), ("S%o", None), ("ville", None)]
+FTS_SEARCHES = ["sao", "são paulo", "civic", "test"]
+
+
+class SearchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "search.db")
+        self.db = DBManager(path)
+        self.db.insert_user("Owner", "owner@example.com", "pw", "q", "a", "q", "a", "q", "a")
+        self.owner_id = self.db.get_user_by_email("owner@example.com").user_id
+        self.db.add_balance(self.owner_id, 1000.0)
+        self.db.insert_car(self.owner_id, "Honda Civic", 2020, 1000, "São Paulo", 30.0, WINDOW)
+        self.db.insert_car(self.owner_id, "Ford Focus", 2018, 50000, "Testville", 20.0, WINDOW)
+        self.uncached = DBManager(path, search_cache_size=0)
+
+    def tearDown(self):
+        self.uncached.close()
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def results(self, db):
+        ids = []
+        for text, order_by in LIKE_SEARCHES:
+            ids.append([car.car_id for car in db.search_cars(text, 100000, "2025-06-01", order_by=order_by)])
+        for text in FTS_SEARCHES:
+            ids.append([car.car_id for car in db.search_cars_fts(text, 100000, "2025-06-01")])
+        return ids
+
+    def assert_cache_consistent_after(self, write):
+        self.assertEqual(self.results(self.db), self.results(self.uncached))
+        write()
+        self.assertEqual(self.results(self.db), self.results(self.uncached))
+
+    def test_insert_car(self):
+        self.assert_cache_consistent_after(lambda: self.db.insert_car(
+            self.owner_id, "Fiat Uno", 2015, 2000, "SãO PAULO", 15.0, WINDOW))
+
+    def test_price_change(self):
+        self.assert_cache_consistent_after(lambda: self.db.update_car_price(1, 5.0))
+
+    def test_availability_change(self):
+        self.assert_cache_consistent_after(lambda: self.db.update_car_availability(1, "2026-01-01 to 2026-02-01"))
+
+    def test_booking(self):
+        self.assert_cache_consistent_after(lambda: self.db.rent_car(1, self.owner_id, "2025-06-01", "2025-06-02"))
+
+    def test_bulk_import(self):
+        record = {"owner_id": self.owner_id, "model": "VW Gol", "year": 2019, "mileage": 300,
+                  "location": "SÃO PAULO", "price_per_day": 12.0, "availability": WINDOW}
+        self.assert_cache_consistent_after(
+            lambda: BulkImporter(self.db).import_records("cars", [(1, record)]))
+
+    def test_like_folds_only_ascii_letters(self):
+        car = {"mileage": 0, "available_from": None, "available_to": None, "location": "São Paulo"}
+        self.assertTrue(could_match(like_key("são", 10, "2025-06-01", True, None, None, 0), car))
+        self.assertTrue(could_match(like_key("SãO", 10, "2025-06-01", True, None, None, 0), car))
+        self.assertFalse(could_match(like_key("SÃO", 10, "2025-06-01", True, None, None, 0), car))
+
+
+if __name__ == "__main__":
+    unittest.main()
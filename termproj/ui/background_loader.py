@@ -0,0 +1,126 @@
+# ui/background_loader.py
+"""
+Runs DBManager calls on Qt's global thread pool and hands the results back to the GUI thread.
+DBManager gives every thread its own connection, so these calls are safe off the GUI thread;
+widgets must only be touched from the callbacks, which Qt delivers on the GUI thread.
+
+LatestOnlyLoader is for calls where only the newest request matters, such as search as
+you type: submitting a call supersedes the earlier ones, whose queries are interrupted
+if still running and whose results are dropped.
+"""
+import sqlite3
+import threading
+from functools import partial
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class LoaderSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+
+class LoaderTask(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = LoaderSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+
+
+def run_in_background(fn, *args, on_result=None, on_error=None, **kwargs):
+    """
+    Call fn(*args, **kwargs) on a pool thread. on_result(result) or on_error(message)
+    is then invoked on the GUI thread. Returns the submitted task.
+    """
+    task = LoaderTask(fn, *args, **kwargs)
+    if on_result is not None:
+        task.signals.result.connect(on_result)
+    task.signals.error.connect(on_error if on_error is not None else _print_error)
+    QThreadPool.globalInstance().start(task)
+    return task
+
+
+def _print_error(message):
+    print("Background load error:", message)
+
+
+_SUPERSEDED = object()
+
+
+class LatestOnlyLoader:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.generation = 0
+        self._running = {}  # generation -> connection of the pool thread running it
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.delivered = 0
+        self.superseded = 0
+        self.interrupted = 0
+
+    def submit(self, fn, *args, on_result=None, on_error=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a pool thread like run_in_background, superseding every
+        call submitted before: their queries are interrupted (sqlite3 Connection.interrupt)
+        and their results never reach their on_result. Returns the call's generation.
+        """
+        generation = self._supersede()
+        self.submitted += 1
+        run_in_background(self._call, generation, fn, args, kwargs,
+                          on_result=partial(self._deliver, on_result), on_error=on_error)
+        return generation
+
+    def cancel(self):
+        """Supersede every pending call without starting a new one."""
+        self._supersede()
+
+    def _supersede(self):
+        with self._lock:
+            self.generation += 1
+            for conn in self._running.values():
+                conn.interrupt()
+            return self.generation
+
+    def _call(self, generation, fn, args, kwargs):
+        # Runs on the pool thread; fn uses this thread's connection from the pool.
+        with self._lock:
+            if generation != self.generation:
+                return generation, _SUPERSEDED
+            self._running[generation] = self.db_manager.conn
+        try:
+            return generation, fn(*args, **kwargs)
+        except sqlite3.OperationalError:
+            if generation != self.generation:
+                self.interrupted += 1
+                return generation, _SUPERSEDED
+            raise
+        finally:
+            with self._lock:
+                self._running.pop(generation, None)
+
+    def _deliver(self, on_result, outcome):
+        generation, result = outcome
+        if result is _SUPERSEDED or generation != self.generation:
+            self.superseded += 1
+            return
+        self.delivered += 1
+        if on_result is not None:
+            on_result(result)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "superseded": self.superseded,
+            "interrupted": self.interrupted,
+        }
@@ -6,18 +6,23 @@ It demonstrates the use of the Builder pattern.
 
 from PyQt5.QtWidgets import (
     QMainWindow, QVBoxLayout, QLineEdit, QLabel, QPushButton, QWidget,
-    QListWidget, QListWidgetItem, QHBoxLayout, QInputDialog, QMessageBox
+    QListView, QHBoxLayout, QInputDialog, QMessageBox
 )
-from PyQt5.QtCore import Qt
 from patterns.singleton import UserSessionSingleton
 from patterns.builder import CarBuilder
+from ui.list_models import LIST_PAGE_SIZE, PagedListModel
 
 class CarListWindow(QMainWindow):
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, mediator=None, autoload=True):
+        """autoload=False leaves the list empty; the owner then calls load_cars() or populate_cars()."""
         super().__init__()
         self.db_manager = db_manager
+        self.mediator = mediator
         self.setWindowTitle("My Car Listings")
         self.init_ui()
+        if autoload:
+            # Initially load cars
+            self.load_cars()
 
     def init_ui(self):
         central_widget = QWidget(self)
@@ -33,8 +38,11 @@ class CarListWindow(QMainWindow):
         layout.addLayout(top_layout)
         
         # Listings List – Double-click to edit car details (availability & price)
-        self.car_list_widget = QListWidget()
-        self.car_list_widget.itemDoubleClicked.connect(self.edit_car_details)
+        self.car_list_model = PagedListModel(self.format_car, parent=self)
+        self.car_list_widget = QListView()
+        self.car_list_widget.setUniformItemSizes(True)
+        self.car_list_widget.setModel(self.car_list_model)
+        self.car_list_widget.doubleClicked.connect(self.edit_car_details)
         layout.addWidget(self.car_list_widget)
         
         # Section to add a new car listing
@@ -66,52 +74,43 @@ class CarListWindow(QMainWindow):
         self.setCentralWidget(central_widget)
         self.resize(400, 500)
 
-        # Initially load cars
-        self.load_cars()
-
     def load_cars(self):
         """Reload the list of car listings, including review and availability information."""
-        self.car_list_widget.clear()
         session = UserSessionSingleton.get_instance()
         if not session.is_logged_in():
-            self.car_list_widget.addItem("Please log in to view your listings.")
+            self.car_list_model.show_message("Please log in to view your listings.")
             return
         owner_id = session.user_id
-        cars = self.db_manager.get_cars_by_owner(owner_id)
-        if cars:
-            for car in cars:
-                # Fetch bookings and reviews to calculate aggregate review info.
-                self.db_manager.cursor.execute("SELECT booking_id FROM bookings WHERE car_id = ?", (car['car_id'],))
-                booking_rows = self.db_manager.cursor.fetchall()
-                booking_ids = [row['booking_id'] for row in booking_rows]
-
-                reviews = []
-                for booking_id in booking_ids:
-                    review = self.db_manager.get_review_by_booking(booking_id)
-                    if review:
-                        reviews.append(review)
-
-                num_reviews = len(reviews)
-                avg_rating = 0
-                if num_reviews > 0:
-                    total_rating = sum(review['rating'] for review in reviews)
-                    avg_rating = total_rating / num_reviews
-
-                display_text = (
-                    f"{car['model']} ({car['year']}) - ${car['price_per_day']}/day | Location: {car['location']} "
-                    f"| Availability: {car['availability']}"
-                )
-                if num_reviews > 0:
-                    display_text += f" | Avg. Rating: {avg_rating:.1f} ({num_reviews} review{'s' if num_reviews > 1 else ''})"
-                else:
-                    display_text += " | No reviews yet"
-                
-                list_item = QListWidgetItem(display_text)
-                # Attach full car information to the item
-                list_item.setData(Qt.UserRole, car)
-                self.car_list_widget.addItem(list_item)
+        self.populate_cars(self.db_manager.get_cars_with_review_stats(owner_id, limit=LIST_PAGE_SIZE))
+
+    def show_loading(self):
+        self.car_list_model.show_message("Loading listings...")
+
+    def populate_cars(self, cars):
+        """
+        Show the first page of rows returned by DBManager.get_cars_with_review_stats;
+        later pages are fetched as the list scrolls.
+        """
+        owner_id = UserSessionSingleton.get_instance().user_id
+        self.car_list_model.reset(
+            cars,
+            lambda offset, last_car, limit: self.db_manager.get_cars_with_review_stats(
+                owner_id, limit=limit, after_car_id=last_car['car_id']),
+            empty_message="No car listings found."
+        )
+
+    def format_car(self, car):
+        num_reviews = car['review_count']
+        avg_rating = car['avg_rating']
+        display_text = (
+            f"{car['model']} ({car['year']}) - ${car['price_per_day']}/day | Location: {car['location']} "
+            f"| Availability: {car['availability']}"
+        )
+        if num_reviews > 0:
+            display_text += f" | Avg. Rating: {avg_rating:.1f} ({num_reviews} review{'s' if num_reviews > 1 else ''})"
         else:
-            self.car_list_widget.addItem("No car listings found.")
+            display_text += " | No reviews yet"
+        return display_text
 
     def add_car(self):
         session = UserSessionSingleton.get_instance()
@@ -147,17 +146,19 @@ class CarListWindow(QMainWindow):
         self.location_input.clear()
         self.price_input.clear()
         self.availability_input.clear()
-        self.load_cars()
+        self.announce_cars_changed()
 
-    def edit_car_details(self, item):
+    def edit_car_details(self, index):
         """
         When a car listing is double-clicked, prompt the owner to update:
           - Availability (via text dialog)
           - Price (via double dialog)
         Then update the corresponding fields in the database.
         """
-        car = item.data(Qt.UserRole)
-       
+        car = self.car_list_model.row_at(index)
+        if car is None:
+            return
+
         new_availability, ok1 = QInputDialog.getText(
             self, "Edit Availability", f"Current availability: {car['availability']}\nEnter new availability:"
         )
@@ -174,7 +175,14 @@ class CarListWindow(QMainWindow):
         # Update the fields in the DB 
         self.db_manager.update_car_availability(car['car_id'], new_availability)
         self.db_manager.update_car_price(car['car_id'], new_price)
+        self.announce_cars_changed()  # once for both writes
 
         QMessageBox.information(self, "Updated", "Car listing has been updated.")
-        self.load_cars()
+
+    def announce_cars_changed(self):
+        """Ask the mediator for a (coalesced) reload of the listings, or reload now without one."""
+        if self.mediator is not None:
+            self.mediator.send({"type": "CARS_CHANGED"}, "car_list_window")
+        else:
+            self.load_cars()
 
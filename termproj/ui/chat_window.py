@@ -1,7 +1,9 @@
 # termproj/ui/chat_window.py
 from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QListWidget, QLineEdit, QPushButton, QMessageBox
 from PyQt5.QtCore import Qt
-from datetime import datetime
+
+# Number of messages fetched per page when opening or scrolling back through the chat.
+CHAT_PAGE_SIZE = 50
 
 class ChatWindow(QMainWindow):
     def __init__(self, db_manager, current_user, partner_email):
@@ -16,6 +18,9 @@ class ChatWindow(QMainWindow):
             return
 
         self.setWindowTitle(f"Chat with {self.partner['email']}")
+        self.history_cursor = None
+        self.history_exhausted = True
+        self.last_message_id = 0
         self.init_ui()
         self.load_chat()
 
@@ -29,6 +34,7 @@ class ChatWindow(QMainWindow):
         layout.addWidget(self.chat_label)
         
         self.chat_list = QListWidget()
+        self.chat_list.verticalScrollBar().valueChanged.connect(self.on_scrolled)
         layout.addWidget(self.chat_list)
         
         self.message_input = QLineEdit()
@@ -40,35 +46,64 @@ class ChatWindow(QMainWindow):
         layout.addWidget(self.send_btn)
 
     def load_chat(self):
+        self.history_exhausted = True
         self.chat_list.clear()
-        query = """
-            SELECT * FROM messages 
-            WHERE (sender_id = ? AND receiver_id = ?)
-               OR (sender_id = ? AND receiver_id = ?)
-            ORDER BY timestamp ASC
-        """
-        params = (self.current_user["user_id"], self.partner["user_id"],
-                  self.partner["user_id"], self.current_user["user_id"])
-        self.db_manager.cursor.execute(query, params)
-        messages = self.db_manager.cursor.fetchall()
+        # Only the newest page is loaded here; older pages come in as the user scrolls up.
+        messages = self.db_manager.get_conversation_page(
+            self.current_user["user_id"], self.partner["user_id"], CHAT_PAGE_SIZE
+        )
+        for msg in reversed(messages):
+            self.chat_list.addItem(self.format_message(msg))
+        self.history_cursor = (messages[-1]["timestamp"], messages[-1]["message_id"]) if messages else None
+        self.history_exhausted = len(messages) < CHAT_PAGE_SIZE
+        self.last_message_id = max((m["message_id"] for m in messages), default=0)
+        self.chat_list.scrollToBottom()
+        self.db_manager.mark_conversation_read(self.current_user["user_id"], self.partner["user_id"])
+
+    def on_scrolled(self, value):
+        if value == self.chat_list.verticalScrollBar().minimum():
+            self.load_older_messages()
+
+    def load_older_messages(self):
+        """Prepend the next page of older messages, keeping the visible rows in place."""
+        if self.history_exhausted or self.history_cursor is None:
+            return
+        messages = self.db_manager.get_conversation_page(
+            self.current_user["user_id"], self.partner["user_id"], CHAT_PAGE_SIZE, before=self.history_cursor
+        )
+        self.history_exhausted = len(messages) < CHAT_PAGE_SIZE
+        if not messages:
+            return
+        self.history_cursor = (messages[-1]["timestamp"], messages[-1]["message_id"])
+        scroll_bar = self.chat_list.verticalScrollBar()
+        distance_from_bottom = scroll_bar.maximum() - scroll_bar.value()
         for msg in messages:
-            msg_dict = dict(msg)
-            sender = "You" if msg_dict["sender_id"] == self.current_user["user_id"] else self.partner["email"]
-            self.chat_list.addItem(f"[{msg_dict['timestamp']}] {sender}: {msg_dict['content']}")
+            self.chat_list.insertItem(0, self.format_message(msg))
+        scroll_bar.setValue(scroll_bar.maximum() - distance_from_bottom)
 
     def send_message(self):
         content = self.message_input.text().strip()
         if not content:
             return
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            self.db_manager.cursor.execute(
-                "INSERT INTO messages(sender_id, receiver_id, content, timestamp) VALUES (?, ?, ?, ?)",
-                (self.current_user["user_id"], self.partner["user_id"], content, timestamp)
-            )
-            self.db_manager.conn.commit()
+            self.db_manager.insert_message(self.current_user["user_id"], self.partner["user_id"], content)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to send message: {e}")
             return
         self.message_input.clear()
-        self.load_chat()
+        self.append_new_messages()
+
+    def append_new_messages(self):
+        """Fetch and append only the messages newer than the last one shown."""
+        new_messages = self.db_manager.get_conversation_since(
+            self.current_user["user_id"], self.partner["user_id"], self.last_message_id
+        )
+        for msg in new_messages:
+            self.chat_list.addItem(self.format_message(msg))
+            self.last_message_id = msg["message_id"]
+        if new_messages:
+            self.chat_list.scrollToBottom()
+
+    def format_message(self, msg):
+        sender = "You" if msg["sender_id"] == self.current_user["user_id"] else self.partner["email"]
+        return f"[{msg['timestamp']}] {sender}: {msg['content']}"
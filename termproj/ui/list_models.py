@@ -0,0 +1,116 @@
+# ui/list_models.py
+"""
+List models for the QListViews of the DriveShare windows.
+
+A PagedListModel holds only the rows fetched so far and formats a row's text in data(),
+so Qt builds strings just for the rows it paints. Rows arrive a page at a time: the view
+calls canFetchMore()/fetchMore() as it scrolls near the end, and fetchMore() asks the
+model's fetch_page callable for the next page of a DBManager query.
+"""
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# Rows fetched per page, for the first page and for every fetchMore().
+LIST_PAGE_SIZE = 200
+
+
+class PagedListModel(QAbstractListModel):
+    def __init__(self, format_row, page_size=LIST_PAGE_SIZE, parent=None):
+        """
+        - format_row: callable turning a row into the text shown for it.
+        - page_size: rows per fetch_page call.
+        Rows are exposed unchanged under Qt.UserRole.
+        """
+        super().__init__(parent)
+        self.format_row = format_row
+        self.page_size = page_size
+        self._rows = []
+        self._fetch_page = None
+        self._exhausted = True
+        self._message = None  # placeholder text shown instead of rows, e.g. "Loading..."
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 if self._message is not None else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if self._message is not None:
+            return self._message if role == Qt.DisplayRole else None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return self.format_row(row)
+        if role == Qt.UserRole:
+            return row
+        return None
+
+    def flags(self, index):
+        if self._message is not None:
+            return Qt.ItemIsEnabled  # placeholders cannot be selected
+        return super().flags(index)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._message is None and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        rows = self._fetch_page(len(self._rows), self._rows[-1], self.page_size)
+        self._exhausted = len(rows) < self.page_size
+        self.append_rows(rows)
+
+    # --- Filling the model ---
+
+    def reset(self, first_page, fetch_page=None, empty_message=None):
+        """
+        Replace the contents with first_page. fetch_page(offset, last_row, limit) must return
+        up to limit rows following the first `offset` rows, last_row being the final row
+        loaded so far (for keyset paging); without it, or if first_page is short, the list
+        is complete. empty_message is shown when there are no rows.
+        """
+        self.beginResetModel()
+        self._rows = list(first_page)
+        self._fetch_page = fetch_page
+        self._exhausted = fetch_page is None or len(self._rows) < self.page_size
+        self._message = empty_message if not self._rows else None
+        self.endResetModel()
+
+    def show_message(self, text):
+        """Replace the contents with a single placeholder line."""
+        self.beginResetModel()
+        self._rows = []
+        self._fetch_page = None
+        self._exhausted = True
+        self._message = text
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        if self._message is not None:
+            self.reset(rows, self._fetch_page)
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def prepend_rows(self, rows):
+        """Insert rows (in display order) above the current ones."""
+        if not rows:
+            return
+        if self._message is not None:
+            self.reset(rows, self._fetch_page)
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self._rows[:0] = rows
+        self.endInsertRows()
+
+    def row_at(self, index):
+        """The row behind a view index, or None for an invalid index or a placeholder."""
+        return index.data(Qt.UserRole) if index.isValid() else None
+
+    def loaded_rows(self):
+        return len(self._rows)
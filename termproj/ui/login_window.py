@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from patterns.singleton import UserSessionSingleton
+from ui.startup_timing import mark
 
 class PasswordRecoveryDialog(QDialog):
     def __init__(self, db_manager, parent=None):
@@ -130,6 +131,7 @@ class LoginWindow(QMainWindow):
             session = UserSessionSingleton.get_instance()
             session.login(user_data["user_id"], user_data["email"], user_data["name"])
             self.status_label.setText("Login successful!")
+            mark("login_success")
             self.mediator.send({"type": "LOGIN_SUCCESS", "user_id": user_data["user_id"]}, "login_window")
             self.close()
         else:
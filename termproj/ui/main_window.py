@@ -1,13 +1,22 @@
 from PyQt5.QtWidgets import (
     QMainWindow, QLabel, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
-    QPushButton, QLineEdit, QListWidget, QListWidgetItem, QTextEdit,
-    QToolBar, QAction, QComboBox, QMessageBox, QInputDialog
+    QPushButton, QLineEdit, QListView, QTextEdit,
+    QToolBar, QAction, QComboBox, QMessageBox, QInputDialog, QCheckBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from patterns.singleton import UserSessionSingleton
 from patterns.proxy import PaymentProxy
+from ui.background_loader import LatestOnlyLoader, run_in_background
+from ui.list_models import LIST_PAGE_SIZE, PagedListModel
+from ui.startup_timing import mark, report_if_verbose
 from database.db_manager import DBManager
 from datetime import datetime
+from functools import partial
+
+# Number of chat messages fetched per page when opening or scrolling back through a conversation.
+CHAT_PAGE_SIZE = 50
+# Quiet time after the last keystroke before search-as-you-type runs the query.
+SEARCH_DEBOUNCE_MS = 250
 
 class MainWindow(QMainWindow):
     def __init__(self, db_manager, mediator):
@@ -15,13 +24,61 @@ class MainWindow(QMainWindow):
         self.db_manager = db_manager
         self.mediator = mediator
         self.setWindowTitle("DriveShare - Dashboard")
+        # Newest message_id shown per chat partner, for incremental refreshes.
+        self.last_message_ids = {}
+        # Incremented on every login so background results from an earlier session are ignored.
+        self.login_generation = 0
+        self.timed_generation = 0  # login whose dashboard_usable milestone was recorded
+        # Keyset cursor of the oldest message shown in the open chat, for scroll-back paging.
+        self.chat_history_cursor = None
+        self.chat_history_exhausted = True
         self.init_ui()
 
     def init_ui(self):
+        # Tabs are added as empty pages and built the first time they are selected,
+        # so only the Dashboard is constructed (and loaded) when the window first shows.
         self.tabs = QTabWidget()
+        self.tab_builders = [
+            ("dashboard", "Dashboard", self.build_dashboard_tab),
+            ("cars", "Car Listings", self.build_car_list_tab),
+            ("search", "Search & Rent", self.build_search_tab),
+            ("messages", "Messages", self.build_messages_tab),
+            ("reviews", "Reviews", self.build_reviews_tab),
+        ]
+        self.built_tabs = set()
+        for _key, title, _build in self.tab_builders:
+            self.tabs.addTab(QWidget(), title)
+        self.build_tab(0)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
+        central_widget = QWidget()
+        main_layout = QVBoxLayout(central_widget)
+        main_layout.addWidget(self.tabs)
+        self.setCentralWidget(central_widget)
+        self.resize(800, 600)
+        self.create_toolbar()
+
+    def build_tab(self, index):
+        """Build the tab at index if it has not been built yet. Returns True if it was built now."""
+        key, _title, build = self.tab_builders[index]
+        if key in self.built_tabs:
+            return False
+        build(self.tabs.widget(index))
+        self.built_tabs.add(key)
+        return True
+
+    def on_tab_changed(self, index):
+        if self.build_tab(index):
+            session = UserSessionSingleton.get_instance()
+            if session.is_logged_in():
+                self.load_tab_data(self.tab_builders[index][0], self.login_generation)
+
+    def is_tab_built(self, key):
+        return key in self.built_tabs
 
+    def build_dashboard_tab(self, page):
         # Dashboard Tab with Add Balance Functionality
-        self.dashboard_tab = QWidget()
+        self.dashboard_tab = page
         dash_layout = QVBoxLayout(self.dashboard_tab)
         self.welcome_label = QLabel("Welcome to DriveShare Dashboard!")
         dash_layout.addWidget(self.welcome_label)
@@ -36,15 +93,18 @@ class MainWindow(QMainWindow):
         balance_layout.addWidget(self.balance_input)
         balance_layout.addWidget(self.add_balance_btn)
         dash_layout.addLayout(balance_layout)
-        self.tabs.addTab(self.dashboard_tab, "Dashboard")
 
+    def build_car_list_tab(self, page):
         # Car Listings Tab
         from ui.car_list_window import CarListWindow
-        self.car_list_tab = CarListWindow(self.db_manager)
-        self.tabs.addTab(self.car_list_tab, "Car Listings")
+        self.car_list_tab = CarListWindow(self.db_manager, self.mediator, autoload=False)
+        layout = QVBoxLayout(page)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.car_list_tab)
 
+    def build_search_tab(self, page):
         # Search & Rent Tab with Additional Filters
-        self.search_tab = QWidget()
+        self.search_tab = page
         search_layout = QVBoxLayout(self.search_tab)
         self.search_label = QLabel("Search Cars by Location:")
         self.search_input = QLineEdit()
@@ -58,7 +118,20 @@ class MainWindow(QMainWindow):
         self.end_date_input.setPlaceholderText("End Date (YYYY-MM-DD)")
         self.search_button = QPushButton("Search")
         self.search_button.clicked.connect(self.handle_search)
-        self.search_results_list = QListWidget()
+        # Search as you type: edits restart the debounce timer, and the query runs on a
+        # pool thread once typing pauses. A newer search supersedes (and interrupts) older ones.
+        self.live_search_check = QCheckBox("Search as you type")
+        self.live_search_check.setChecked(True)
+        self.search_debounce = QTimer(self)
+        self.search_debounce.setSingleShot(True)
+        self.search_debounce.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_debounce.timeout.connect(self.handle_search)
+        self.search_loader = LatestOnlyLoader(self.db_manager)
+        for field in (self.search_input, self.mileage_input, self.start_date_input):
+            field.textChanged.connect(self.on_search_input_changed)
+        self.search_status_label = QLabel("")
+        self.search_results_model = PagedListModel(self.format_search_result, parent=self)
+        self.search_results_list = self.make_list_view(self.search_results_model)
         self.rent_car_btn = QPushButton("Rent Selected Car")
         self.rent_car_btn.clicked.connect(self.handle_rent_car)
         
@@ -68,12 +141,14 @@ class MainWindow(QMainWindow):
         search_layout.addWidget(self.start_date_input)
         search_layout.addWidget(self.end_date_input)
         search_layout.addWidget(self.search_button)
+        search_layout.addWidget(self.live_search_check)
+        search_layout.addWidget(self.search_status_label)
         search_layout.addWidget(self.search_results_list)
         search_layout.addWidget(self.rent_car_btn)
-        self.tabs.addTab(self.search_tab, "Search & Rent")
 
+    def build_messages_tab(self, page):
         # UPDATED Messaging Tab with Inbox/Chat Split View
-        self.msg_tab = QWidget()
+        self.msg_tab = page
         msg_layout = QHBoxLayout(self.msg_tab)
         # Left Panel: New Chat entry and Chat Partners list
         left_panel = QVBoxLayout()
@@ -89,8 +164,9 @@ class MainWindow(QMainWindow):
         # Existing Chat Partners List
         left_label = QLabel("Your Chats:")
         left_panel.addWidget(left_label)
-        self.chat_partner_list = QListWidget()
-        self.chat_partner_list.itemDoubleClicked.connect(self.open_chat_from_item)
+        self.chat_partner_model = PagedListModel(self.format_chat_partner, parent=self)
+        self.chat_partner_list = self.make_list_view(self.chat_partner_model)
+        self.chat_partner_list.doubleClicked.connect(self.open_chat_from_item)
         left_panel.addWidget(self.chat_partner_list)
         
         # Right Panel: Conversation View and Input
@@ -98,7 +174,10 @@ class MainWindow(QMainWindow):
         self.chat_header = QLabel("Select a chat partner")
         self.chat_header.setAlignment(Qt.AlignCenter)
         right_panel.addWidget(self.chat_header)
-        self.chat_view_list = QListWidget()
+        # Older pages are prepended by load_older_messages, so this model is never fetched forward.
+        self.chat_view_model = PagedListModel(str, parent=self)
+        self.chat_view_list = self.make_list_view(self.chat_view_model)
+        self.chat_view_list.verticalScrollBar().valueChanged.connect(self.on_chat_scrolled)
         right_panel.addWidget(self.chat_view_list)
         chat_input_layout = QHBoxLayout()
         self.chat_message_input = QLineEdit()
@@ -111,15 +190,16 @@ class MainWindow(QMainWindow):
         
         msg_layout.addLayout(left_panel, 1)
         msg_layout.addLayout(right_panel, 2)
-        self.tabs.addTab(self.msg_tab, "Messages")
 
+    def build_reviews_tab(self, page):
         # Reviews & Rental History Tab
-        self.reviews_tab = QWidget()
+        self.reviews_tab = page
         reviews_layout = QVBoxLayout(self.reviews_tab)
         rental_title = QLabel("Your Rental History")
         rental_title.setAlignment(Qt.AlignCenter)
         reviews_layout.addWidget(rental_title)
-        self.rental_history_list = QListWidget()
+        self.rental_history_model = PagedListModel(self.format_booking, parent=self)
+        self.rental_history_list = self.make_list_view(self.rental_history_model)
         reviews_layout.addWidget(self.rental_history_list)
         refresh_history_btn = QPushButton("Refresh History")
         refresh_history_btn.clicked.connect(self.loadRentalHistory)
@@ -154,15 +234,15 @@ class MainWindow(QMainWindow):
         submit_review_btn = QPushButton("Submit Review")
         submit_review_btn.clicked.connect(self.submitReview)
         reviews_layout.addWidget(submit_review_btn)
-        self.tabs.addTab(self.reviews_tab, "Reviews")
-        # --- End of Tabs ---
 
-        central_widget = QWidget()
-        main_layout = QVBoxLayout(central_widget)
-        main_layout.addWidget(self.tabs)
-        self.setCentralWidget(central_widget)
-        self.resize(800, 600)
-        self.create_toolbar()
+    @staticmethod
+    def make_list_view(model):
+        view = QListView()
+        # Every row is one (or, for chat partners, two) lines, so Qt can lay out the list
+        # from one row's size instead of formatting every loaded row.
+        view.setUniformItemSizes(True)
+        view.setModel(model)
+        return view
 
     def create_toolbar(self):
         toolbar = QToolBar("Main Toolbar", self)
@@ -181,18 +261,84 @@ class MainWindow(QMainWindow):
         session = UserSessionSingleton.get_instance()
         self.welcome_label.setText(f"Welcome, {session.name}!")
         self.mediator.register("main_window", self)
-        self.loadChatPartners()  # Refresh chat partner list
-        self.car_list_tab.load_cars()
-        current_balance = self.db_manager.get_balance(session.user_id)
-        self.balance_label.setText(f"Current Balance: ${current_balance:.2f}")
-        self.loadRentalHistory()
+        # Show the dashboard right away; each built tab fills in as its data arrives from
+        # the pool, and tabs not built yet load when they are first selected.
         self.show()
+        mark("dashboard_shown")
+        self.login_generation += 1
+        for key, _title, _build in self.tab_builders:
+            if key in self.built_tabs:
+                self.load_tab_data(key, self.login_generation)
+
+    def load_tab_data(self, key, generation):
+        """Show a loading placeholder in the tab and fetch its data on a pool thread."""
+        session = UserSessionSingleton.get_instance()
+        if key == "dashboard":
+            self.balance_label.setText("Current Balance: loading...")
+            fetch, populate = self.db_manager.get_balance, self.show_dashboard_balance
+        elif key == "cars":
+            self.car_list_tab.show_loading()
+            fetch, populate = partial(self.db_manager.get_cars_with_review_stats, limit=LIST_PAGE_SIZE), \
+                self.car_list_tab.populate_cars
+        elif key == "messages":
+            self.chat_partner_model.show_message("Loading chats...")
+            fetch, populate = partial(self.db_manager.get_conversation_inbox, limit=LIST_PAGE_SIZE), \
+                self.populate_chat_partners
+        elif key == "reviews":
+            self.rental_history_model.show_message("Loading rental history...")
+            fetch, populate = partial(self.db_manager.get_rental_history_page, limit=LIST_PAGE_SIZE), \
+                self.populate_rental_history
+        else:
+            return
+        run_in_background(fetch, session.user_id,
+                          on_result=partial(self.apply_login_data, generation, populate))
+
+    def apply_login_data(self, generation, populate, result):
+        # Drop results that belong to an earlier login.
+        if generation == self.login_generation:
+            populate(result)
+
+    def show_balance(self, balance):
+        self.balance_label.setText(f"Current Balance: ${balance:.2f}")
+
+    def show_dashboard_balance(self, balance):
+        self.show_balance(balance)
+        # The Dashboard tab is usable once its balance is in; record that once per login.
+        if self.timed_generation != self.login_generation:
+            self.timed_generation = self.login_generation
+            mark("dashboard_usable")
+            report_if_verbose()
+
+    def refresh_car_listings(self):
+        if self.is_tab_built("cars"):
+            self.car_list_tab.load_cars()
+
+    def refresh_balance(self):
+        session = UserSessionSingleton.get_instance()
+        if session.is_logged_in():
+            self.show_balance(self.db_manager.get_balance(session.user_id))
+
+    def announce_change(self, msg_type, refresh):
+        """
+        Tell the mediator that data behind a view changed; it coalesces a burst of these
+        into one refresh. Without a mediator the view is refreshed directly.
+        """
+        if self.mediator is not None:
+            self.mediator.send({"type": msg_type}, "main_window")
+        else:
+            refresh()
+
+    def on_search_input_changed(self, _text):
+        if self.live_search_check.isChecked():
+            self.search_debounce.start()  # restarts the countdown on every keystroke
 
     def handle_search(self):
+        self.search_debounce.stop()
         location = self.search_input.text().strip()
-        self.search_results_list.clear()
         if not location:
-            self.search_results_list.addItem("Please enter a location.")
+            self.search_loader.cancel()
+            self.search_status_label.setText("")
+            self.search_results_model.show_message("Please enter a location.")
             return
         # Read additional search parameters
         try:
@@ -202,33 +348,53 @@ class MainWindow(QMainWindow):
         rental_date = self.start_date_input.text().strip()
         if not rental_date:
             rental_date = datetime.now().strftime("%Y-%m-%d")
-        results = self.db_manager.search_cars(location, max_mileage, rental_date)
-        if results:
-            for car in results:
-                item_text = f"{car['model']} ({car['year']}) - ${car['price_per_day']}/day | Location: {car['location']}"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, car['car_id'])
-                self.search_results_list.addItem(item)
         else:
-            self.search_results_list.addItem("No cars found for that location.")
+            try:
+                datetime.strptime(rental_date, "%Y-%m-%d")
+            except ValueError:
+                # Typically a date still being typed; wait for a complete one.
+                self.search_loader.cancel()
+                self.search_status_label.setText("Enter the start date as YYYY-MM-DD.")
+                return
+        # Only the first page is read now, off the GUI thread; the view fetches further
+        # pages as it scrolls. Results of a search superseded meanwhile are dropped.
+        search = partial(self.db_manager.search_cars_fts, location, max_mileage, rental_date)
+        self.search_status_label.setText("Searching...")
+        self.search_loader.submit(search, limit=LIST_PAGE_SIZE,
+                                  on_result=partial(self.show_search_results, search),
+                                  on_error=self.show_search_error)
+
+    def show_search_results(self, search, first_page):
+        self.search_status_label.setText("")
+        self.search_results_model.reset(
+            first_page,
+            lambda offset, last_car, limit: search(limit=limit, offset=offset),
+            empty_message="No cars found for that location."
+        )
+
+    def show_search_error(self, message):
+        self.search_status_label.setText(f"Search failed: {message}")
+
+    def format_search_result(self, car):
+        return f"{car['model']} ({car['year']}) - ${car['price_per_day']}/day | Location: {car['location']}"
 
     def handle_rent_car(self):
         session = UserSessionSingleton.get_instance()
         if not session.is_logged_in():
             return
-        selected_item = self.search_results_list.currentItem()
-        if not selected_item:
+        car = self.search_results_model.row_at(self.search_results_list.currentIndex())
+        if car is None:
             return
-        car_id = selected_item.data(Qt.UserRole)
+        car_id = car['car_id']
         start_date = self.start_date_input.text().strip()
         end_date = self.end_date_input.text().strip()
         if not start_date or not end_date:
             QMessageBox.warning(self, "Input Error", "Please enter both start and end dates for the rental period.")
             return
         success, message = self.db_manager.rent_car(car_id, session.user_id, start_date, end_date)
-        current_balance = self.db_manager.get_balance(session.user_id)
-        self.balance_label.setText(f"Current Balance: ${current_balance:.2f}")
+        self.announce_change("BALANCE_CHANGED", self.refresh_balance)
         if success:
+            self.announce_change("RENTAL_HISTORY_CHANGED", self.loadRentalHistory)
             QMessageBox.information(self, "Rental Successful", message)
         else:
             QMessageBox.warning(self, "Rental Failed", message)
@@ -243,25 +409,33 @@ class MainWindow(QMainWindow):
             self.balance_label.setText("Please enter a valid amount.")
             return
         self.db_manager.add_balance(session.user_id, amount)
-        current_balance = self.db_manager.get_balance(session.user_id)
-        self.balance_label.setText(f"Current Balance: ${current_balance:.2f}")
+        self.announce_change("BALANCE_CHANGED", self.refresh_balance)
         self.balance_input.clear()
 
     # --- Methods for Reviews & Rental History ---
     def loadRentalHistory(self):
-        self.rental_history_list.clear()
+        if not self.is_tab_built("reviews"):
+            return  # loaded when the tab is first opened
         session = UserSessionSingleton.get_instance()
         if not session.is_logged_in():
-            self.rental_history_list.addItem("Please log in to view rental history.")
+            self.rental_history_model.show_message("Please log in to view rental history.")
             return
-        history = self.db_manager.get_rental_history_for_renter(session.user_id)
-        if not history:
-            self.rental_history_list.addItem("No rental history found.")
-        else:
-            for booking in history:
-                item_text = (f"Booking ID: {booking['booking_id']} | Car ID: {booking['car_id']} | "
-                             f"Dates: {booking['start_date']} to {booking['end_date']} | Status: {booking['status']}")
-                self.rental_history_list.addItem(item_text)
+        self.populate_rental_history(
+            self.db_manager.get_rental_history_page(session.user_id, LIST_PAGE_SIZE))
+
+    def populate_rental_history(self, first_page):
+        """Show the first page of the renter's bookings; later pages load as the list scrolls."""
+        renter_id = UserSessionSingleton.get_instance().user_id
+        self.rental_history_model.reset(
+            first_page,
+            lambda offset, last_booking, limit: self.db_manager.get_rental_history_page(
+                renter_id, limit, after_booking_id=last_booking['booking_id']),
+            empty_message="No rental history found."
+        )
+
+    def format_booking(self, booking):
+        return (f"Booking ID: {booking['booking_id']} | Car ID: {booking['car_id']} | "
+                f"Dates: {booking['start_date']} to {booking['end_date']} | Status: {booking['status']}")
 
     def submitReview(self):
         session = UserSessionSingleton.get_instance()
@@ -286,68 +460,78 @@ class MainWindow(QMainWindow):
             self.booking_input.clear()
             self.reviewee_input.clear()
             self.feedback_text.clear()
-            self.loadRentalHistory()
+            self.announce_change("RENTAL_HISTORY_CHANGED", self.loadRentalHistory)
         else:
             QMessageBox.critical(self, "Error", "Failed to submit review. Please try again.")
 
     # --- Methods for One-to-One Chat (Messaging Tab) ---
     def loadChatPartners(self):
-        self.chat_partner_list.clear()
+        if not self.is_tab_built("messages"):
+            return  # loaded when the tab is first opened
         session = UserSessionSingleton.get_instance()
         if not session.is_logged_in():
+            self.chat_partner_model.reset([])
             return
-        user_id = session.user_id
-        query = """
-            SELECT DISTINCT
-                CASE
-                    WHEN sender_id = ? THEN receiver_id
-                    ELSE sender_id
-                END AS partner_id
-            FROM messages
-            WHERE sender_id = ? OR receiver_id = ?
-        """
-        params = (user_id, user_id, user_id)
-        self.db_manager.cursor.execute(query, params)
-        rows = self.db_manager.cursor.fetchall()
-        partner_ids = [r["partner_id"] for r in rows]
-        for pid in partner_ids:
-            self.db_manager.cursor.execute("SELECT * FROM users WHERE user_id = ?", (pid,))
-            partner_row = self.db_manager.cursor.fetchone()
-            if partner_row:
-                partner = dict(partner_row)
-                item = QListWidgetItem(partner["email"])
-                item.setData(Qt.UserRole, partner)
-                self.chat_partner_list.addItem(item)
-
-    def open_chat_from_item(self, item):
-        partner = item.data(Qt.UserRole)
-        self.load_chat_conversation(partner)
+        self.populate_chat_partners(
+            self.db_manager.get_conversation_inbox(session.user_id, limit=LIST_PAGE_SIZE))
+
+    def populate_chat_partners(self, first_page):
+        """Show the first page of the inbox; later pages load as the list scrolls."""
+        user_id = UserSessionSingleton.get_instance().user_id
+        self.chat_partner_model.reset(
+            first_page,
+            lambda offset, last_partner, limit: self.db_manager.get_conversation_inbox(
+                user_id, limit=limit, offset=offset)
+        )
+
+    def format_chat_partner(self, partner):
+        text = partner["email"]
+        if partner["unread_count"]:
+            text += f" ({partner['unread_count']} unread)"
+        return text + f"\n[{partner['last_timestamp']}] {partner['last_preview']}"
+
+    def open_chat_from_item(self, index):
+        partner = self.chat_partner_model.row_at(index)
+        if partner is not None:
+            self.load_chat_conversation(partner)
 
     def load_chat_conversation(self, partner):
         session = UserSessionSingleton.get_instance()
         current_user_id = session.user_id
         self.chat_header.setText(f"Chat with {partner['email']}")
-        self.chat_view_list.clear()
-        query = """
-            SELECT * FROM messages 
-            WHERE (sender_id = ? AND receiver_id = ?)
-               OR (sender_id = ? AND receiver_id = ?)
-            ORDER BY timestamp ASC
-        """
-        params = (current_user_id, partner["user_id"],
-                  partner["user_id"], current_user_id)
-        self.db_manager.cursor.execute(query, params)
-        messages = self.db_manager.cursor.fetchall()
-        print(f"Loaded {len(messages)} messages for conversation with {partner['email']}")
-        for msg in messages:
-            msg_dict = dict(msg)
-            if msg_dict["sender_id"] == current_user_id:
-                sender = session.email
-            else:
-                sender = partner["email"]
-            self.chat_view_list.addItem(f"[{msg_dict['timestamp']}] {sender}: {msg_dict['content']}")
-        self.chat_view_list.scrollToBottom()
+        self.chat_history_exhausted = True
         self.current_chat_partner = partner
+        # Only the newest page is loaded here; older pages come in as the user scrolls up.
+        messages = self.db_manager.get_conversation_page(current_user_id, partner["user_id"], CHAT_PAGE_SIZE)
+        self.chat_view_model.format_row = partial(self.format_chat_message, partner=partner)
+        self.chat_view_model.reset(messages[::-1])
+        self.chat_history_cursor = (messages[-1]["timestamp"], messages[-1]["message_id"]) if messages else None
+        self.chat_history_exhausted = len(messages) < CHAT_PAGE_SIZE
+        self.chat_view_list.scrollToBottom()
+        self.last_message_ids[partner["user_id"]] = max((m["message_id"] for m in messages), default=0)
+        self.db_manager.mark_conversation_read(current_user_id, partner["user_id"])
+
+    def on_chat_scrolled(self, value):
+        scroll_bar = self.chat_view_list.verticalScrollBar()
+        if value == scroll_bar.minimum() and hasattr(self, "current_chat_partner"):
+            self.load_older_messages()
+
+    def load_older_messages(self):
+        """Prepend the next page of older messages, keeping the visible rows in place."""
+        if self.chat_history_exhausted or self.chat_history_cursor is None:
+            return
+        session = UserSessionSingleton.get_instance()
+        partner = self.current_chat_partner
+        messages = self.db_manager.get_conversation_page(
+            session.user_id, partner["user_id"], CHAT_PAGE_SIZE, before=self.chat_history_cursor
+        )
+        self.chat_history_exhausted = len(messages) < CHAT_PAGE_SIZE
+        if not messages:
+            return
+        self.chat_history_cursor = (messages[-1]["timestamp"], messages[-1]["message_id"])
+        self.chat_view_model.prepend_rows(messages[::-1])
+        # Keep the message that was at the top in place.
+        self.chat_view_list.scrollTo(self.chat_view_model.index(len(messages), 0), QListView.PositionAtTop)
 
     def send_chat_message(self):
         session = UserSessionSingleton.get_instance()
@@ -357,18 +541,30 @@ class MainWindow(QMainWindow):
         content = self.chat_message_input.text().strip()
         if not content:
             return
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            self.db_manager.cursor.execute(
-                "INSERT INTO messages(sender_id, receiver_id, content, timestamp) VALUES (?, ?, ?, ?)",
-                (session.user_id, self.current_chat_partner["user_id"], content, timestamp)
-            )
-            self.db_manager.conn.commit()
+            self.db_manager.insert_message(session.user_id, self.current_chat_partner["user_id"], content)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to send message: {e}")
             return
         self.chat_message_input.clear()
-        self.load_chat_conversation(self.current_chat_partner)
+        self.append_new_messages(self.current_chat_partner)
+        self.announce_change("CHATS_CHANGED", self.loadChatPartners)
+
+    def append_new_messages(self, partner):
+        """Append only the messages newer than the last one shown for this partner."""
+        session = UserSessionSingleton.get_instance()
+        last_message_id = self.last_message_ids.get(partner["user_id"], 0)
+        new_messages = self.db_manager.get_conversation_since(session.user_id, partner["user_id"], last_message_id)
+        if new_messages:
+            self.chat_view_model.append_rows(new_messages)
+            last_message_id = new_messages[-1]["message_id"]
+            self.chat_view_list.scrollToBottom()
+        self.last_message_ids[partner["user_id"]] = last_message_id
+
+    def format_chat_message(self, msg, partner):
+        session = UserSessionSingleton.get_instance()
+        sender = session.email if msg["sender_id"] == session.user_id else partner["email"]
+        return f"[{msg['timestamp']}] {sender}: {msg['content']}"
 
     def start_new_chat(self):
         partner_email = self.new_partner_input.text().strip().lower()
@@ -381,7 +577,7 @@ class MainWindow(QMainWindow):
             return
         self.load_chat_conversation(partner)
         self.new_partner_input.clear()
-        self.loadChatPartners()
+        self.announce_change("CHATS_CHANGED", self.loadChatPartners)
 
 if __name__ == "__main__":
     import sys
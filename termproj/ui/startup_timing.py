@@ -0,0 +1,59 @@
+# ui/startup_timing.py
+"""
+Startup milestones for DriveShare.
+
+main.py imports this module first, so times are measured from (nearly) process start.
+Milestones are always recorded; set DRIVESHARE_STARTUP_TIMING=1 to print each one
+and a summary of time-to-login-screen and login-to-usable-dashboard.
+"""
+import os
+import time
+
+_started = time.perf_counter()
+_marks = []  # (name, seconds since start), in the order recorded
+VERBOSE = bool(os.environ.get("DRIVESHARE_STARTUP_TIMING"))
+
+
+def mark(name):
+    """Record a milestone and return its time in seconds since start."""
+    elapsed = time.perf_counter() - _started
+    _marks.append((name, elapsed))
+    if VERBOSE:
+        print(f"[startup] {name}: {elapsed * 1000:.1f} ms")
+    return elapsed
+
+
+def marks():
+    return list(_marks)
+
+
+def last(name):
+    """Time of the most recent milestone with this name, or None."""
+    for mark_name, elapsed in reversed(_marks):
+        if mark_name == name:
+            return elapsed
+    return None
+
+
+def between(start, end):
+    """Seconds from the latest `start` milestone to the latest `end` one, or None."""
+    started, ended = last(start), last(end)
+    if started is None or ended is None:
+        return None
+    return ended - started
+
+
+def summary():
+    lines = []
+    login_screen = last("login_screen_shown")
+    if login_screen is not None:
+        lines.append(f"time to login screen: {login_screen * 1000:.1f} ms")
+    dashboard = between("login_success", "dashboard_usable")
+    if dashboard is not None:
+        lines.append(f"login to usable dashboard: {dashboard * 1000:.1f} ms")
+    return "\n".join(lines)
+
+
+def report_if_verbose():
+    if VERBOSE:
+        print("[startup] " + summary().replace("\n", "\n[startup] "))